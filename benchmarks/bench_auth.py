@@ -0,0 +1,84 @@
+# benchmarks/bench_auth.py
+# 사용자 10만 명일 때 로그인 조회 지연: 예전 방식(매번 connect + CREATE TABLE) vs 공용 DB 스레드
+#   python -m benchmarks.bench_auth --users 100000
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from music import db
+
+
+def percentiles(samples_ms):
+    s = sorted(samples_ms)
+    pick = lambda q: s[min(len(s) - 1, int(q * len(s)))]
+    return {"p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99), "max": s[-1]}
+
+
+def fill(path, n):
+    conn = db.connect(path)
+    db.migrate(conn)
+    h = hashlib.sha256(b"pw").hexdigest()
+    with conn:
+        conn.executemany(db.SQL_CREATE_USER, ((f"user{i:06d}", h) for i in range(n)))
+    conn.close()
+
+
+def legacy_login(path, username):
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE,
+            password_hash TEXT
+        )
+    """)
+    row = conn.execute("SELECT password_hash FROM users WHERE username = ?", (username,)).fetchone()
+    conn.close()
+    return row
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--users', type=int, default=100_000)
+    ap.add_argument('--logins', type=int, default=2000)
+    args = ap.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="auth-bench-")
+    try:
+        path = os.path.join(root, "users.db")
+        t0 = time.perf_counter()
+        fill(path, args.users)
+        print(f"fill {args.users} users: {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+        rng = random.Random(0)
+        names = [f"user{rng.randrange(args.users):06d}" for _ in range(args.logins)]
+
+        legacy = []
+        for u in names:
+            t = time.perf_counter()
+            legacy_login(path, u)
+            legacy.append((time.perf_counter() - t) * 1000)
+
+        database = db.Database(path)
+        pooled = []
+        for u in names:
+            t = time.perf_counter()
+            database.call(db.password_hash, u)
+            pooled.append((time.perf_counter() - t) * 1000)
+        database.close()
+
+        for name, samples in (("legacy connect", legacy), ("shared db thread", pooled)):
+            p = percentiles(samples)
+            print(f"{name:<18} p50 {p['p50']:.3f}  p90 {p['p90']:.3f}  "
+                  f"p99 {p['p99']:.3f}  max {p['max']:.3f} ms")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# benchmarks/bench_bundle.py
+# 낱개 파일(assets/music, assets/lyrics) vs 앨범 번들: 시작(목록 + 가사 전체 읽기)과 곡 전환 시간
+#   python -m benchmarks.bench_bundle --tracks 2000
+# 매 반복 전에 posix_fadvise(DONTNEED) 로 페이지 캐시를 비워 느린 디스크에서의 첫 읽기에 가깝게 잰다.
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks.bench_auth import percentiles
+from benchmarks.run import make_library
+from music.bundle import AlbumBundle, open_wav, pack, read_text
+from music.catalog import TrackCatalog
+from music.lyrics import load_lyrics
+from music.probe import probe_file
+
+
+def drop_cache(paths):
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def densify(music_dir):
+    # make_library 의 WAV 는 희소 파일이라 읽어도 디스크를 안 건드린다. 실제 바이트로 채운다
+    for fn in os.listdir(music_dir):
+        path = os.path.join(music_dir, fn)
+        size = os.path.getsize(path)
+        with open(path, 'r+b') as f:
+            f.seek(44)
+            f.write(os.urandom(size - 44))
+
+
+def startup(root, music_dir, lyrics_dir, bundle_path):
+    """(목록 맞추기 ms, 가사 전부 읽기 ms). 검색 색인의 CPU 시간은 양쪽이 같아서 뺀다."""
+    db_path = os.path.join(root, 'library.db')
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    t0 = time.perf_counter()
+    catalog = TrackCatalog(db_path, music_dir, lyrics_dir, bundle_path=bundle_path)
+    catalog.sync()
+    fns = [t.fn for t in catalog.tracks()]
+    t1 = time.perf_counter()
+    for fn in fns:
+        title = os.path.splitext(fn)[0]
+        for name in (f"{title}.txt", f"{title}.lrc", f"{title}_game.txt"):
+            read_text(catalog.lyrics, name)
+    t2 = time.perf_counter()
+    catalog.close()
+    return (t1 - t0) * 1000, (t2 - t1) * 1000
+
+
+def switch(catalog, fn):
+    """곡 전환 때 디스크를 건드리는 일: 헤더 조회, 가사, 분석 스레드의 WAV 열기."""
+    src = catalog.path_of(fn)
+    probe_file(src)
+    load_lyrics(catalog.lyrics, os.path.splitext(fn)[0])
+    with open_wav(src) as w:
+        w.readframes(4096)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--tracks', type=int, default=2000)
+    ap.add_argument('--runs', type=int, default=5)
+    ap.add_argument('--switches', type=int, default=200)
+    args = ap.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="bundle-bench-")
+    try:
+        music_dir, lyrics_dir = make_library(root, args.tracks)
+        densify(music_dir)
+        loose = [os.path.join(d, fn) for d in (music_dir, lyrics_dir) for fn in os.listdir(d)]
+        bundle_path = os.path.join(root, 'album.mqa')
+        t0 = time.perf_counter()
+        pack({'music': music_dir, 'lyrics': lyrics_dir}, bundle_path)
+        print(f"pack {args.tracks} tracks: {time.perf_counter() - t0:.2f} s, "
+              f"{os.path.getsize(bundle_path) >> 20} MiB")
+        t0 = time.perf_counter()
+        assert not AlbumBundle(bundle_path).verify()
+        print(f"verify: {time.perf_counter() - t0:.2f} s")
+
+        cases = (("loose files", None, loose), ("bundle", bundle_path, [bundle_path]))
+        for name, bpath, files in cases:
+            runs = []
+            for _ in range(args.runs):
+                drop_cache(files)
+                runs.append(startup(root, music_dir, lyrics_dir, bpath))
+            sync = percentiles([r[0] for r in runs])['p50']
+            lyr = percentiles([r[1] for r in runs])['p50']
+            print(f"startup  {name:<12} sync p50 {sync:8.1f} ms  lyrics p50 {lyr:8.1f} ms")
+
+        rng = random.Random(0)
+        order = [f"track {rng.randrange(args.tracks):05d}.wav" for _ in range(args.switches)]
+        for name, bpath, files in cases:
+            catalog = TrackCatalog(os.path.join(root, 'library.db'), music_dir, lyrics_dir,
+                                   bundle_path=bpath)
+            catalog.sync()
+            drop_cache(files)
+            samples = []
+            for fn in order:
+                t0 = time.perf_counter()
+                switch(catalog, fn)
+                samples.append((time.perf_counter() - t0) * 1000)
+            catalog.close()
+            p = percentiles(samples)
+            print(f"switch   {name:<12} p50 {p['p50']:8.3f} ms  p99 {p['p99']:8.3f} ms")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
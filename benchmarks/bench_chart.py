@@ -0,0 +1,75 @@
+# benchmarks/bench_chart.py
+# 4분짜리 WAV 로 차트 생성 속도(실시간 대비 배수)와 검출률 측정
+#   python -m benchmarks.bench_chart --minutes 4
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from music.chart import Chart, build_chart
+
+
+def make_click_track(path, minutes, bpm=120, rate=44100, seed=0):
+    """bpm 간격의 타격음 + 잡음. 블록 단위로 써서 메모리를 아낀다."""
+    rng = np.random.default_rng(seed)
+    total = int(minutes * 60 * rate)
+    beat = int(rate * 60 / bpm)
+    hit = (np.exp(-np.arange(2048) / 300.0) * np.sin(np.arange(2048) * 0.3)).astype(np.float32)
+    onsets = np.arange(beat // 2, total - len(hit), beat)
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        block = rate * 10
+        for start in range(0, total, block):
+            n = min(block, total - start)
+            x = rng.normal(0, 0.02, n).astype(np.float32)
+            for o in onsets[(onsets >= start - len(hit)) & (onsets < start + n)]:
+                a, b = max(o, start), min(o + len(hit), start + n)
+                x[a - start:b - start] += 0.8 * hit[a - o:b - o]
+            pcm = (np.clip(x, -1, 1) * 32767).astype('<i2')
+            w.writeframes(np.repeat(pcm, 2).tobytes())
+    return onsets * 1000.0 / rate
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--minutes', type=float, default=4.0)
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="chart-bench-")
+    try:
+        path = os.path.join(root, "click.wav")
+        truth = make_click_track(path, args.minutes)
+        runs = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            chart = build_chart(path, lyrics_dir=root)
+            runs.append(time.perf_counter() - t0)
+        best = min(runs)
+        audio_sec = args.minutes * 60
+
+        # 검출률: 정답 타격 ±50ms 안에 노트가 있는 비율
+        t = chart.times_ms.astype(np.float64)
+        i = np.clip(np.searchsorted(t, truth), 1, len(t) - 1) if len(t) > 1 else np.zeros(len(truth), int)
+        nearest = np.minimum(np.abs(t[i] - truth), np.abs(t[i - 1] - truth)) if len(t) > 1 else np.full(len(truth), np.inf)
+        recall = float(np.mean(nearest <= 50))
+        assert Chart.from_bytes(chart.to_bytes()).times_ms.tolist() == chart.times_ms.tolist()
+
+        print(f"audio        {audio_sec:.0f} s")
+        print(f"build        {best * 1000:.1f} ms (best of {args.repeat})")
+        print(f"speed        {audio_sec / best:.0f}x realtime")
+        print(f"notes        {len(chart)} / {len(truth)} beats, recall@50ms {recall:.3f}")
+        print(f"bpm          {chart.bpm:.1f}")
+        print(f"chart size   {len(chart.to_bytes())} bytes")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# benchmarks/bench_history.py
+# 재생 기록/점수 저장소: 행이 수백만 개일 때 이벤트당 쓰기 비용과 조회 지연
+#   python -m benchmarks.bench_history --plays 2000000 --scores 1000000
+# 쓰기는 위치 보고마다 바로 쓰는 방식(이벤트 하나 = 트랜잭션 하나)과 HistoryRecorder 의
+# 모아 쓰기를 비교한다. 게임 모드처럼 20 ms 마다 위치가 오고 5 초마다 flush 한다고 본다.
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from PyQt5.QtCore import QCoreApplication
+
+from benchmarks.bench_auth import fill, percentiles
+from music import db, history
+
+TRACKS = 2000
+TICK_MS = 20
+
+
+def fill_history(path, users, plays, scores, seed=0):
+    rng = random.Random(seed)
+    conn = db.connect(path)
+    db.migrate(conn)
+    now = time.time()
+    fns = [f"track {i:05d}.wav" for i in range(TRACKS)]
+    with conn:
+        conn.executemany(history.SQL_ADD_PLAY, (
+            (rng.randrange(users) + 1, rng.choice(fns), now - rng.random() * 3e7,
+             rng.randrange(240_000), rng.random() < 0.6) for _ in range(plays)))
+        conn.executemany(history.SQL_ADD_SCORE, (
+            (rng.randrange(users) + 1, rng.choice(fns), 1, rng.randrange(300_000),
+             rng.randrange(500), 0, 0, 0, 0, now - rng.random() * 3e7, None)
+            for _ in range(scores)))
+        conn.execute(history.SQL_REBUILD_BEST)     # 순위표용 최고 기록은 점수에서 한 번에
+        conn.executemany(history.SQL_SET_POSITION, (
+            (u + 1, rng.choice(fns), rng.randrange(240_000), now)
+            for u in range(users) for _ in range(5)))
+    conn.execute("ANALYZE")
+    conn.close()
+    return fns
+
+
+def bench_direct(path, fns, events):
+    """위치 보고마다 UPSERT + COMMIT."""
+    conn = db.connect(path)
+    t0 = time.perf_counter()
+    for i in range(events):
+        with conn:
+            conn.execute(history.SQL_SET_POSITION, (1, fns[0], i * TICK_MS, time.time()))
+    conn.close()
+    return (time.perf_counter() - t0) / events * 1e6
+
+
+def bench_batched(database, fns, flushes):
+    """HistoryRecorder 로 곡 하나를 5 초씩: 위치 보고 FLUSH_MS / TICK_MS 번 + 곡 전환마다 재생·점수 한 줄."""
+    rec = history.HistoryRecorder("user000000", database, flush_ms=1 << 30)
+    ticks = history.FLUSH_MS // TICK_MS
+
+    class _Judge:
+        score, max_combo = 123_456, 321
+        counts = {"PERFECT": 300, "GREAT": 20, "GOOD": 3, "MISS": 1}
+
+    gui = flush = 0.0
+    for k in range(flushes):
+        t0 = time.perf_counter()
+        rec.track_started(fns[k % len(fns)], 240_000)
+        for i in range(ticks):
+            rec.track_position(i * TICK_MS)
+        rec.add_score(fns[k % len(fns)], 1, _Judge)
+        rec.track_finished()
+        t1 = time.perf_counter()
+        rec.flush(wait=True)    # 앱에서는 DB 스레드가 하는 일 (GUI 는 기다리지 않는다)
+        t2 = time.perf_counter()
+        gui += t1 - t0
+        flush += t2 - t1
+    events = rec.stats()["events"]
+    return gui / events * 1e6, flush / events * 1e6, flush / flushes * 1000, events / flushes
+
+
+def bench_queries(path, users, fns, n, seed=1):
+    rng = random.Random(seed)
+    conn = db.connect(path)
+    names = [f"user{rng.randrange(users):06d}" for _ in range(n)]
+    cases = {
+        "leaderboard+rank": lambda i: history.leaderboard(conn, rng.choice(fns), 1, names[i]),
+        "resume positions": lambda i: history.resume_positions(conn, names[i]),
+        "recent plays": lambda i: history.recent_plays(conn, names[i]),
+    }
+    out = {}
+    for name, fn in cases.items():
+        samples = []
+        for i in range(n):
+            t = time.perf_counter()
+            fn(i)
+            samples.append((time.perf_counter() - t) * 1000)
+        out[name] = percentiles(samples)
+    plans = {
+        "board": conn.execute("EXPLAIN QUERY PLAN " + history.SQL_BOARD, (fns[0], 1, 10)).fetchall(),
+        "recent": conn.execute("EXPLAIN QUERY PLAN " + history.SQL_RECENT, (1, 50)).fetchall(),
+    }
+    conn.close()
+    return out, plans
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--users', type=int, default=10_000)
+    ap.add_argument('--plays', type=int, default=2_000_000)
+    ap.add_argument('--scores', type=int, default=1_000_000)
+    ap.add_argument('--events', type=int, default=2000)
+    ap.add_argument('--flushes', type=int, default=200)
+    ap.add_argument('--queries', type=int, default=2000)
+    args = ap.parse_args(argv)
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)   # noqa: F841  (이름에 묶어 두지 않으면 바로 지워진다)
+
+    root = tempfile.mkdtemp(prefix="history-bench-")
+    try:
+        path = os.path.join(root, "users.db")
+        t0 = time.perf_counter()
+        fill(path, args.users)
+        fns = fill_history(path, args.users, args.plays, args.scores)
+        print(f"fill {args.users} users, {args.plays} plays, {args.scores} scores: "
+              f"{time.perf_counter() - t0:.1f} s, {os.path.getsize(path) >> 20} MiB")
+
+        direct = bench_direct(path, fns, args.events)
+        database = db.Database(path)
+        gui, flush, per_flush, per_batch = bench_batched(database, fns, args.flushes)
+        database.close()
+        print(f"write per event  direct commit {direct:8.1f} us   "
+              f"batched: gui {gui:.2f} us + db {flush:.2f} us "
+              f"({per_flush:.2f} ms per flush of {per_batch:.0f} events)")
+
+        out, plans = bench_queries(path, args.users, fns, args.queries)
+        for name, p in out.items():
+            print(f"{name:<18} p50 {p['p50']:.3f}  p90 {p['p90']:.3f}  "
+                  f"p99 {p['p99']:.3f}  max {p['max']:.3f} ms")
+        for name, plan in plans.items():
+            print(f"plan {name:<7} " + " | ".join(row[-1] for row in plan))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
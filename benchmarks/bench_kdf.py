@@ -0,0 +1,95 @@
+# benchmarks/bench_kdf.py
+# 비밀번호 해시: 보정 결과, 비용(log2 N)별 확인 지연, 확인하는 동안 GUI 이벤트 루프가 멈추는 시간
+#   python -m benchmarks.bench_kdf --iters 30
+# 멈춤은 5 ms 타이머가 실제로 몇 ms 만에 다시 불렸는지로 잰다 (GUI 스레드에서 바로 확인 vs PasswordHasher).
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QEventLoop, QTimer
+from PyQt5.QtWidgets import QApplication
+
+from benchmarks.bench_auth import percentiles
+from music import passwords
+
+TICK_MS = 5
+
+
+def bench_verify(ln, iters):
+    stored = passwords.hash_password("pw", ln)
+    samples = []
+    for _ in range(iters):
+        t = time.perf_counter()
+        assert passwords.verify_password("pw", stored)
+        samples.append((time.perf_counter() - t) * 1000)
+    return percentiles(samples)
+
+
+def bench_stalls(app, hasher, stored, iters, on_gui_thread):
+    """iters 번 확인하는 동안 이벤트 루프 간격 (ms) 과 확인 한 번의 왕복 시간."""
+    gaps, rounds = [], []
+    last = [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        gaps.append((now - last[0]) * 1000)
+        last[0] = now
+    timer = QTimer()
+    timer.timeout.connect(tick)
+    timer.start(TICK_MS)
+    for _ in range(iters):
+        t = time.perf_counter()
+        if on_gui_thread:
+            passwords.verify_password("pw", stored)
+            app.processEvents()
+        else:
+            done = []
+            hasher.verify("pw", stored, on_done=done.append)
+            while not done:
+                app.processEvents(QEventLoop.AllEvents | QEventLoop.WaitForMoreEvents)
+            assert done[0][0]
+        rounds.append((time.perf_counter() - t) * 1000)
+    timer.stop()
+    return percentiles(gaps), percentiles(rounds)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--iters', type=int, default=30)
+    ap.add_argument('--target-ms', type=float, default=passwords.TARGET_MS)
+    args = ap.parse_args(argv)
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    t0 = time.perf_counter()
+    ln = passwords.calibrate(args.target_ms)
+    print(f"calibrate: target {args.target_ms:.0f} ms -> log2 N = {ln} "
+          f"({128 * passwords.R << ln >> 20} MiB)  took {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    legacy = hashlib.sha256(b"pw").hexdigest()
+    samples = []
+    for _ in range(args.iters * 100):
+        t = time.perf_counter()
+        passwords.verify_password("pw", legacy)
+        samples.append((time.perf_counter() - t) * 1000)
+    p = percentiles(samples)
+    print(f"{'legacy sha256':<14} p50 {p['p50']:8.3f}  p99 {p['p99']:8.3f} ms")
+    for k in range(passwords.LN_MIN, min(ln + 1, passwords.LN_MAX) + 1):
+        p = bench_verify(k, args.iters)
+        mark = "  <- calibrated" if k == ln else ""
+        print(f"scrypt N=2^{k:<5} p50 {p['p50']:8.1f}  p99 {p['p99']:8.1f} ms{mark}")
+
+    hasher = passwords.PasswordHasher(args.target_ms)
+    stored = passwords.hash_password("pw", hasher.cost())
+    for name, on_gui in (("gui thread", True), ("hasher", False)):
+        gaps, rounds = bench_stalls(app, hasher, stored, args.iters, on_gui)
+        print(f"verify on {name:<10}  event loop gap p50 {gaps['p50']:6.1f}  p99 {gaps['p99']:6.1f}  "
+              f"max {gaps['max']:6.1f} ms   verify round trip p50 {rounds['p50']:6.1f} ms")
+    hasher.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_loudness.py
+# 라우드니스 분석 처리량 (곡/분) — 한 프로세스 vs 프로세스 풀, 그리고 기준 신호 정확도
+#   python -m benchmarks.bench_loudness --tracks 24 --seconds 180
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from music.loudness import _analyze_item, analyze_many, analyze_wav
+
+
+def _write(path, x, rate):
+    pcm = (np.clip(x, -1, 1) * 32767).astype('<i2')
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(pcm.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+
+
+def make_library(root, n, seconds, rate=44100):
+    """곡마다 레벨이 다른 분홍빛 잡음 + 사인. 디코딩이 아니라 실제 샘플을 읽게 한다."""
+    rng = np.random.default_rng(0)
+    items = []
+    for i in range(n):
+        t = np.arange(seconds * rate) / rate
+        level = 10 ** (-(8 + i % 20) / 20)
+        noise = np.cumsum(rng.standard_normal((len(t), 2)), axis=0)
+        noise -= noise.mean(axis=0)
+        noise /= np.abs(noise).max()
+        x = level * (0.5 * noise + 0.5 * np.sin(2 * np.pi * 440 * t)[:, None])
+        fn = f"track{i:03d}.wav"
+        _write(os.path.join(root, fn), x, rate)
+        items.append((fn, os.path.join(root, fn)))
+    return items
+
+
+def check_accuracy(root):
+    """EBU Tech 3341 1번 기준: 1 kHz 사인 -23 dBFS 스테레오 → -23.0 LUFS (±0.1)."""
+    rate = 48000
+    t = np.arange(20 * rate) / rate
+    s = 10 ** (-23 / 20) * np.sin(2 * np.pi * 1000 * t)
+    path = os.path.join(root, "ebu-case1.wav")
+    _write(path, np.stack([s, s], axis=1), rate)
+    lufs = analyze_wav(path).lufs
+    assert abs(lufs + 23.0) <= 0.1, lufs
+    return lufs
+
+
+def bench_serial(items):
+    t0 = time.perf_counter()
+    for item in items:
+        _analyze_item(item)
+    return time.perf_counter() - t0
+
+
+def bench_pool(items, workers):
+    # 프로세스(spawn) 띄우는 시간까지 포함한다. 앱에서도 스캔마다 풀을 새로 만든다
+    t0 = time.perf_counter()
+    results = list(analyze_many(items, workers))
+    assert all(r is not None for _, r in results)
+    return time.perf_counter() - t0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--tracks', type=int, default=24)
+    ap.add_argument('--seconds', type=int, default=180)
+    ap.add_argument('--workers', type=int, default=os.cpu_count() or 4)
+    args = ap.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="loudness-bench-")
+    try:
+        print(f"EBU case 1: {check_accuracy(root):.2f} LUFS (expected -23.0)")
+        items = make_library(root, args.tracks, args.seconds)
+        audio_min = args.tracks * args.seconds / 60
+        serial = bench_serial(items)
+        pooled = bench_pool(items, args.workers)
+        for name, sec in (("serial", serial), (f"pool x{args.workers}", pooled)):
+            print(f"{name:<12} {args.tracks / sec * 60:8.0f} tracks/min"
+                  f"  {audio_min * 60 / sec:6.0f}x realtime  ({sec:.2f} s)")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# benchmarks/bench_queue.py
+# 재생 순서 엔진(PlayQueue): 무작위 조작 수만 번 동안 불변식 확인 + 10만 곡 목록에서 조작당 시간
+#   python -m benchmarks.bench_queue --tracks 100000 --ops 200000
+# 불변식: peek 는 played 전까지 같다 / 대기열은 넣은 순서대로 먼저 나온다 / 셔플 한 바퀴에
+# 모든 곡이 한 번씩 / back 은 지나온 곡으로, 그 뒤 next 는 원래 곡으로 / 대기열이 비면
+# 목록 순서의 다음 곡은 (행을 옮긴 뒤에도) 지금 곡 바로 아래 행.
+import argparse
+import random
+import sys
+import time
+
+from PyQt5.QtCore import QCoreApplication, QModelIndex
+
+from benchmarks.bench_auth import percentiles
+from music.playlist_model import PlaylistModel
+from music.playqueue import PlayQueue
+
+
+def make(n, seed):
+    model = PlaylistModel()
+    model.reset([f"track {i:06d}.wav" for i in range(n)])
+    return model, PlayQueue(model.fns, model.row_of, random.Random(seed))
+
+
+def random_move(model, rng):
+    n = len(model.fns)
+    count = rng.randint(1, min(5, n))
+    src = rng.randrange(n - count + 1)
+    dst = rng.randrange(n + 1)
+    if src <= dst <= src + count:
+        return False
+    return model.moveRows(QModelIndex(), src, count, QModelIndex(), dst)
+
+
+def fuzz(n, ops, seed, check_every=1):
+    """무작위 조작을 ops 번, 조작마다 불변식 확인 (O(n) 인 q.check() 는 check_every 번마다)."""
+    rng = random.Random(seed)
+    model, q = make(n, seed)
+    q.played(model.fns[0])
+    expect_up = []          # 대기열에서 나와야 할 순서 (앞에서부터)
+
+    def settle():
+        # 맨 앞이 지금 곡이면 PlayQueue 도 버린다
+        while expect_up and expect_up[0] == q.current:
+            expect_up.pop(0)
+    for k in range(ops):
+        op = rng.random()
+        settle()
+        if op < 0.45:
+            nxt = q.peek()
+            assert nxt == q.peek(), "peek changed without played"
+            if expect_up:
+                assert nxt == expect_up.pop(0), "queue order"
+            elif not q.forward and not q.shuffle:
+                row = model.row_of(q.current)
+                assert nxt == model.fns[(row + 1) % n], "linear next is not the next row"
+            prev = q.current
+            q.played(nxt)
+            if nxt != prev:
+                assert q.history[-1] == prev
+        elif op < 0.55:
+            before, hist = q.current, bool(q.history)
+            fn = q.back()
+            settle()
+            if hist and not expect_up:
+                assert q.forward[-1] == before and q.peek() == before, "next after back"
+            q.played(fn)
+        elif op < 0.62:
+            fn = rng.choice(model.fns)
+            if rng.random() < 0.5:
+                q.enqueue(fn)
+                expect_up.append(fn)
+            else:
+                q.play_next(fn)
+                expect_up.insert(0, fn)
+        elif op < 0.67:
+            fn = rng.choice(model.fns)
+            q.played(fn)
+            if expect_up and fn == expect_up[0]:
+                expect_up.pop(0)
+        elif op < 0.97:
+            random_move(model, rng)
+        elif op < 0.99:
+            q.set_shuffle(not q.shuffle)
+        else:
+            # 셔플 한 바퀴: 대기열/되돌아가기를 비우고 새로 켜서 n 번 다음 곡
+            expect_up.clear()
+            q.upnext.clear()
+            q.forward.clear()
+            q.set_shuffle(True)
+            seen = {q.current}
+            for _ in range(n - 1):
+                fn = q.peek(wrap=False)
+                assert fn not in seen, "shuffle repeated a track within a cycle"
+                seen.add(fn)
+                q.played(fn)
+            assert len(seen) == n and q.peek(wrap=False) is None
+            nxt = q.peek(wrap=True)
+            assert nxt is not None and (n == 1 or nxt != q.current), "new cycle starts with same track"
+        settle()
+        up = list(q.upnext)
+        while up and up[0] == q.current:
+            up.pop(0)
+        assert up == expect_up, "queue contents"
+        fn = model.fns[rng.randrange(n)]
+        assert model.fns[model.row_of(fn)] == fn
+        if k % check_every == 0:
+            q.check()
+    return ops
+
+
+def timed(fn, reps):
+    samples = []
+    for _ in range(reps):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1e6)
+    return percentiles(samples)
+
+
+def bench_ops(n, reps, seed):
+    rng = random.Random(seed)
+    model, q = make(n, seed)
+    q.played(model.fns[0])
+    out = {}
+
+    t = time.perf_counter()
+    q.set_shuffle(True)
+    out["shuffle on (O(n))"] = {"p50": (time.perf_counter() - t) * 1e6}
+    out["next shuffle"] = timed(lambda: q.played(q.peek()), reps)
+    out["back"] = timed(lambda: q.played(q.back()), reps)
+    out["next (forward)"] = timed(lambda: q.played(q.peek()), reps)
+    q.set_shuffle(False)
+    out["next linear"] = timed(lambda: q.played(q.peek()), reps)
+    out["enqueue"] = timed(lambda: q.enqueue(rng.choice(model.fns)), reps)
+    out["next (queued)"] = timed(lambda: q.played(q.peek()), reps)
+    out["jump (click)"] = timed(lambda: q.played(rng.choice(model.fns)), reps)
+    out["move (model) + next"] = timed(lambda: (random_move(model, rng), q.peek()), reps)
+    q.check()
+
+    # 비교: 셔플 순서를 목록으로 들고 있다가 행을 옮길 때마다 다시 만드는 방식
+    order = list(model.fns)
+    random.Random(seed).shuffle(order)
+
+    def naive_next():
+        i = order.index(q.current)
+        return order[(i + 1) % n]
+
+    def naive_move():
+        random_move(model, rng)
+        order[:] = sorted(order, key=model.row_of)     # 순서가 바뀌면 통째로 다시
+    out["naive next (index)"] = timed(naive_next, max(20, reps // 100))
+    out["naive move + rebuild"] = timed(naive_move, max(20, reps // 100))
+    return out
+
+
+def old_shuffle_repeats(n, draws, seed):
+    """예전 방식 (randrange) 으로 draws 곡을 틀 때 처음 겹칠 때까지 곡 수, 다른 곡 비율."""
+    rng = random.Random(seed)
+    seen, first = set(), None
+    for k in range(draws):
+        fn = rng.randrange(n)
+        if fn in seen and first is None:
+            first = k
+        seen.add(fn)
+    return first, len(seen) / draws
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--tracks', type=int, default=100_000)
+    ap.add_argument('--ops', type=int, default=200_000, help="불변식 확인용 무작위 조작 수 (작은 목록)")
+    ap.add_argument('--reps', type=int, default=20_000)
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args(argv)
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)   # noqa: F841  (이름에 묶어 두지 않으면 바로 지워진다)
+
+    t0 = time.perf_counter()
+    checked = 0
+    for n, seed in ((1, 1), (2, 2), (7, 3), (50, 4), (300, 5)):
+        checked += fuzz(n, args.ops // 5, args.seed + seed)
+    print(f"invariants: {checked} random ops on lists of 1..300 tracks OK "
+          f"({time.perf_counter() - t0:.1f} s)")
+    t0 = time.perf_counter()
+    fuzz(args.tracks, 2000, args.seed, check_every=200)
+    print(f"invariants: 2000 ops on {args.tracks} tracks OK ({time.perf_counter() - t0:.1f} s)")
+
+    for name, p in bench_ops(args.tracks, args.reps, args.seed).items():
+        rest = f"  p99 {p['p99']:9.2f}  max {p['max']:9.1f}" if "p99" in p else ""
+        print(f"{args.tracks} tracks  {name:<22} p50 {p['p50']:9.2f} us{rest}")
+
+    first, distinct = old_shuffle_repeats(args.tracks, args.tracks, args.seed)
+    print(f"old randrange shuffle: first repeat after {first} tracks, "
+          f"{distinct:.1%} distinct in {args.tracks} plays (PlayQueue: 100%)")
+
+
+if __name__ == "__main__":
+    main()
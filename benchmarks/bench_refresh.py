@@ -0,0 +1,110 @@
+# benchmarks/bench_refresh.py
+# 위치 보고마다 위젯을 바로 고치던 방식 vs RefreshScheduler (프레임당 한 번, 보이는 값이 바뀐 것만)
+#   python -m benchmarks.bench_refresh --seconds 10
+# 실제 시간으로 notify 간격마다 위치를 넣고, GUI 스레드 CPU 시간과 위젯 다시 그리기 횟수를 잰다.
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QEvent, QEventLoop, QObject, QTimer
+from PyQt5.QtWidgets import QApplication
+
+from benchmarks import run
+from music.playlist_model import ms_to_mmss
+
+DURATION_MS = 240_000
+
+
+class PaintCounter(QObject):
+    def __init__(self, widgets):
+        super().__init__()
+        self.count = 0
+        for w in widgets:
+            w.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            self.count += 1
+        return False
+
+
+def legacy_tick(w, pos):
+    """예전 _on_position_changed: 매번 모든 위젯을 고치고 플레이어에 다시 묻는다."""
+    w.slider.setValue(pos)
+    p, d = pos, DURATION_MS     # (예전엔 player.position()/duration() 을 다시 불렀다)
+    w.time_lbl.setText(f"{ms_to_mmss(p)} / {ms_to_mmss(d)}")
+    w.lyrics.set_position(pos)
+    w.waveform.set_position(pos)
+
+
+def drive(w, tick, interval_ms, seconds):
+    """실제 시간으로 interval_ms 마다 tick(위치). (GUI 스레드 CPU ms, 보고 수)."""
+    loop = QEventLoop()
+    timer = QTimer()
+    timer.setInterval(interval_ms)
+    t0 = time.perf_counter()
+    n = [0]
+
+    def step():
+        pos = int((time.perf_counter() - t0) * 1000) + 30_000
+        tick(pos)
+        n[0] += 1
+        if time.perf_counter() - t0 >= seconds:
+            timer.stop()
+            QTimer.singleShot(50, loop.quit)   # 마지막 프레임까지 그리게
+    timer.timeout.connect(step)
+    cpu0 = time.thread_time()
+    timer.start()
+    loop.exec_()
+    return (time.thread_time() - cpu0) * 1000, n[0]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--seconds', type=float, default=10)
+    args = ap.parse_args(argv)
+    app = QApplication.instance() or QApplication(sys.argv)   # noqa: F841  (이름에 묶어 두지 않으면 바로 지워진다)
+
+    root = tempfile.mkdtemp(prefix="refresh-bench-")
+    run.TRACK_SECONDS = DURATION_MS // 1000
+    try:
+        music_dir, lyrics_dir = run.make_library(root, 2)
+        w = run._open_window(root, music_dir, lyrics_dir)
+        run._settle()
+        w.play_track(0)
+        w.player.pause()
+        run._settle()
+        w.slider.setRange(0, DURATION_MS)
+        w.refresh.set_duration(DURATION_MS)
+        paints = PaintCounter([w.slider, w.time_lbl, w.lyrics.viewport(), w.waveform])
+        print(f"refresh period {w.refresh.period_ms:.1f} ms, lyrics timed {w.lyrics.timed}, "
+              f"waveform {w.waveform.width()} px, slider {w.slider.width()} px")
+
+        for interval in (20, 100):      # 게임 화면 / 시간 가사
+            for name, tick in (("per signal", lambda pos: legacy_tick(w, pos)),
+                               ("scheduler", w._on_position_changed)):
+                before = w.refresh.stats()
+                paints.count = 0
+                cpu, n = drive(w, tick, interval, args.seconds)
+                line = (f"notify {interval:>3} ms  {name:<10}  cpu {cpu / args.seconds:6.1f} ms/s  "
+                        f"ticks {n:4d}  paints {paints.count:5d}")
+                if name == "scheduler":
+                    after = w.refresh.stats()
+                    issued = after['issued'] - before['issued']
+                    skipped = after['skipped'] - before['skipped']
+                    line += (f"  frames {after['frames'] - before['frames']:4d}"
+                             f"  issued {issued:5d}  skipped {skipped:5d}")
+                print(line, flush=True)
+        print("per widget (issued, skipped):", w.refresh.stats()['widgets'])
+        w.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_replay.py
+# 리플레이: 이벤트당 바이트, 인코딩/디코딩 시간, 세션 수천 개 재채점 처리량 (한 프로세스 vs 프로세스 풀)
+#   python -m benchmarks.bench_replay --sessions 5000 --tracks 50
+import argparse
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+from music.chart import Chart
+from music.game import EXPIRE, Judge
+from music.replay import Replay, rescore, rescore_many
+
+
+def make_chart(rng, seconds=180):
+    times = np.cumsum(rng.integers(120, 450, seconds * 4))
+    times = times[times < seconds * 1000]
+    n = len(times)
+    return Chart(times, rng.integers(0, 4, n), np.full(n, 200), np.zeros(n), [0], [0],
+                 duration_ms=seconds * 1000)
+
+
+def play(rng, chart, skill):
+    """판정 오차 sigma=skill ms 로 치고 가끔 놓치는 세션 → (Replay, 라이브 점수)."""
+    judge, events, last = Judge(chart), [], 0
+    for t, lane in zip(chart.times_ms.tolist(), chart.lanes.tolist()):
+        if rng.random() < 0.9:
+            t = max(last, int(t + rng.normal(0, skill)))
+            events.append((t, lane))
+            judge.hit(lane, t)
+            last = t
+    events.append((last, EXPIRE))
+    judge.expire(last)
+    return Replay.from_inputs("ab" * 16, chart.analyzer, events, judge.score), judge.score
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sessions', type=int, default=5000)
+    ap.add_argument('--tracks', type=int, default=50)
+    ap.add_argument('--workers', type=int, default=os.cpu_count() or 4)
+    args = ap.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    charts = [make_chart(rng) for _ in range(args.tracks)]
+    sessions = [[] for _ in charts]
+    expected = {}
+    for sid in range(args.sessions):
+        k = sid % len(charts)
+        rep, score = play(rng, charts[k], skill=rng.uniform(10, 60))
+        sessions[k].append((sid, rep.to_bytes()))
+        expected[sid] = score
+
+    blobs = [b for s in sessions for _, b in s]
+    events = sum(len(Replay.from_bytes(b)) for b in blobs)
+    raw = sum(len(b) for b in blobs)
+    # 비교: (float64 시각, uint8 코드) 고정 길이, GamePage.inputs 를 그대로 JSON 으로
+    fixed = events * struct.calcsize('<dB')
+    sample = Replay.from_bytes(blobs[0])
+    as_json = len(json.dumps(list(zip(sample.times_ms.tolist(), sample.codes.tolist()))))
+    print(f"{args.sessions} sessions, {events} events: replay {raw / events:.2f} B/event "
+          f"(header {struct.calcsize('<4sHH16sdIII')} B), fixed <dB {fixed / events:.0f} B/event, "
+          f"json {as_json / len(sample):.1f} B/event")
+
+    t0 = time.perf_counter()
+    decoded = [Replay.from_bytes(b) for b in blobs]
+    t1 = time.perf_counter()
+    for r in decoded:
+        r.to_bytes()
+    t2 = time.perf_counter()
+    print(f"decode {(t1 - t0) / len(blobs) * 1e6:.1f} us/session  "
+          f"encode {(t2 - t1) / len(blobs) * 1e6:.1f} us/session")
+
+    jobs = [(c.to_bytes(), s) for c, s in zip(charts, sessions)]
+    for name, workers in (("serial", 1), (f"pool x{args.workers}", args.workers)):
+        # 풀은 프로세스(spawn) 띄우는 시간까지 포함한다. CLI 도 실행마다 풀을 새로 만든다
+        t0 = time.perf_counter()
+        results = dict(rescore_many(jobs, workers))
+        sec = time.perf_counter() - t0
+        assert all(results[sid][0] == expected[sid] for sid in expected), "replay does not reproduce"
+        print(f"rescore {name:<10} {args.sessions / sec:8.0f} sessions/s  ({sec:.2f} s)")
+    # 한 세션 재채점 자체의 비용 (첫 곡의 세션들)
+    first = decoded[:len(sessions[0])]
+    t0 = time.perf_counter()
+    for r in first:
+        rescore(r, charts[0])
+    print(f"rescore one session: {(time.perf_counter() - t0) / len(first) * 1000:.2f} ms "
+          f"({len(first[0])} events)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_search.py
+# 1만 곡(제목 + 가사) 색인 생성 시간과 검색 지연: 전체 부분 문자열 검사 vs n-gram 역색인
+#   python -m benchmarks.bench_search --tracks 10000
+import argparse
+import random
+import time
+
+from benchmarks.bench_auth import percentiles
+from music.search import IncrementalSearch, SearchIndex, normalize
+
+
+
+def make_words(rng, n=3000):
+    # 완성형 한글 음절을 섞어 만든 어휘 (실제 가사처럼 2-gram 이 고르게 퍼진다)
+    syl = lambda: chr(0xAC00 + rng.randrange(11172))
+    return ["".join(syl() for _ in range(rng.randint(1, 4))) for _ in range(n)]
+
+
+def make_docs(n, rng, words):
+    docs = {}
+    for i in range(n):
+        title = " ".join(rng.choice(words) for _ in range(rng.randint(1, 3))) + f" {i}"
+        lines = [" ".join(rng.choice(words) for _ in range(rng.randint(2, 5)))
+                 for _ in range(40)]
+        docs[f"{i:05d}.mp3"] = (title, "\n".join(lines))
+    return docs
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--tracks', type=int, default=10_000)
+    ap.add_argument('--queries', type=int, default=500)
+    args = ap.parse_args(argv)
+
+    rng = random.Random(0)
+    words = make_words(rng)
+    docs = make_docs(args.tracks, rng, words)
+
+    t0 = time.perf_counter()
+    index = SearchIndex()
+    for key, (title, lyrics) in docs.items():
+        index.add(key, title, lyrics)
+    print(f"index {args.tracks} tracks: {(time.perf_counter() - t0) * 1000:.0f} ms, "
+          f"{len(index.postings)} grams")
+
+    # 입력하듯이 한 글자씩 늘어나는 검색어
+    queries = [rng.choice(words) + " " + rng.choice(words) for _ in range(args.queries)]
+    typed = [q[:k] for q in queries for k in range(1, len(q) + 1)]
+
+    scan, indexed, incremental = [], [], []
+    bodies = {k: normalize(f"{t} {l}") for k, (t, l) in docs.items()}
+    for q in typed[:len(typed) // 10]:
+        t = time.perf_counter()
+        [k for k, b in bodies.items() if all(w in b for w in q.split())]
+        scan.append((time.perf_counter() - t) * 1000)
+    for q in typed:
+        t = time.perf_counter()
+        index.search(q)
+        indexed.append((time.perf_counter() - t) * 1000)
+    search = IncrementalSearch(index)
+    for q in queries:
+        search.reset()
+        for k in range(1, len(q) + 1):
+            t = time.perf_counter()
+            search(q[:k])
+            incremental.append((time.perf_counter() - t) * 1000)
+
+    for name, samples in (("linear scan", scan), ("n-gram index", indexed),
+                          ("incremental", incremental)):
+        p = percentiles(samples)
+        print(f"{name:<14} p50 {p['p50']:.3f}  p90 {p['p90']:.3f}  "
+              f"p99 {p['p99']:.3f}  max {p['max']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_visuals.py
+# 비주얼 렌더링: 화면 크기별 프레임 시간, 예산 초과 수, 품질 단계 조정, 반복 박자에서의 캐시 적중률
+#   python -m benchmarks.bench_visuals --seconds 20
+# 30 fps 로 돌린다고 보고 프레임마다 위치를 1/30 초씩 옮긴다 (실제로 기다리지는 않는다).
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_auth import percentiles
+from music import visuals
+from music.visuals import TARGET_FPS, VisualRenderer, beat_pulse, default_background
+
+SIZES = ((640, 360), (1280, 720), (1920, 1080))
+
+
+def beat_track(seconds, bpm=120):
+    """4박 패턴(강-약-중-약)을 되풀이하는 온셋 목록."""
+    step = 60000.0 / bpm
+    times = np.arange(0, seconds * 1000, step)
+    strengths = np.array([255, 110, 180, 110], dtype='u1')[np.arange(len(times)) % 4]
+    return times, strengths
+
+
+def run(size, seconds, cache_frames, hue_speed):
+    w, h = size
+    r = VisualRenderer(cache_frames=cache_frames)
+    r.set_image(default_background(1600, 1600))
+    times, strengths = beat_track(seconds)
+    frame_ms = []
+    for i in range(seconds * TARGET_FPS):
+        pos = i * 1000.0 / TARGET_FPS
+        pulse = beat_pulse(times, strengths, pos)
+        t0 = time.perf_counter()
+        r.frame(w, h, *VisualRenderer.params(pulse, hue_speed * pos / 1000 % 360 + 30 * pulse))
+        frame_ms.append((time.perf_counter() - t0) * 1000)
+    return r.stats(), percentiles(frame_ms)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--seconds', type=int, default=20)
+    ap.add_argument('--hue-speed', type=float, default=0.0,
+                    help="초당 색상 회전 (도). 0 이면 박자만 바뀌어 패턴이 그대로 반복된다")
+    args = ap.parse_args(argv)
+    if not visuals.AVAILABLE:
+        raise SystemExit("opencv-python-headless 가 필요합니다")
+
+    print(f"budget {visuals.BUDGET_MS} ms/frame, {args.seconds} s @ {TARGET_FPS} fps")
+    for size in SIZES:
+        for cache_frames, name in ((visuals.CACHE_FRAMES, "cache"), (0, "no cache")):
+            s, p = run(size, args.seconds, cache_frames, args.hue_speed)
+            frames = args.seconds * TARGET_FPS
+            print(f"{size[0]:>4}x{size[1]:<4} {name:<8}  frame p50 {p['p50']:6.2f} ms  "
+                  f"p99 {p['p99']:6.2f} ms  rendered {s['rendered']:5d}/{frames}  "
+                  f"hit {s['cache_hits'] / frames:5.1%}  over budget {s['budget_misses']:4d}  "
+                  f"scale {s['scale']:.2f} (-{s['downgrades']} +{s['upgrades']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# benchmarks/run.py
+# 화면 없이(Qt offscreen) MainWindow 를 띄워 핫 패스 지연을 재고 JSON 으로 남긴다
+#   python -m benchmarks.run --tracks 2000 --out benchmarks/results/latest.json
+#   python -m benchmarks.run --baseline benchmarks/results/base.json   # 기준 대비 비교
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QEventLoop, QModelIndex, QThreadPool, QT_VERSION_STR
+from PyQt5.QtWidgets import QApplication, QDialog
+
+from benchmarks.bench_auth import fill, percentiles
+from benchmarks.bench_probe import _write_wav
+from music.catalog import BASE_DIR
+
+RESULTS_DIR = os.path.join(BASE_DIR, 'benchmarks', 'results')
+TRACK_SECONDS = 2       # 차트/피크 생성이 측정을 방해하지 않도록 짧게
+LYRIC_LINES = 60
+
+
+def make_library(root, n):
+    music_dir = os.path.join(root, 'music')
+    lyrics_dir = os.path.join(root, 'lyrics')
+    os.makedirs(music_dir)
+    os.makedirs(lyrics_dir)
+    step = TRACK_SECONDS * 1000 // LYRIC_LINES
+    for i in range(n):
+        title = f"track {i:05d}"
+        _write_wav(os.path.join(music_dir, f"{title}.wav"), TRACK_SECONDS, rate=22050)
+        with open(os.path.join(lyrics_dir, f"{title}.lrc"), 'w', encoding='utf-8') as f:
+            for k in range(LYRIC_LINES):
+                ms = k * step
+                f.write(f"[{ms // 60000:02d}:{ms // 1000 % 60:02d}.{ms % 1000 // 10:02d}]"
+                        f"가사 {k} 번째 줄 line {k}\n")
+    return music_dir, lyrics_dir
+
+
+def _open_window(root, music_dir, lyrics_dir):
+    from music import db
+    from music.cache import DerivedCache
+    from music.catalog import TrackCatalog
+    from music.history import HistoryRecorder
+    from music.window import MainWindow
+    catalog = TrackCatalog(os.path.join(root, 'library.db'), music_dir, lyrics_dir, bundle_path=None)
+    cache = DerivedCache(os.path.join(root, 'cache'))
+    history = HistoryRecorder("bench", db.get_database(os.path.join(root, 'users.db')))
+    w = MainWindow("bench", catalog=catalog, cache=cache, history=history)
+    w.show()
+    QApplication.processEvents()
+    return w
+
+
+def _window(ctx):
+    # 시작 시간 측정(콜드)이 색인/캐시를 지우므로, 창은 처음 필요할 때 연다
+    if 'window' not in ctx:
+        ctx['window'] = _open_window(ctx['root'], ctx['music_dir'], ctx['lyrics_dir'])
+        _settle()
+    return ctx['window']
+
+
+def _settle():
+    # 백그라운드 작업(메타데이터, 차트, 피크) 결과까지 받은 뒤에 다음 표본을 잰다
+    QThreadPool.globalInstance().waitForDone()
+    QApplication.processEvents()
+
+
+# ── 각 항목: 표본(ms) 목록을 돌려준다 ──
+def bench_startup(ctx, cold):
+    samples = []
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    cmd = [sys.executable, '-m', 'benchmarks.run', '--child-startup', ctx['root'],
+           ctx['music_dir'], ctx['lyrics_dir']]
+    if not cold:
+        subprocess.run(cmd, env=env, cwd=BASE_DIR, check=True, capture_output=True)
+    for _ in range(ctx['runs']):
+        if cold:
+            shutil.rmtree(os.path.join(ctx['root'], 'cache'), ignore_errors=True)
+            for suffix in ('', '-wal', '-shm', '-journal'):
+                try:
+                    os.remove(os.path.join(ctx['root'], 'library.db' + suffix))
+                except FileNotFoundError:
+                    pass
+        out = subprocess.run(cmd, env=env, cwd=BASE_DIR, check=True,
+                             capture_output=True, text=True).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1])['total_ms'])
+    return samples
+
+
+def child_startup(root, music_dir, lyrics_dir):
+    t0 = time.perf_counter()
+    app = QApplication(sys.argv)
+    import music.window   # noqa: F401  (import 시간도 시작 시간에 포함)
+    t_import = time.perf_counter()
+    w = _open_window(root, music_dir, lyrics_dir)
+    t_ready = time.perf_counter()
+    w.close()
+    del app
+    print(json.dumps({"import_ms": (t_import - t0) * 1000,
+                      "total_ms": (t_ready - t0) * 1000}))
+
+
+def bench_play_track(ctx):
+    w = _window(ctx)
+    n = len(w.playlist)
+    rng = random.Random(1)
+    samples = []
+    for _ in range(ctx['iters']):
+        _settle()
+        idx = rng.randrange(n)
+        t = time.perf_counter()
+        w.play_track(idx)
+        QApplication.processEvents()
+        samples.append((time.perf_counter() - t) * 1000)
+    return samples
+
+
+def bench_position_tick(ctx):
+    w = _window(ctx)
+    w.play_track(0)
+    _settle()
+    samples = []
+    dur = TRACK_SECONDS * 1000
+    for k in range(ctx['iters'] * 10):
+        pos = k * 20 % dur
+        t = time.perf_counter()
+        w._on_position_changed(pos)
+        QApplication.processEvents()
+        samples.append((time.perf_counter() - t) * 1000)
+    return samples
+
+
+def bench_rows_moved(ctx):
+    w = _window(ctx)
+    _settle()
+    # 파일이 없어도 되는 합성 항목으로 큰 재생 목록을 만든다 (재생 중인 곡은 포함)
+    fns = [w.player_fn] + [f"synthetic {i:06d}.wav" for i in range(ctx['rows'] - 1)]
+    w.model.reset(fns)
+    w.current_index = w.model.row_of(w.player_fn)
+    rng = random.Random(2)
+    n = len(fns)
+    samples = []
+    for _ in range(ctx['iters'] * 5):
+        src = rng.randrange(n)
+        dst = rng.randrange(n + 1)
+        if src <= dst <= src + 1:
+            continue
+        t = time.perf_counter()
+        w.model.moveRows(QModelIndex(), src, 1, QModelIndex(), dst)
+        QApplication.processEvents()
+        samples.append((time.perf_counter() - t) * 1000)
+    w._load_playlist()
+    return samples
+
+
+def bench_login(ctx):
+    from music import db, passwords
+    from music.auth_dialog import AuthDialog
+    path = os.path.join(ctx['root'], 'users.db')
+    fill(path, ctx['users'])
+    db.get_database(path)
+    dlg = AuthDialog()
+    rng = random.Random(3)
+    samples = []
+    for _ in range(ctx['iters']):
+        dlg.setResult(0)
+        dlg.login_user.setText(f"user{rng.randrange(ctx['users']):06d}")
+        dlg.login_pwd.setText("pw")
+        passwords.get_hasher().wait()   # 지난 로그인의 sha256 -> scrypt 바꿔 쓰기는 빼고 잰다
+        t = time.perf_counter()
+        dlg.btn_login.click()
+        while dlg.result() != QDialog.Accepted:
+            QApplication.processEvents(QEventLoop.AllEvents | QEventLoop.WaitForMoreEvents)
+        samples.append((time.perf_counter() - t) * 1000)
+    return samples
+
+
+CASES = {
+    "startup_cold": lambda ctx: bench_startup(ctx, cold=True),
+    "startup_warm": lambda ctx: bench_startup(ctx, cold=False),
+    "play_track": bench_play_track,
+    "position_tick": bench_position_tick,
+    "rows_moved": bench_rows_moved,
+    "login": bench_login,
+}
+
+
+def summarize(samples):
+    p = percentiles(samples)
+    return {"n": len(samples), "mean": sum(samples) / len(samples), **p}
+
+
+def compare(results, baseline, tolerance):
+    """p50 이 기준보다 tolerance 이상 느려진 항목 이름 목록."""
+    regressions = []
+    print(f"\n{'vs baseline':<14} {'p50':>10} {'base':>10} {'change':>9}")
+    for name, r in results.items():
+        b = baseline.get("results", {}).get(name)
+        if b is None:
+            continue
+        change = r["p50"] / b["p50"] - 1 if b["p50"] else 0.0
+        flag = ""
+        if change > tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<14} {r['p50']:>10.3f} {b['p50']:>10.3f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--tracks', type=int, default=2000)
+    ap.add_argument('--rows', type=int, default=50_000, help="rows_moved 재생 목록 크기")
+    ap.add_argument('--users', type=int, default=100_000)
+    ap.add_argument('--iters', type=int, default=200)
+    ap.add_argument('--runs', type=int, default=5, help="시작 시간 측정 횟수 (프로세스 단위)")
+    ap.add_argument('--only', help="쉼표로 구분한 항목 이름")
+    ap.add_argument('--out', default=os.path.join(RESULTS_DIR, 'latest.json'))
+    ap.add_argument('--baseline')
+    ap.add_argument('--tolerance', type=float, default=0.10)
+    ap.add_argument('--child-startup', nargs=3, metavar=('ROOT', 'MUSIC', 'LYRICS'),
+                    help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child_startup:
+        return child_startup(*args.child_startup)
+
+    names = args.only.split(',') if args.only else list(CASES)
+    unknown = set(names) - CASES.keys()
+    if unknown:
+        ap.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    root = tempfile.mkdtemp(prefix="music-bench-")
+    results = {}
+    try:
+        music_dir, lyrics_dir = make_library(root, args.tracks)
+        ctx = {"root": root, "music_dir": music_dir, "lyrics_dir": lyrics_dir,
+               "iters": args.iters, "runs": args.runs, "rows": args.rows, "users": args.users}
+        for name in names:
+            r = results[name] = summarize(CASES[name](ctx))
+            print(f"{name:<14} n {r['n']:>5}  p50 {r['p50']:.3f}  p90 {r['p90']:.3f}  "
+                  f"p99 {r['p99']:.3f}  max {r['max']:.3f} ms", flush=True)
+        if 'window' in ctx:
+            ctx['window'].close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    del app
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "platform": platform.platform(),
+            "tracks": args.tracks, "rows": args.rows, "users": args.users,
+            "iters": args.iters, "runs": args.runs,
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"saved {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,4 @@
 # games/auth_dialog.py
-import os
-import sqlite3
-import hashlib
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from PyQt5.QtWidgets import (
@@ -9,20 +6,7 @@ from PyQt5.QtWidgets import (
     QPushButton, QVBoxLayout, QLabel, QDialogButtonBox,
     QMessageBox
 )
-
-DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'users.db')
-
-def get_db_connection():
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE,
-            password_hash TEXT
-        )
-    """)
-    return conn
+from music import db, passwords, trace
 
 class AuthDialog(QDialog):
     def __init__(self):
@@ -112,6 +96,7 @@ class AuthDialog(QDialog):
         lay.addStretch(1)
         return w
 
+    @trace.traced()
     def _do_login(self):
         u = self.login_user.text().strip()
         p = self.login_pwd.text().strip()
@@ -119,17 +104,49 @@ class AuthDialog(QDialog):
             QMessageBox.warning(self, "Error", "Both fields are required.")
             return
 
-        conn = get_db_connection()
-        cur  = conn.cursor()
-        cur.execute("SELECT password_hash FROM users WHERE username = ?", (u,))
-        row = cur.fetchone()
-        conn.close()
+        # DB 조회는 작업 스레드에서: 느린 디스크/잠긴 DB 에도 창이 멈추지 않는다
+        self.btn_login.setEnabled(False)
+        t0 = trace.now()
+        db.get_database().submit(
+            db.password_hash, u,
+            on_done=lambda stored: self._on_login_result(stored, u, p, t0),
+            on_error=self._on_db_error,
+        )
 
-        if row and row[0] == hashlib.sha256(p.encode()).hexdigest():
-            self.accept()
-        else:
-            QMessageBox.critical(self, "Failed", "Invalid username or password.")
+    @trace.traced()
+    def _on_login_result(self, stored, u, p, t0=None):
+        if not stored:
+            self._on_verified((False, False), u, p, stored, t0)
+            return
+        # 해시 확인(수백 ms)도 작업 스레드에서
+        passwords.get_hasher().verify(
+            p, stored,
+            on_done=lambda result: self._on_verified(result, u, p, stored, t0),
+            on_error=self._on_db_error,
+        )
 
+    @trace.traced()
+    def _on_verified(self, result, u, p, stored, t0=None):
+        if t0 is not None and trace.enabled:
+            trace.complete("login round trip", 'db', t0)
+        self.btn_login.setEnabled(True)
+        ok, upgrade = result
+        if not ok:
+            QMessageBox.critical(self, "Failed", "Invalid username or password.")
+            return
+        if upgrade:
+            # 예전 sha256 (또는 지금보다 싼) 해시: 로그인은 바로 받고 새 해시는 뒤에서 바꿔 쓴다
+            database = db.get_database()
+            passwords.get_hasher().hash(
+                p, on_done=lambda h: database.submit(db.rehash_user, u, stored, h))
+        self.accept()
+
+    def _on_db_error(self, e):
+        self.btn_login.setEnabled(True)
+        self.btn_register.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Database error: {e}")
+
+    @trace.traced()
     def _do_signup(self):
         u  = self.sign_user.text().strip()
         p  = self.sign_pwd.text().strip()
@@ -141,17 +158,21 @@ class AuthDialog(QDialog):
             QMessageBox.warning(self, "Error", "Passwords do not match.")
             return
 
-        h = hashlib.sha256(p.encode()).hexdigest()
-        try:
-            conn = get_db_connection()
-            cur  = conn.cursor()
-            cur.execute(
-                "INSERT INTO users(username,password_hash) VALUES(?,?)",
-                (u, h)
-            )
-            conn.commit()
-            conn.close()
-        except sqlite3.IntegrityError:
+        self.btn_register.setEnabled(False)
+        passwords.get_hasher().hash(
+            p,
+            on_done=lambda h: db.get_database().submit(
+                db.create_user, u, h,
+                on_done=self._on_signup_result,
+                on_error=self._on_db_error,
+            ),
+            on_error=self._on_db_error,
+        )
+
+    @trace.traced()
+    def _on_signup_result(self, created):
+        self.btn_register.setEnabled(True)
+        if not created:
             QMessageBox.critical(self, "Error", "Username already exists.")
             return
 
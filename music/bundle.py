@@ -0,0 +1,469 @@
+# music/bundle.py
+# 앨범 한 장을 파일 하나로 묶은 번들: 맨 앞 헤더 + 색인(JSON) 뒤에 곡/가사/차트/아트워크가 이어진다.
+# 한 번 메모리 맵으로 열어 두고 항목은 memoryview 조각으로 읽는다 (복사 없음).
+#   python -m music.bundle pack [-o assets/album.mqa] [--charts]
+#   python -m music.bundle unpack assets/album.mqa out/
+#   python -m music.bundle verify assets/album.mqa
+#   python -m music.bundle list assets/album.mqa
+import argparse
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+FORMAT_VERSION = 1
+ALIGN = 64
+_MAGIC = b'MQALBUM\0'
+_HEADER = struct.Struct('<8sHHI16s')   # magic, version, reserved, index_size, index_digest
+_HASH_CHUNK = 1 << 20
+READAHEAD = 256 << 10      # EntryReader 가 앞서 읽어 두라고 알리는 양
+
+# (섹션 = 항목 이름 앞부분이자 assets 아래 폴더 이름, 확장자). 작은 것부터 앞에 두어 시작할 때 읽는 범위를 모은다
+SECTIONS = (
+    ('lyrics', ('.txt', '.lrc')),
+    ('charts', ('.chart',)),
+    ('art', ('.jpg', '.jpeg', '.png')),
+    ('music', ('.mp3', '.wav')),
+)
+
+
+def _digest():
+    # DerivedCache 와 같은 해시라서 번들 항목은 캐시 키를 따로 계산하지 않는다
+    return hashlib.blake2b(digest_size=16)
+
+
+class BundleEntry:
+    """번들 안의 파일 하나. 경로 대신 넘길 수 있고, 프로세스 풀로 보내면 그쪽에서 다시 연다."""
+    __slots__ = ('bundle', 'name', 'offset', 'size', 'mtime_ns', 'digest')
+
+    def __init__(self, bundle, name, offset, size, mtime_ns, digest):
+        self.bundle = bundle
+        self.name = name
+        self.offset = offset
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.digest = digest
+
+    @property
+    def basename(self):
+        return self.name.rsplit('/', 1)[-1]
+
+    def view(self):
+        return self.bundle._view[self.offset:self.offset + self.size]
+
+    def read(self):
+        self.prefetch()
+        return bytes(self.view())
+
+    def prefetch(self):
+        """통째로 읽기 전에 부른다."""
+        self.bundle.prefetch(self.offset, self.size)
+
+    def open(self):
+        return EntryReader(self.view(), self.name, self.bundle, self.offset)
+
+    def __reduce__(self):
+        return _reopen_entry, (self.bundle.path, self.name)
+
+    def __repr__(self):
+        return f"<BundleEntry {self.name} ({self.size} bytes)>"
+
+
+def _reopen_entry(path, name):
+    return open_bundle(path).entry(name)
+
+
+class EntryReader(io.RawIOBase):
+    """항목 memoryview 위의 읽기 전용 파일 객체 (wave.open 등에 그대로 넘긴다).
+    맵은 MADV_RANDOM 이라 커널이 앞서 읽지 않으므로, 파일 read() 처럼 읽는 자리 앞을 직접 알린다."""
+
+    def __init__(self, view, name='', bundle=None, offset=0):
+        super().__init__()
+        self._view = view
+        self._pos = 0
+        self._ra_end = 0
+        self._bundle = bundle
+        self._offset = offset
+        self.name = name
+
+    def _readahead(self, end):
+        if self._bundle is not None and end > self._ra_end:
+            self._ra_end = min(len(self._view), max(end, self._pos + READAHEAD))
+            self._bundle.prefetch(self._offset + self._pos, self._ra_end - self._pos)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, pos, whence=io.SEEK_SET):
+        self._ra_end = 0
+        if whence == io.SEEK_CUR:
+            pos += self._pos
+        elif whence == io.SEEK_END:
+            pos += len(self._view)
+        if pos < 0:
+            raise ValueError("negative seek position")
+        self._pos = pos
+        return pos
+
+    def readinto(self, b):
+        self._readahead(self._pos + len(b))
+        chunk = self._view[self._pos:self._pos + len(b)]
+        n = len(chunk)
+        b[:n] = chunk
+        self._pos += n
+        return n
+
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else self._pos + size
+        self._readahead(end)
+        chunk = self._view[self._pos:end]
+        self._pos += len(chunk)
+        return bytes(chunk)
+
+
+class BundleDir:
+    """번들의 한 섹션을 폴더처럼 쓴다. 가사 폴더 경로 대신 load_lyrics 등에 넘긴다."""
+
+    def __init__(self, bundle, section):
+        self.bundle = bundle
+        self.prefix = f"{section}/"
+
+    def names(self):
+        n = len(self.prefix)
+        return [name[n:] for name in self.bundle.names(self.prefix)]
+
+    def entry(self, name):
+        return self.bundle.entry(self.prefix + name)
+
+    def read_text(self, name):
+        """없으면 None."""
+        entry = self.entry(name)
+        return None if entry is None else str(entry.view(), 'utf-8')
+
+    def read_bytes(self, name):
+        """맵 위의 memoryview (복사 없음). 없으면 None."""
+        entry = self.entry(name)
+        return None if entry is None else entry.view()
+
+
+class AlbumBundle:
+    """열 때 헤더와 색인만 읽고 검사한다. 항목 내용은 verify() 에서 확인한다."""
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # 곡 하나를 읽는데 이웃 항목까지 크게 읽어 오지 않도록. 필요한 만큼은 prefetch() 로 알린다
+        # (madvise 는 유닉스에만 있다. 없으면 커널 기본 앞서 읽기로 둔다)
+        if hasattr(mmap, 'MADV_RANDOM'):
+            self._mm.madvise(mmap.MADV_RANDOM)
+        self._view = memoryview(self._mm)
+        if len(self._mm) < _HEADER.size:
+            raise ValueError("not an album bundle")
+        magic, ver, _, index_size, index_digest = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or ver != FORMAT_VERSION:
+            raise ValueError("not an album bundle")
+        raw = self._view[_HEADER.size:_HEADER.size + index_size]
+        h = _digest()
+        h.update(raw)
+        if len(raw) != index_size or h.digest() != index_digest:
+            raise ValueError("album bundle index is corrupted")
+        index = json.loads(str(raw, 'utf-8'))
+        self._entries = {}
+        for name, offset, size, mtime_ns, digest in index['entries']:
+            if offset + size > len(self._mm):
+                raise ValueError(f"album bundle is truncated ({name})")
+            self._entries[name] = BundleEntry(self, name, offset, size, mtime_ns, digest)
+        self.created = index.get('created')
+        self.lyrics = BundleDir(self, 'lyrics')
+        self.art = BundleDir(self, 'art')
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def entry(self, name):
+        return self._entries.get(name)
+
+    def names(self, prefix=''):
+        return [name for name in self._entries if name.startswith(prefix)]
+
+    def entries(self, prefix=''):
+        return [e for name, e in self._entries.items() if name.startswith(prefix)]
+
+    def view(self, name):
+        return self._entries[name].view()
+
+    def prefetch(self, offset, size):
+        """[offset, offset+size) 를 곧 읽는다고 커널에 알린다 (비동기)."""
+        if not hasattr(mmap, 'MADV_WILLNEED'):
+            return
+        start = offset - offset % mmap.PAGESIZE
+        self._mm.madvise(mmap.MADV_WILLNEED, start, min(offset + size, len(self._mm)) - start)
+
+    def verify(self):
+        """내용 해시가 색인과 다른 항목 이름 목록 (비어 있으면 정상)."""
+        bad = []
+        for e in self._entries.values():
+            e.prefetch()
+            h = _digest()
+            view = e.view()
+            for i in range(0, e.size, _HASH_CHUNK):
+                h.update(view[i:i + _HASH_CHUNK])
+            if h.hexdigest() != e.digest:
+                bad.append(e.name)
+        return bad
+
+    def close(self):
+        # 밖으로 내준 memoryview 가 남아 있으면 맵을 닫을 수 없다. 그때는 GC 에 맡긴다
+        self._view.release()
+        try:
+            self._mm.close()
+        except BufferError:
+            pass
+
+
+_open = {}
+_open_lock = threading.Lock()
+
+
+def open_bundle(path):
+    """경로마다 한 번만 연다 (작업 스레드·프로세스에서 같이 쓴다)."""
+    key = os.path.abspath(path)
+    with _open_lock:
+        bundle = _open.get(key)
+        if bundle is None:
+            bundle = _open[key] = AlbumBundle(key)
+        return bundle
+
+
+# ── 경로 또는 BundleEntry 를 받는 곳에서 쓰는 도우미 ──
+def source_name(src):
+    return os.path.basename(src) if isinstance(src, str) else src.basename
+
+
+def source_size(src):
+    return os.path.getsize(src) if isinstance(src, str) else src.size
+
+
+def open_binary(src):
+    return open(src, 'rb') if isinstance(src, str) else src.open()
+
+
+def open_wav(src):
+    return wave.open(src if isinstance(src, str) else src.open(), 'rb')
+
+
+def read_text(folder, name):
+    """folder 는 폴더 경로 또는 BundleDir. 없으면 None."""
+    if not isinstance(folder, str):
+        return folder.read_text(name)
+    try:
+        with open(os.path.join(folder, name), encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def read_bytes(folder, name):
+    """folder 는 폴더 경로 또는 BundleDir. 없으면 None."""
+    if not isinstance(folder, str):
+        return folder.read_bytes(name)
+    try:
+        with open(os.path.join(folder, name), 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+# ── 묶기 / 풀기 ──
+def _collect(dirs):
+    """dirs: {섹션: 폴더} → [(항목 이름, 원본 경로, stat)]."""
+    files = []
+    for section, exts in SECTIONS:
+        root = dirs.get(section)
+        if not root or not os.path.isdir(root):
+            continue
+        for fn in sorted(os.listdir(root)):
+            path = os.path.join(root, fn)
+            if fn.lower().endswith(exts) and os.path.isfile(path):
+                files.append((f"{section}/{fn}", path, os.stat(path)))
+    return files
+
+
+def _file_digest(path):
+    h = _digest()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def pack(dirs, out_path, extra=()):
+    """dirs: {섹션: 폴더}, extra: [(항목 이름, bytes)] (예: 새로 만든 차트).
+    색인을 맨 앞에 두려고 해시를 먼저 다 구한 뒤 한 번 더 읽으며 쓴다."""
+    sources = [(name, path, st.st_size, st.st_mtime_ns, _file_digest(path))
+               for name, path, st in _collect(dirs)]
+    now = time.time_ns()
+    for name, data in extra:
+        h = _digest()
+        h.update(data)
+        sources.append((name, data, len(data), now, h.hexdigest()))
+    order = {section: i for i, (section, _) in enumerate(SECTIONS)}
+    sources.sort(key=lambda s: (order.get(s[0].split('/', 1)[0], len(order)), s[0]))
+
+    # 색인 크기가 오프셋에 따라 달라지므로 자리 수가 안 바뀔 때까지 맞춘다
+    data_start = 0
+    while True:
+        entries, off = [], data_start
+        for name, _, size, mtime_ns, digest in sources:
+            entries.append([name, off, size, mtime_ns, digest])
+            off = _align(off + size)
+        index = json.dumps({"created": now, "entries": entries},
+                           ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        start = _align(_HEADER.size + len(index))
+        if start == data_start:
+            break
+        data_start = start
+    h = _digest()
+    h.update(index)
+
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    os.makedirs(out_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=out_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, FORMAT_VERSION, 0, len(index), h.digest()))
+            f.write(index)
+            for (name, src, size, _, digest), (_, off, *_) in zip(sources, entries):
+                f.write(b'\0' * (off - f.tell()))
+                if isinstance(src, bytes):
+                    f.write(src)
+                    continue
+                hh = _digest()
+                with open(src, 'rb') as g:
+                    for chunk in iter(lambda: g.read(_HASH_CHUNK), b''):
+                        hh.update(chunk)
+                        f.write(chunk)
+                if hh.hexdigest() != digest or f.tell() != off + size:
+                    raise ValueError(f"{name} changed while packing")
+        os.replace(tmp, out_path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return len(sources)
+
+
+def _safe_path(root, fn):
+    """root 바로 아래 파일 경로. '../', 절대 경로, 하위 폴더 같은 이름이면 None."""
+    if not fn or fn in ('.', '..') or os.path.basename(fn) != fn or (os.altsep and os.altsep in fn):
+        return None
+    path = os.path.join(root, fn)
+    if not os.path.realpath(path).startswith(os.path.realpath(root) + os.sep):
+        return None
+    return path
+
+
+def unpack(bundle, dirs):
+    """dirs: {섹션: 폴더}. 해시가 맞는 항목만 쓰고, 틀리거나 폴더 밖을 가리키는 항목 이름을 돌려준다."""
+    bad = []
+    for e in bundle.entries():
+        section, _, fn = e.name.partition('/')
+        root = dirs.get(section)
+        if root is None:
+            continue
+        path = _safe_path(root, fn)
+        if path is None:
+            bad.append(e.name)
+            continue
+        e.prefetch()
+        view = e.view()
+        h = _digest()
+        h.update(view)
+        if h.hexdigest() != e.digest:
+            bad.append(e.name)
+            continue
+        os.makedirs(root, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(view)
+        os.utime(path, ns=(e.mtime_ns, e.mtime_ns))
+    return bad
+
+
+def _asset_dirs(root):
+    return {section: os.path.join(root, section) for section, _ in SECTIONS}
+
+
+def _build_charts(dirs):
+    # 차트가 없는 WAV 만 새로 만든다 (numpy 가 필요해서 여기서만 불러온다)
+    from music.chart import build_chart
+    have = set(os.listdir(dirs['charts'])) if os.path.isdir(dirs['charts']) else set()
+    out = []
+    music_dir = dirs['music']
+    for fn in sorted(os.listdir(music_dir)):
+        title, ext = os.path.splitext(fn)
+        if ext.lower() == '.wav' and f"{title}.chart" not in have:
+            chart = build_chart(os.path.join(music_dir, fn), dirs['lyrics'])
+            out.append((f"charts/{title}.chart", chart.to_bytes()))
+    return out
+
+
+def main(argv=None):
+    from music.catalog import BASE_DIR, BUNDLE_PATH
+    assets = os.path.join(BASE_DIR, 'assets')
+    ap = argparse.ArgumentParser(description="Pack, unpack and check single-file album bundles")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p = sub.add_parser('pack')
+    p.add_argument('src', nargs='?', default=assets, help="folder with music/, lyrics/, charts/, art/")
+    p.add_argument('-o', '--out', default=BUNDLE_PATH)
+    p.add_argument('--charts', action='store_true', help="build missing note charts into the bundle")
+    p = sub.add_parser('unpack')
+    p.add_argument('bundle')
+    p.add_argument('dest')
+    for cmd in ('verify', 'list'):
+        sub.add_parser(cmd).add_argument('bundle', nargs='?', default=BUNDLE_PATH)
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    if args.cmd == 'pack':
+        dirs = _asset_dirs(args.src)
+        extra = _build_charts(dirs) if args.charts else ()
+        n = pack(dirs, args.out, extra)
+        print(f"{n} entries → {args.out} ({os.path.getsize(args.out) >> 10} KiB)", file=sys.stderr)
+        bad = AlbumBundle(args.out).verify()
+    else:
+        bundle = AlbumBundle(args.bundle)
+        if args.cmd == 'list':
+            for e in bundle.entries():
+                print(f"{e.size:>12}  {e.digest}  {e.name}")
+            return 0
+        bad = bundle.verify() if args.cmd == 'verify' else unpack(bundle, _asset_dirs(args.dest))
+    for name in bad:
+        print(f"corrupted: {name}", file=sys.stderr)
+    print(f"{args.cmd}: {'FAILED' if bad else 'ok'} in {time.perf_counter() - t0:.2f} s",
+          file=sys.stderr)
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
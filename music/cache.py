@@ -0,0 +1,199 @@
+# music/cache.py
+# 곡 파일에서 계산한 데이터(차트, 파형 등)를 디스크에 보관하는 캐시
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from music.catalog import BASE_DIR
+
+CACHE_DIR = os.path.join(BASE_DIR, 'cache')
+DEFAULT_BUDGET_MB = int(os.environ.get("MUSIC_CACHE_MB", "256"))
+_HASH_CHUNK = 1 << 20
+
+
+class DerivedCache:
+    """키 = 원본 내용 해시 + 종류 + 분석기 버전.
+
+    원본의 mtime/size 가 그대로면 저장해 둔 해시를 다시 쓰고, 바뀌면 다시 해시한 뒤
+    예전 해시로 만든 항목을 지운다. 전체 크기가 budget 을 넘으면 오래 안 쓴 것부터 버린다.
+    """
+
+    def __init__(self, root=CACHE_DIR, budget_bytes=DEFAULT_BUDGET_MB << 20):
+        self.root = root
+        self.budget = budget_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(root, 'index.db'), check_same_thread=False)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS sources (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    digest TEXT NOT NULL
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_used)")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.hash_computes = 0
+
+    # ── 해시 ──
+    def content_hash(self, path):
+        if not isinstance(path, str):
+            return path.digest      # BundleEntry: 묶을 때 같은 해시로 계산해 두었다
+        st = os.stat(path)
+        key = os.path.abspath(path)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT mtime_ns, size, digest FROM sources WHERE path=?", (key,)
+            ).fetchone()
+        if row and row[0] == st.st_mtime_ns and row[1] == st.st_size:
+            return row[2]
+
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self._lock, self.conn:
+            self.hash_computes += 1
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?,?,?,?)",
+                (key, st.st_mtime_ns, st.st_size, digest),
+            )
+            if row and row[2] != digest:
+                self._drop_digest(row[2], key)
+        return digest
+
+    def _drop_digest(self, digest, path):
+        # 내용이 같은 다른 파일이 아직 이 해시를 쓰면 항목을 그대로 둔다
+        if self.conn.execute(
+            "SELECT 1 FROM sources WHERE digest=? AND path != ?", (digest, path)
+        ).fetchone():
+            return
+        keys = [k for (k,) in self.conn.execute("SELECT key FROM entries WHERE digest=?", (digest,))]
+        for k in keys:
+            if self._unlink(k):
+                self.conn.execute("DELETE FROM entries WHERE key=?", (k,))
+
+    # ── 항목 ──
+    def _file(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def _unlink(self, key):
+        """지웠으면(또는 이미 없으면) True. Windows 에서 메모리 맵으로 열려 있는 파일은
+        지울 수 없으므로 False — 항목을 남겨 두고 다음 정리 때 다시 해 본다."""
+        try:
+            os.remove(self._file(key))
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+        return True
+
+    def key_for(self, path, kind, version):
+        return f"{self.content_hash(path)}-{kind}-v{version}"
+
+    def get_path(self, path, kind, version):
+        """캐시 파일 경로(메모리 맵 등으로 직접 열 때). 없으면 None."""
+        key = self.key_for(path, kind, version)
+        fpath = self._file(key)
+        with self._lock:
+            found = self.conn.execute("SELECT 1 FROM entries WHERE key=?", (key,)).fetchone()
+            if found and os.path.exists(fpath):
+                self.hits += 1
+                with self.conn:
+                    self.conn.execute(
+                        "UPDATE entries SET last_used=? WHERE key=?", (time.time(), key)
+                    )
+                return fpath
+            self.misses += 1
+        return None
+
+    def get(self, path, kind, version):
+        fpath = self.get_path(path, kind, version)
+        if fpath is None:
+            return None
+        with open(fpath, 'rb') as f:
+            return f.read()
+
+    def put(self, path, kind, version, data):
+        """저장한 파일 경로. budget 보다 큰 항목은 저장하지 않고 None."""
+        if len(data) > self.budget:
+            return None
+        key = self.key_for(path, kind, version)
+        digest = key.split('-', 1)[0]
+        fpath = self._file(key)
+        os.makedirs(os.path.dirname(fpath), exist_ok=True)
+        # 임시 파일에 다 쓴 뒤 rename → 읽는 쪽은 반쯤 쓴 파일을 볼 일이 없다
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(fpath), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, fpath)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?,?,?,?)",
+                (key, digest, len(data), time.time()),
+            )
+            self._evict(keep=key)
+        return fpath
+
+    def get_or_build(self, path, kind, version, build):
+        """build() 는 bytes 를 돌려준다."""
+        data = self.get(path, kind, version)
+        if data is None:
+            data = build()
+            self.put(path, kind, version, data)
+        return data
+
+    def _evict(self, keep=None):
+        # keep: 방금 쓴 항목. 돌려줄 경로가 바로 지워지지 않도록 건너뛴다
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.budget:
+            return
+        for key, size in self.conn.execute(
+            "SELECT key, size FROM entries WHERE key != ? ORDER BY last_used", (keep,)
+        ).fetchall():
+            if total <= self.budget:
+                break
+            if not self._unlink(key):
+                continue
+            self.conn.execute("DELETE FROM entries WHERE key=?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            count, total = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hash_computes": self.hash_computes,
+            "entries": count,
+            "bytes": total,
+            "budget": self.budget,
+        }
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,176 @@
+# music/catalog.py
+import os
+import sqlite3
+from collections import namedtuple
+
+from music.bundle import open_bundle
+
+BASE_DIR = os.path.join(os.path.dirname(__file__), '..')
+MUSIC_DIR = os.path.join(BASE_DIR, 'assets', 'music')
+LYRICS_DIR = os.path.join(BASE_DIR, 'assets', 'lyrics')
+ART_DIR = os.path.join(BASE_DIR, 'assets', 'art')
+CATALOG_PATH = os.path.join(BASE_DIR, 'database', 'library.db')
+# 있으면 assets/music, assets/lyrics 대신 이 파일 하나에서 읽는다 (python -m music.bundle pack)
+BUNDLE_PATH = os.path.join(BASE_DIR, 'assets', 'album.mqa')
+AUDIO_EXTS = ('.mp3', '.wav')
+
+Track = namedtuple("Track", [
+    "fn", "title", "mtime_ns", "size",
+    "duration_ms", "sample_rate", "channels",
+    "has_lyrics", "has_game_lyrics",
+    "lufs", "peak_db",
+])
+
+# 처음 만든 뒤에 추가된 열 (예전 색인 파일에는 ALTER TABLE 로 붙인다)
+ADDED_COLUMNS = (
+    ("lufs", "REAL"),
+    ("peak_db", "REAL"),
+    ("loudness_ver", "INTEGER"),
+)
+_COLUMNS = ("fn, mtime_ns, size, duration_ms, sample_rate, channels,"
+            " has_lyrics, has_game_lyrics")
+
+
+class TrackCatalog:
+    """assets/music (또는 앨범 번들)의 곡 목록을 SQLite 에 색인해 두고, 바뀐 파일만 다시 읽는다.
+
+    path_of() 는 파일 경로나 BundleEntry 를, lyrics/art 는 폴더 경로나 번들의 해당 섹션을 준다.
+    """
+
+    def __init__(self, db_path=CATALOG_PATH, music_dir=MUSIC_DIR, lyrics_dir=LYRICS_DIR,
+                 bundle_path=BUNDLE_PATH):
+        self.music_dir = music_dir
+        self.lyrics_dir = lyrics_dir
+        self.bundle = (open_bundle(bundle_path)
+                       if bundle_path and os.path.exists(bundle_path) else None)
+        self.lyrics = self.bundle.lyrics if self.bundle else lyrics_dir
+        self.art = self.bundle.art if self.bundle else ART_DIR
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tracks (
+                fn TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                duration_ms INTEGER,
+                sample_rate INTEGER,
+                channels INTEGER,
+                has_lyrics INTEGER NOT NULL DEFAULT 0,
+                has_game_lyrics INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        have = {row[1] for row in self.conn.execute("PRAGMA table_info(tracks)")}
+        with self.conn:
+            for name, decl in ADDED_COLUMNS:
+                if name not in have:
+                    self.conn.execute(f"ALTER TABLE tracks ADD COLUMN {name} {decl}")
+
+    def _scan(self):
+        """{파일 이름: (mtime_ns, size)}"""
+        if self.bundle:
+            return {
+                e.basename: (e.mtime_ns, e.size)
+                for e in self.bundle.entries('music/')
+                if e.basename.lower().endswith(AUDIO_EXTS)
+            }
+        try:
+            with os.scandir(self.music_dir) as it:
+                return {
+                    e.name: (st.st_mtime_ns, st.st_size)
+                    for e in it
+                    if e.is_file() and e.name.lower().endswith(AUDIO_EXTS)
+                    for st in (e.stat(),)
+                }
+        except FileNotFoundError:
+            return {}
+
+    def _lyric_names(self):
+        if self.bundle:
+            return set(self.lyrics.names())
+        try:
+            return set(os.listdir(self.lyrics_dir))
+        except FileNotFoundError:
+            return set()
+
+    def sync(self):
+        """디스크와 색인을 맞춘다. 메타데이터를 (다시) 읽어야 할 파일 이름 목록을 반환."""
+        on_disk = self._scan()
+        lyric_names = self._lyric_names()
+        known = {
+            fn: (mtime_ns, size, lyr, game)
+            for fn, mtime_ns, size, lyr, game in self.conn.execute(
+                "SELECT fn, mtime_ns, size, has_lyrics, has_game_lyrics FROM tracks"
+            )
+        }
+        unprobed = {
+            fn for (fn,) in self.conn.execute("SELECT fn FROM tracks WHERE duration_ms IS NULL")
+        }
+
+        changed, flags = [], []
+        for fn, (mtime_ns, size) in on_disk.items():
+            title = os.path.splitext(fn)[0]
+            lyr = int(f"{title}.txt" in lyric_names)
+            game = int(f"{title}_game.txt" in lyric_names)
+            old = known.get(fn)
+            if old is None or old[0] != mtime_ns or old[1] != size:
+                # 길이 등은 MetadataProber 가 백그라운드에서 채운다
+                changed.append((fn, mtime_ns, size, None, None, None, lyr, game))
+            elif old[2:] != (lyr, game):
+                flags.append((lyr, game, fn))
+
+        removed = [(fn,) for fn in known.keys() - on_disk.keys()]
+        with self.conn:
+            if changed:
+                self.conn.executemany(
+                    f"INSERT OR REPLACE INTO tracks({_COLUMNS}) VALUES (?,?,?,?,?,?,?,?)", changed
+                )
+            if flags:
+                self.conn.executemany(
+                    "UPDATE tracks SET has_lyrics=?, has_game_lyrics=? WHERE fn=?", flags
+                )
+            if removed:
+                self.conn.executemany("DELETE FROM tracks WHERE fn=?", removed)
+        unprobed.difference_update(fn for fn, in removed)
+        unprobed.update(row[0] for row in changed)
+        return sorted(unprobed)
+
+    def store_probes(self, results):
+        """results: [(fn, ProbeResult), ...]"""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE tracks SET duration_ms=?, sample_rate=?, channels=? WHERE fn=?",
+                [(r.duration_ms, r.sample_rate, r.channels, fn) for fn, r in results],
+            )
+
+    def unanalyzed(self, version=1):
+        """라우드니스를 (이 분석기 버전으로) 아직 재지 않은 WAV 파일 이름."""
+        return [fn for (fn,) in self.conn.execute(
+            "SELECT fn FROM tracks WHERE (loudness_ver IS NULL OR loudness_ver != ?)"
+            " AND lower(fn) LIKE '%.wav' ORDER BY fn", (version,)
+        )]
+
+    def store_loudness(self, results, version=1):
+        """results: [(fn, Loudness|None), ...]. None 도 '쟀음' 으로 남겨 다시 돌지 않는다."""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE tracks SET lufs=?, peak_db=?, loudness_ver=? WHERE fn=?",
+                [(r.lufs if r else None, r.peak_db if r else None, version, fn)
+                 for fn, r in results],
+            )
+
+    def tracks(self):
+        rows = self.conn.execute(
+            f"SELECT {_COLUMNS}, lufs, peak_db FROM tracks ORDER BY fn"
+        )
+        return [
+            Track(fn, os.path.splitext(fn)[0], m, s, d, r, c, bool(l), bool(g), lu, pk)
+            for fn, m, s, d, r, c, l, g, lu, pk in rows
+        ]
+
+    def path_of(self, fn):
+        if self.bundle:
+            return self.bundle.entry(f"music/{fn}")
+        return os.path.join(self.music_dir, fn)
+
+    def close(self):
+        self.conn.close()
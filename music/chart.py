@@ -0,0 +1,293 @@
+# music/chart.py
+# WAV 온셋(스펙트럴 플럭스) 검출로 리듬게임 노트 차트를 만든다
+#   python -m music.chart            # assets/music 의 모든 WAV → assets/charts/*.chart
+#   python -m music.chart a.wav -o out/
+import argparse
+import os
+import struct
+import sys
+import time
+from contextlib import closing
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from music.bundle import BundleEntry, open_wav, source_name
+from music.catalog import BASE_DIR, LYRICS_DIR, MUSIC_DIR
+from music.lyrics import load_lyrics
+
+CHART_DIR = os.path.join(BASE_DIR, 'assets', 'charts')
+ANALYZER_VERSION = 1
+
+FRAME = 1024
+HOP = 512
+BLOCK_FRAMES = 1 << 16         # 한 번에 읽는 샘플 수 (메모리 상한)
+LANE_EDGES_HZ = (0, 200, 800, 3000)   # 4개 레인 = 4개 주파수 대역
+MIN_GAP_MS = 80
+
+_MAGIC = b'MQCH'
+_HEADER = struct.Struct('<4sHHIIfII')   # magic, version, analyzer, rate, dur_ms, bpm, notes, lines
+
+
+class Chart:
+    """노트(시각, 레인, 세기, 가사 줄)와 _game.txt 줄 시작 시각을 담는 압축 차트."""
+
+    def __init__(self, times_ms, lanes, strengths, lines, line_starts, line_rows,
+                 bpm=0.0, duration_ms=0, sample_rate=0, analyzer=ANALYZER_VERSION):
+        self.times_ms = np.asarray(times_ms, dtype='<u4')
+        self.lanes = np.asarray(lanes, dtype='u1')
+        self.strengths = np.asarray(strengths, dtype='u1')
+        self.lines = np.asarray(lines, dtype='<u2')
+        self.line_starts = np.asarray(line_starts, dtype='<u4')
+        self.line_rows = np.asarray(line_rows, dtype='<u2')
+        self.bpm = float(bpm)
+        self.duration_ms = int(duration_ms)
+        self.sample_rate = int(sample_rate)
+        self.analyzer = int(analyzer)
+
+    def __len__(self):
+        return len(self.times_ms)
+
+    def to_bytes(self):
+        head = _HEADER.pack(_MAGIC, 1, self.analyzer, self.sample_rate, self.duration_ms,
+                            self.bpm, len(self.times_ms), len(self.line_starts))
+        return b''.join((
+            head,
+            self.times_ms.tobytes(), self.lanes.tobytes(),
+            self.strengths.tobytes(), self.lines.tobytes(),
+            self.line_starts.tobytes(), self.line_rows.tobytes(),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, ver, analyzer, rate, dur, bpm, n, m = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or ver != 1:
+            raise ValueError("not a chart file")
+        off = _HEADER.size
+        out = []
+        for dtype, count in (('<u4', n), ('u1', n), ('u1', n), ('<u2', n), ('<u4', m), ('<u2', m)):
+            arr = np.frombuffer(data, dtype=dtype, count=count, offset=off)
+            off += arr.nbytes
+            out.append(arr)
+        return cls(*out, bpm=bpm, duration_ms=dur, sample_rate=rate, analyzer=analyzer)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def read_wav_blocks(path, block_frames=BLOCK_FRAMES):
+    """(sample_rate, 모노 float32 블록 제너레이터). 파일 전체를 메모리에 올리지 않는다.
+    끝까지 읽지 않을 수도 있으면 closing(blocks) 로 감싸서 파일을 바로 닫는다."""
+    w = open_wav(path)
+    rate, ch, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+
+    def blocks():
+        try:
+            while True:
+                raw = w.readframes(block_frames)
+                if not raw:
+                    return
+                yield _pcm_to_mono(raw, ch, width)
+        finally:
+            w.close()
+    return rate, blocks()
+
+
+def _pcm_to_mono(raw, ch, width):
+    x = _pcm_to_float(raw, width)
+    if ch > 1:
+        x = x[:len(x) // ch * ch].reshape(-1, ch).mean(axis=1)
+    return x
+
+
+def _pcm_to_float(raw, width):
+    """인터리브된 PCM → float32 (-1..1). 채널은 섞지 않는다."""
+    if width == 1:
+        x = (np.frombuffer(raw, dtype='u1').astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        x = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+    elif width == 3:
+        b = np.frombuffer(raw, dtype='u1').reshape(-1, 3).astype(np.int32)
+        v = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        v = np.where(v & 0x800000, v - 0x1000000, v)
+        x = v.astype(np.float32) / 8388608.0
+    elif width == 4:
+        x = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"unsupported sample width: {width}")
+    return x
+
+
+def spectral_flux(rate, blocks, frame=FRAME, hop=HOP):
+    """블록 단위 STFT → (전체 플럭스, 대역별 플럭스[frames, lanes], 총 샘플 수)."""
+    win = np.hanning(frame).astype(np.float32)
+    freqs = np.fft.rfftfreq(frame, 1.0 / rate)
+    edges = np.searchsorted(freqs, LANE_EDGES_HZ)
+    # 표본율이 낮으면 (약 6 kHz 아래) 위쪽 경계가 나이퀴스트를 넘는다: 그 대역은 없는 것으로
+    edges = np.unique(edges[edges < len(freqs)])
+    carry = np.zeros(0, dtype=np.float32)
+    prev = None
+    flux_parts, band_parts = [], []
+    total = 0
+    for block in blocks:
+        total += len(block)
+        buf = np.concatenate((carry, block))
+        if len(buf) < frame:
+            carry = buf
+            continue
+        n = (len(buf) - frame) // hop + 1
+        frames = sliding_window_view(buf, frame)[::hop][:n]
+        mag = np.log1p(100.0 * np.abs(np.fft.rfft(frames * win, axis=1))).astype(np.float32)
+        if prev is None:
+            prev = mag[0]
+        diff = np.diff(mag, axis=0, prepend=prev[None, :])
+        np.maximum(diff, 0.0, out=diff)
+        flux_parts.append(diff.sum(axis=1))
+        band_parts.append(np.add.reduceat(diff, edges, axis=1))
+        prev = mag[-1]
+        carry = buf[n * hop:]
+    if not flux_parts:
+        return np.zeros(0, np.float32), np.zeros((0, len(edges)), np.float32), total
+    return np.concatenate(flux_parts), np.concatenate(band_parts), total
+
+
+def _moving_mean(x, half):
+    c = np.concatenate(([0.0], np.cumsum(x, dtype=np.float64)))
+    idx = np.arange(len(x))
+    lo = np.clip(idx - half, 0, len(x))
+    hi = np.clip(idx + half + 1, 0, len(x))
+    return (c[hi] - c[lo]) / (hi - lo)
+
+
+def pick_onsets(flux, fps, delta=1.0):
+    """적응형 임계값 + 국소 최대로 온셋 프레임 인덱스를 고른다."""
+    if len(flux) < 3:
+        return np.zeros(0, dtype=np.int64)
+    f = (flux - flux.mean()) / (flux.std() + 1e-9)
+    w = max(1, int(0.03 * fps))
+    local_max = sliding_window_view(np.pad(f, w, mode='edge'), 2 * w + 1).max(axis=1)
+    thresh = _moving_mean(f, max(1, int(0.25 * fps))) + delta
+    peaks = np.flatnonzero((f == local_max) & (f >= thresh))
+    if len(peaks) < 2:
+        return peaks
+    # 최소 간격: 앞 노트와 너무 가까우면 버린다
+    min_gap = max(1, int(MIN_GAP_MS / 1000.0 * fps))
+    keep = [peaks[0]]
+    for p in peaks[1:]:
+        if p - keep[-1] >= min_gap:
+            keep.append(p)
+    return np.asarray(keep)
+
+
+def estimate_bpm(flux, fps, lo=60.0, hi=200.0):
+    if len(flux) < 4:
+        return 0.0
+    f = flux - flux.mean()
+    spec = np.fft.rfft(f, 2 * len(f))
+    ac = np.fft.irfft(spec * np.conj(spec))[:len(f)]
+    lag_lo, lag_hi = int(60.0 * fps / hi), int(60.0 * fps / lo) + 1
+    lag_hi = min(lag_hi, len(ac))
+    if lag_lo >= lag_hi:
+        return 0.0
+    lag = lag_lo + int(np.argmax(ac[lag_lo:lag_hi]))
+    return 60.0 * fps / max(lag, 1)
+
+
+def align_lines(onset_ms, n_lines):
+    """_game.txt 줄 시작 시각을 온셋 구간에 고르게 나눈 뒤 가까운 온셋에 맞춘다."""
+    if n_lines == 0 or len(onset_ms) == 0:
+        return np.zeros(n_lines, dtype=np.int64)
+    start, end = onset_ms[0], onset_ms[-1]
+    targets = start + (end - start) * np.arange(n_lines) / n_lines
+    i = np.clip(np.searchsorted(onset_ms, targets), 1, len(onset_ms) - 1)
+    left, right = onset_ms[i - 1], onset_ms[i]
+    snapped = np.where(targets - left <= right - targets, left, right)
+    snapped[0] = start
+    return np.maximum.accumulate(snapped)
+
+
+def game_lines(title, lyrics_dir=LYRICS_DIR):
+    """(line_starts 또는 None, line_rows). _game 가사가 .lrc 면 그 시각을 쓴다."""
+    lyr = load_lyrics(lyrics_dir, f"{title}_game")
+    if lyr is None:
+        return None, np.zeros(0, dtype=np.int64)
+    if lyr.timed:
+        return np.asarray(lyr.times, dtype=np.int64), np.asarray(lyr.rows, dtype=np.int64)
+    rows = [i for i, (kind, text) in enumerate(lyr.lines) if kind == 'line' and text]
+    return None, np.asarray(rows, dtype=np.int64)
+
+
+def build_chart(path, lyrics_dir=None):
+    """path 는 WAV 경로 또는 BundleEntry. 가사는 기본적으로 같은 곳(폴더/번들)에서 읽는다."""
+    if lyrics_dir is None:
+        lyrics_dir = path.bundle.lyrics if isinstance(path, BundleEntry) else LYRICS_DIR
+    rate, blocks = read_wav_blocks(path)
+    with closing(blocks):
+        flux, bands, total = spectral_flux(rate, blocks)
+    fps = rate / HOP
+    peaks = pick_onsets(flux, fps)
+
+    times = ((peaks * HOP + FRAME / 2) * 1000.0 / rate).astype(np.int64)
+    # 레인: 그 순간 (평균 대비) 가장 크게 변한 대역
+    norm = bands / (bands.mean(axis=0) + 1e-9) if len(bands) else bands
+    lanes = norm[peaks].argmax(axis=1) if len(peaks) else np.zeros(0, np.int64)
+    strength = flux[peaks] / (flux[peaks].max() + 1e-9) if len(peaks) else np.zeros(0)
+
+    title = os.path.splitext(source_name(path))[0]
+    starts, rows = game_lines(title, lyrics_dir)
+    if starts is None:
+        starts = align_lines(times, len(rows))
+    line_idx = np.clip(np.searchsorted(starts, times, side='right') - 1, 0, None)
+
+    return Chart(
+        times, lanes, np.round(strength * 255), line_idx, starts, rows,
+        bpm=estimate_bpm(flux, fps), duration_ms=total * 1000 // rate, sample_rate=rate,
+    )
+
+
+def load_chart(path, cache):
+    """번들에 같은 분석기 버전의 차트가 있으면 그것을(복사 없이), 아니면 캐시에서 꺼내거나 만든다."""
+    if isinstance(path, BundleEntry):
+        title = os.path.splitext(path.basename)[0]
+        packed = path.bundle.entry(f"charts/{title}.chart")
+        if packed is not None:
+            chart = Chart.from_bytes(packed.view())
+            if chart.analyzer == ANALYZER_VERSION:
+                return chart
+    data = cache.get_or_build(path, 'chart', ANALYZER_VERSION, lambda: build_chart(path).to_bytes())
+    return Chart.from_bytes(data)
+
+
+def chart_path(title, chart_dir=CHART_DIR):
+    return os.path.join(chart_dir, f"{title}.chart")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build rhythm-game note charts from WAV files")
+    ap.add_argument('files', nargs='*')
+    ap.add_argument('-o', '--out', default=CHART_DIR)
+    args = ap.parse_args(argv)
+
+    files = args.files or [
+        os.path.join(MUSIC_DIR, fn) for fn in sorted(os.listdir(MUSIC_DIR))
+        if fn.lower().endswith('.wav')
+    ]
+    for path in files:
+        t0 = time.perf_counter()
+        chart = build_chart(path)
+        title = os.path.splitext(os.path.basename(path))[0]
+        chart.save(chart_path(title, args.out))
+        sec = time.perf_counter() - t0
+        print(f"{title}: {len(chart)} notes, {chart.bpm:.1f} bpm, "
+              f"{chart.duration_ms / 1000 / max(sec, 1e-9):.0f}x realtime", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
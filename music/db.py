@@ -0,0 +1,231 @@
+# music/db.py
+# users.db 공용 접근 계층: 연결 하나를 전용 스레드에서 계속 쓰고, 결과는 시그널로 돌려준다
+import os
+import queue
+import sqlite3
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from music import trace
+
+DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'users.db')
+
+# user_version 순서대로 한 번씩만 적용된다
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE,
+        password_hash TEXT
+    );
+    """,
+    # 2: 재생 기록 / 이어 듣기 위치 / 게임 점수 (music/history.py)
+    """
+    CREATE TABLE IF NOT EXISTS plays (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users(id),
+        fn TEXT NOT NULL,
+        started_at REAL NOT NULL,
+        played_ms INTEGER NOT NULL,
+        completed INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS plays_user_time ON plays(user_id, started_at);
+    CREATE TABLE IF NOT EXISTS positions (
+        user_id INTEGER NOT NULL REFERENCES users(id),
+        fn TEXT NOT NULL,
+        position_ms INTEGER NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (user_id, fn)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS scores (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users(id),
+        fn TEXT NOT NULL,
+        chart_ver INTEGER NOT NULL,
+        score INTEGER NOT NULL,
+        max_combo INTEGER NOT NULL,
+        perfect INTEGER NOT NULL,
+        great INTEGER NOT NULL,
+        good INTEGER NOT NULL,
+        miss INTEGER NOT NULL,
+        played_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS scores_user ON scores(user_id, played_at);
+    CREATE TABLE IF NOT EXISTS best_scores (
+        user_id INTEGER NOT NULL REFERENCES users(id),
+        fn TEXT NOT NULL,
+        chart_ver INTEGER NOT NULL,
+        score INTEGER NOT NULL,
+        max_combo INTEGER NOT NULL,
+        played_at REAL NOT NULL,
+        PRIMARY KEY (user_id, fn, chart_ver)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS best_scores_board ON best_scores(fn, chart_ver, score DESC);
+    """,
+    # 3: 점수마다 입력 리플레이 (music/replay.py)
+    """
+    ALTER TABLE scores ADD COLUMN replay BLOB;
+    """,
+]
+
+SQL_PASSWORD_HASH = "SELECT password_hash FROM users WHERE username = ?"
+SQL_CREATE_USER = "INSERT INTO users(username, password_hash) VALUES (?, ?)"
+SQL_REHASH = "UPDATE users SET password_hash = ? WHERE username = ? AND password_hash = ?"
+
+
+def connect(path=DB_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=3.0, cached_statements=256)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _statements(script):
+    """스크립트를 문장 하나씩 나눈다 (executescript 는 먼저 COMMIT 해 버려서 트랜잭션에 못 넣는다)."""
+    stmt = ""
+    for line in script.splitlines(keepends=True):
+        stmt += line
+        if sqlite3.complete_statement(stmt):
+            yield stmt.strip()
+            stmt = ""
+    if stmt.strip():
+        yield stmt      # 끝나지 않은 문장은 sqlite 가 오류를 낸다
+
+
+def migrate(conn):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for v in range(version, len(MIGRATIONS)):
+        # 스키마 변경과 user_version 을 한 트랜잭션으로: 중간에 죽어도 다음에 처음부터 다시 한다
+        conn.execute("BEGIN")
+        try:
+            for stmt in _statements(MIGRATIONS[v]):
+                conn.execute(stmt)
+            conn.execute(f"PRAGMA user_version = {v + 1}")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+    return len(MIGRATIONS)
+
+
+# ── 쿼리 (작업 스레드에서 conn 과 함께 불린다) ──
+def password_hash(conn, username):
+    row = conn.execute(SQL_PASSWORD_HASH, (username,)).fetchone()
+    return row[0] if row else None
+
+
+def create_user(conn, username, pw_hash):
+    """새 사용자를 만든다. 이미 있으면 False."""
+    try:
+        with conn:
+            conn.execute(SQL_CREATE_USER, (username, pw_hash))
+    except sqlite3.IntegrityError:
+        return False
+    return True
+
+
+def rehash_user(conn, username, old_hash, new_hash):
+    """확인에 쓴 해시가 그대로일 때만 바꾼다 (그 사이 다른 곳에서 바꿨으면 False)."""
+    with conn:
+        return conn.execute(SQL_REHASH, (new_hash, username, old_hash)).rowcount == 1
+
+
+class _Bridge(QObject):
+    finished = pyqtSignal(object, object)   # callback, value
+
+
+def _barrier(conn):
+    pass
+
+
+class Database:
+    """모든 쿼리는 전용 스레드 하나에서 같은 연결로 순서대로 실행된다.
+
+    submit() 은 바로 돌아오고, on_done/on_error 는 Database 를 만든 스레드(GUI)에서 불린다.
+    call() 은 결과를 기다린다 (스크립트/벤치마크용).
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._jobs = queue.Queue()
+        self._bridge = _Bridge()
+        self._bridge.finished.connect(lambda cb, value: cb(value))
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="db", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        try:
+            conn = connect(self.path)
+            migrate(conn)
+        except sqlite3.Error as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            fn, args, on_done, on_error, waiter = job
+            try:
+                with trace.span(fn.__name__, 'db'):
+                    result, ok = fn(conn, *args), True
+            except Exception as e:
+                result, ok = e, False
+            if waiter is not None:
+                waiter.append((ok, result))
+                waiter[0].set()
+                continue
+            cb = on_done if ok else on_error
+            if cb is not None:
+                self._bridge.finished.emit(cb, result)
+        conn.close()
+
+    def _check_open(self):
+        # 닫힌 뒤에 넣은 작업은 아무도 꺼내지 않는다 (call 은 영원히 기다리게 된다)
+        if not self._thread.is_alive():
+            raise RuntimeError("database closed")
+
+    def submit(self, fn, *args, on_done=None, on_error=None):
+        self._check_open()
+        self._jobs.put((fn, args, on_done, on_error, None))
+
+    def call(self, fn, *args):
+        self._check_open()
+        done = threading.Event()
+        waiter = [done]
+        self._jobs.put((fn, args, None, None, waiter))
+        done.wait()
+        ok, result = waiter[1]
+        if not ok:
+            raise result
+        return result
+
+    def wait(self):
+        """지금까지 넣은 작업이 다 끝날 때까지 기다린다 (닫힌 뒤에는 바로 돌아온다)."""
+        if self._thread.is_alive():
+            self.call(_barrier)
+
+    def close(self):
+        self._jobs.put(None)
+        self._thread.join()
+
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_database(path=DB_PATH):
+    """프로세스 전체에서 하나. 처음 부를 때 (path 로) 연결을 열고 스키마를 맞춘다."""
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = Database(path)
+        return _instance
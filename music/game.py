@@ -0,0 +1,349 @@
+# music/game.py
+# 리듬게임 페이지: 고정 주기 렌더 루프, 오디오 시계 보간, 입력 판정
+import time
+from collections import deque
+
+import numpy as np
+from PyQt5.QtCore import QRectF, Qt, QTimer
+from PyQt5.QtGui import QColor, QFont, QPainter
+from PyQt5.QtWidgets import QWidget
+
+LANE_KEYS = (Qt.Key_D, Qt.Key_F, Qt.Key_J, Qt.Key_K)
+LANE_COLORS = ("#3182ce", "#38a169", "#d69e2e", "#e53e3e")
+# 입력 기록(리플레이)의 레인 외 코드: 그 시각까지 놓친 노트 처리 / 그 시각으로 되감기
+EXPIRE, SEEK = 6, 7
+# (이름, 허용 오차 ms, 점수)
+JUDGE_WINDOWS = (("PERFECT", 25, 300), ("GREAT", 60, 200), ("GOOD", 100, 100))
+MISS_MS = JUDGE_WINDOWS[-1][1]
+FRAME_MS = 1000 / 120
+LOOKAHEAD_MS = 1500
+GAME_NOTIFY_MS = 20
+
+
+class AudioClock:
+    """플레이어 위치 보고 사이를 단조 시계로 보간한다.
+
+    positionChanged 는 notifyInterval 간격으로만 오므로 그대로 쓰면 계단처럼 움직인다.
+    보고가 올 때마다 보간값과의 오차를 조금씩 반영하고, 크게 어긋나면(탐색) 바로 맞춘다.
+    """
+    SNAP_MS = 80
+    GAIN = 0.2
+
+    def __init__(self):
+        # (기준 위치 ms, 기준 시각, 재생 중) 을 한 번에 바꿔서 다른 스레드에서도 읽을 수 있게 한다
+        self._anchor = (0.0, time.perf_counter(), False)
+        self.errors = deque(maxlen=256)   # 보고값 - 보간값 (ms)
+
+    @property
+    def playing(self):
+        return self._anchor[2]
+
+    def position(self, now=None):
+        pos, t, playing = self._anchor
+        if not playing:
+            return pos
+        if now is None:
+            now = time.perf_counter()
+        return pos + (now - t) * 1000.0
+
+    def update(self, pos):
+        now = time.perf_counter()
+        predicted = self.position(now)
+        err = pos - predicted
+        self.errors.append(err)
+        playing = self.playing
+        if not playing or abs(err) > self.SNAP_MS:
+            self._anchor = (float(pos), now, playing)
+        else:
+            self._anchor = (predicted + err * self.GAIN, now, playing)
+
+    def set_playing(self, playing):
+        now = time.perf_counter()
+        self._anchor = (self.position(now), now, playing)
+
+    def reset(self, pos=0):
+        self._anchor = (float(pos), time.perf_counter(), self.playing)
+        self.errors.clear()
+
+
+class EventClock:
+    """입력 이벤트의 timestamp() (플랫폼 시계 ms, 기준점은 알 수 없음) 를 perf_counter 초로 옮긴다.
+
+    이벤트는 일어난 뒤에만 받으므로 (받은 시각 - 스탬프) 의 가장 작은 값이 두 시계의 차이에
+    가장 가깝다. 그보다 큰 만큼이 이벤트 루프에서 기다린 시간이다. 스탬프가 없거나(0)
+    MAX_LAG_MS 넘게 어긋나면 (시계가 튀었을 때) 받은 시각을 쓰고 기준을 다시 잡는다.
+    """
+    MAX_LAG_MS = 1000
+
+    def __init__(self):
+        self._offset = None
+
+    def time_of(self, stamp_ms, received):
+        if not stamp_ms:
+            return received
+        offset = received * 1000.0 - stamp_ms
+        if self._offset is None or offset < self._offset or offset - self._offset > self.MAX_LAG_MS:
+            self._offset = offset
+        return (stamp_ms + self._offset) / 1000.0
+
+
+class Judge:
+    """레인별 다음 노트 포인터로 키 입력을 판정한다. 노트 하나당 판정 한 번."""
+
+    def __init__(self, chart):
+        self.chart = chart
+        n = len(chart) if chart is not None else 0
+        self.state = np.zeros(n, dtype=np.int8)     # 0=대기, 1..3=판정 등급, -1=놓침
+        self.lane_notes = [
+            np.flatnonzero(chart.lanes == lane) if n else np.zeros(0, np.int64)
+            for lane in range(len(LANE_KEYS))
+        ]
+        self.ptr = [0] * len(LANE_KEYS)
+        self.score = 0
+        self.combo = 0
+        self.max_combo = 0
+        self.counts = {name: 0 for name, _, _ in JUDGE_WINDOWS}
+        self.counts["MISS"] = 0
+        self.offsets = deque(maxlen=64)   # 최근 판정 오차 (ms, +면 늦음)
+        self.last = None
+
+    def _miss(self, idx):
+        self.state[idx] = -1
+        self.counts["MISS"] += 1
+        self.combo = 0
+        self.last = ("MISS", None)
+
+    def expire(self, now_ms):
+        """판정 창을 지난 노트는 놓친 것으로 처리."""
+        times = self.chart.times_ms if self.chart is not None else None
+        for lane, notes in enumerate(self.lane_notes):
+            p = self.ptr[lane]
+            while p < len(notes) and times[notes[p]] < now_ms - MISS_MS:
+                if self.state[notes[p]] == 0:
+                    self._miss(notes[p])
+                p += 1
+            self.ptr[lane] = p
+
+    def seek(self, now_ms):
+        """뒤로 탐색했을 때: 그 지점 이후 노트를 다시 판정 대기로 돌린다."""
+        if self.chart is None:
+            return
+        times = self.chart.times_ms
+        for lane, notes in enumerate(self.lane_notes):
+            p = int(np.searchsorted(times[notes], now_ms - MISS_MS))
+            self.state[notes[p:]] = 0
+            self.ptr[lane] = p
+
+    def hit(self, lane, t_ms):
+        if self.chart is None or not 0 <= lane < len(self.lane_notes):
+            return None
+        self.expire(t_ms)
+        notes, p = self.lane_notes[lane], self.ptr[lane]
+        if p >= len(notes):
+            return None
+        idx = notes[p]
+        off = t_ms - float(self.chart.times_ms[idx])
+        for grade, (name, window, points) in enumerate(JUDGE_WINDOWS, start=1):
+            if abs(off) <= window:
+                self.state[idx] = grade
+                self.ptr[lane] = p + 1
+                self.score += points
+                self.combo += 1
+                self.max_combo = max(self.max_combo, self.combo)
+                self.counts[name] += 1
+                self.offsets.append(off)
+                self.last = (name, off)
+                return name, off
+        return None   # 판정 창 밖의 빈 입력
+
+
+class GamePage(QWidget):
+    def __init__(self, clock, parent=None):
+        super().__init__(parent)
+        self.setObjectName("gamepage")
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.clock = clock
+        self.keys = EventClock()
+        self.chart = None
+        self.judge = Judge(None)
+        self.lines = []          # _game.txt 줄 텍스트 (chart.line_rows 로 찾는다)
+        self.inputs = []         # (t_ms, lane 또는 EXPIRE/SEEK) — 다시 돌리면 같은 판정이 나온다
+        self.board = None        # (상위 [(이름, 점수, ...)], 내 (최고 점수, 순위) 또는 None)
+        self.show_overlay = True
+
+        self._last_ms = 0
+
+        # 계측
+        self._last_tick = None
+        self.frame_intervals = deque(maxlen=240)
+        self.paint_ms = deque(maxlen=240)
+        self.input_lag_ms = deque(maxlen=240)   # 키가 눌린 뒤 판정할 때까지 (이벤트 루프 대기)
+        self.dropped = 0
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(int(FRAME_MS))
+        self.timer.timeout.connect(self._tick)
+
+    # ── 수명 ──
+    def set_track(self, chart, game_lyrics):
+        self.chart = chart
+        self.judge = Judge(chart)
+        self.inputs = []
+        self.board = None
+        self._last_ms = 0
+        self.lines = game_lyrics.lines if game_lyrics is not None else []
+        self.update()
+
+    def set_board(self, top, mine):
+        self.board = (top, mine)
+        self.update()
+
+    def start(self):
+        self._last_tick = None
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    # ── 루프 ──
+    def _tick(self):
+        now = time.perf_counter()
+        if self._last_tick is not None:
+            dt = (now - self._last_tick) * 1000.0
+            self.frame_intervals.append(dt)
+            if dt > FRAME_MS * 1.5:
+                self.dropped += int(dt // FRAME_MS) - 1
+        self._last_tick = now
+        if self.chart is not None:
+            self.judge.expire(self._now(now))
+        self.update()
+
+    def _now(self, now=None):
+        # 판정 시각은 정수 ms 이고 되감기 말고는 뒤로 가지 않는다 (리플레이가 그대로 재현되도록)
+        t_ms = round(self.clock.position(now))
+        if t_ms < self._last_ms - AudioClock.SNAP_MS:
+            self.inputs.append((self._last_ms, EXPIRE))
+            self.inputs.append((t_ms, SEEK))
+            self.judge.seek(t_ms)
+        else:
+            t_ms = max(t_ms, self._last_ms)
+        self._last_ms = t_ms
+        return t_ms
+
+    @property
+    def played(self):
+        """이 곡에서 레인 키를 한 번이라도 눌렀는지."""
+        return any(code < EXPIRE for _, code in self.inputs)
+
+    def replay_events(self):
+        """지금까지의 입력 기록 + 마지막 시각까지의 놓침 처리."""
+        return self.inputs + [(self._last_ms, EXPIRE)]
+
+    def handle_key(self, event):
+        """MainWindow.keyPressEvent 에서 넘겨준다. 처리했으면 True."""
+        if event.key() == Qt.Key_F3:
+            self.show_overlay = not self.show_overlay
+            return True
+        if event.key() not in LANE_KEYS:
+            return False
+        if event.isAutoRepeat():
+            return True
+        # 처리하는 시각이 아니라 눌린 시각으로 판정한다: 이벤트 루프가 밀린 만큼은 판정 오차가 아니다
+        received = time.perf_counter()
+        at = self.keys.time_of(event.timestamp(), received)
+        self.input_lag_ms.append((received - at) * 1000.0)
+        before = self._last_ms
+        t_ms = self._now(received)      # 되감기 확인은 지금 시각으로
+        if t_ms >= before:
+            # 이미 판정한 시각(before) 보다 앞으로는 가지 않는다 (리플레이 순서)
+            t_ms = min(t_ms, max(round(self.clock.position(at)), before))
+        lane = LANE_KEYS.index(event.key())
+        self.inputs.append((t_ms, lane))
+        self.judge.hit(lane, t_ms)
+        return True
+
+    def stats(self):
+        fi = np.asarray(self.frame_intervals) if self.frame_intervals else np.zeros(1)
+        pm = np.asarray(self.paint_ms) if self.paint_ms else np.zeros(1)
+        errs = np.asarray(self.clock.errors) if self.clock.errors else np.zeros(1)
+        lag = np.asarray(self.input_lag_ms) if self.input_lag_ms else np.zeros(1)
+        return {
+            "fps": float(1000.0 / fi.mean()) if fi.mean() > 0 else 0.0,
+            "frame_jitter_ms": float(fi.std()),
+            "paint_ms_mean": float(pm.mean()),
+            "paint_ms_p99": float(np.percentile(pm, 99)),
+            "clock_err_ms": float(np.abs(errs).mean()),
+            "dropped_frames": self.dropped,
+            "input_lag_ms": float(lag.mean()),
+        }
+
+    # ── 그리기 ──
+    def paintEvent(self, event):
+        t0 = time.perf_counter()
+        p = QPainter(self)
+        p.setRenderHint(QPainter.Antialiasing)
+        w, h = self.width(), self.height()
+        lanes = len(LANE_KEYS)
+        lane_w = min(110, w // (lanes + 2))
+        left = (w - lane_w * lanes) // 2
+        hit_y = h - 90
+
+        p.fillRect(self.rect(), QColor("#f7f9fa"))
+        for i in range(lanes):
+            p.fillRect(left + i * lane_w + 1, 0, lane_w - 2, h, QColor("#ffffff"))
+        p.fillRect(left, hit_y - 2, lane_w * lanes, 4, QColor("#23272f"))
+
+        now = self.clock.position()
+        if self.chart is not None and len(self.chart):
+            times = self.chart.times_ms
+            lo = np.searchsorted(times, now - MISS_MS)
+            hi = np.searchsorted(times, now + LOOKAHEAD_MS)
+            px_per_ms = hit_y / LOOKAHEAD_MS
+            for idx in range(lo, hi):
+                if self.judge.state[idx] > 0:
+                    continue
+                lane = int(self.chart.lanes[idx])
+                y = hit_y - (float(times[idx]) - now) * px_per_ms
+                color = QColor(LANE_COLORS[lane % len(LANE_COLORS)])
+                if self.judge.state[idx] < 0:
+                    color.setAlpha(70)
+                p.fillRect(QRectF(left + lane * lane_w + 6, y - 7, lane_w - 12, 14), color)
+
+            # 현재 가사 줄
+            starts = self.chart.line_starts
+            k = int(np.searchsorted(starts, now, side='right')) - 1
+            if 0 <= k < len(self.chart.line_rows):
+                row = int(self.chart.line_rows[k])
+                if row < len(self.lines):
+                    p.setPen(QColor("#23272f"))
+                    p.setFont(QFont("Arial", 18, QFont.Bold))
+                    p.drawText(QRectF(0, 24, w, 40), Qt.AlignCenter, self.lines[row][1])
+
+        j = self.judge
+        p.setPen(QColor("#23272f"))
+        p.setFont(QFont("Arial", 16, QFont.Bold))
+        p.drawText(QRectF(0, hit_y + 16, w, 28), Qt.AlignCenter,
+                   f"{j.score}   x{j.combo}" + (f"   {j.last[0]}" if j.last else ""))
+        p.setFont(QFont("Arial", 12))
+        p.setPen(QColor("#666"))
+        keys = "  ".join(chr(k) for k in LANE_KEYS)
+        p.drawText(QRectF(0, hit_y + 48, w, 24), Qt.AlignCenter, keys)
+        if self.board is not None:
+            top, mine = self.board
+            text = "\n".join(f"{i}. {name}  {score}" for i, (name, score, *_) in enumerate(top[:5], 1))
+            if mine is not None:
+                text += f"\nBEST {mine[0]}  #{mine[1]}"
+            p.drawText(QRectF(w - 230, 10, 220, 120), Qt.AlignRight | Qt.AlignTop, text)
+
+        if self.show_overlay:
+            s = self.stats()
+            last_off = f"{j.last[1]:+.1f}" if j.last and j.last[1] is not None else "-"
+            text = (f"fps {s['fps']:.0f}  jitter {s['frame_jitter_ms']:.2f} ms\n"
+                    f"paint {s['paint_ms_mean']:.2f} / p99 {s['paint_ms_p99']:.2f} ms\n"
+                    f"clock err {s['clock_err_ms']:.1f} ms  dropped {s['dropped_frames']}\n"
+                    f"last hit {last_off} ms  input lag {s['input_lag_ms']:.1f} ms")
+            p.setFont(QFont("Courier", 10))
+            p.drawText(QRectF(10, 10, 320, 80), Qt.AlignLeft | Qt.AlignTop, text)
+        p.end()
+        self.paint_ms.append((time.perf_counter() - t0) * 1000.0)
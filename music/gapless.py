@@ -0,0 +1,220 @@
+# music/gapless.py
+# QMediaPlayer 두 개를 번갈아 쓰는 갭리스 플레이어
+import time
+
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+# QMediaPlayer 열거값. QtMultimedia 는 진짜 플레이어를 만들 때만 불러온다
+# (시스템 오디오 라이브러리 없이도 가짜 플레이어로 전환/무음 측정을 시험할 수 있게)
+PLAYING_STATE = 1       # PLAYING_STATE
+END_OF_MEDIA = 7        # END_OF_MEDIA
+
+
+class GaplessPlayer(QObject):
+    """QMediaPlayer 와 같은 인터페이스. 다음 곡을 대기 플레이어에 미리 열어 두었다가
+    현재 곡이 끝나기 직전에 넘겨서 곡 사이 무음을 없앤다."""
+    positionChanged = pyqtSignal('qint64')
+    durationChanged = pyqtSignal('qint64')
+    mediaStatusChanged = pyqtSignal(int)
+    stateChanged = pyqtSignal(int)
+    advanced = pyqtSignal(object)   # 미리 열어 둔 곡으로 넘어갔을 때 그 token
+
+    LEAD_MS = 15   # 출력 지연을 감안해 이만큼 먼저 다음 곡을 시작한다
+
+    def __init__(self, parent=None, players=None, clock=time.perf_counter):
+        """players/clock 은 테스트에서 가짜 플레이어와 시계를 넣을 때만."""
+        super().__init__(parent)
+        if not players:
+            from PyQt5.QtMultimedia import QMediaPlayer
+            players = [QMediaPlayer(self), QMediaPlayer(self)]
+        self._players = list(players)
+        self._clock = clock
+        self._active = 0
+        self._streams = [None, None]   # setMedia 에 넘긴 QIODevice 를 재생하는 동안 붙잡아 둔다
+        self._next_token = None
+        self.gapless = True
+
+        # 곡 사이 무음 측정 (ms)
+        self.last_gap_ms = None
+        self.gaps = []
+        self._end_t = None          # 이전 곡 소리가 끝난 시각 (clock)
+        self._await_start = False   # 새 곡의 첫 위치 갱신을 기다리는 중
+
+        self._switch_timer = QTimer(self)
+        self._switch_timer.setSingleShot(True)
+        self._switch_timer.setTimerType(Qt.PreciseTimer)
+        self._switch_timer.timeout.connect(self._check_switch)
+
+        for i, p in enumerate(self._players):
+            p.positionChanged.connect(lambda pos, i=i: self._on_position(i, pos))
+            p.durationChanged.connect(lambda d, i=i: self._forward(i, self.durationChanged, d))
+            p.mediaStatusChanged.connect(lambda s, i=i: self._on_status(i, s))
+            p.stateChanged.connect(lambda s, i=i: self._forward(i, self.stateChanged, s))
+
+    # ── QMediaPlayer 호환 ──
+    @property
+    def current(self):
+        return self._players[self._active]
+
+    @property
+    def standby(self):
+        return self._players[1 - self._active]
+
+    def setMedia(self, content, stream=None):
+        self._switch_timer.stop()
+        self._await_start = self._end_t is not None
+        self.current.setMedia(content, stream)
+        self._streams[self._active] = stream
+
+    def play(self):
+        self.current.play()
+
+    def pause(self):
+        self.current.pause()
+
+    def stop(self):
+        self._switch_timer.stop()
+        self._end_t = None
+        self.current.stop()
+
+    def state(self):
+        return self.current.state()
+
+    def position(self):
+        return self.current.position()
+
+    def duration(self):
+        return self.current.duration()
+
+    def setPosition(self, pos):
+        self.current.setPosition(pos)
+        self._arm(pos)
+
+    def setVolume(self, vol):
+        # 곡마다 라우드니스 보정이 달라서 현재 플레이어에만 건다 (대기 쪽은 preload 에서)
+        self.current.setVolume(vol)
+
+    def volume(self):
+        return self.current.volume()
+
+    def setNotifyInterval(self, ms):
+        for p in self._players:
+            p.setNotifyInterval(ms)
+
+    def notifyInterval(self):
+        return self.current.notifyInterval()
+
+    # ── 미리 열기 ──
+    @property
+    def preloaded_token(self):
+        return self._next_token
+
+    def preload(self, content, token, volume=None, stream=None):
+        """다음 곡을 대기 플레이어에 열고 pause 로 버퍼를 채워 둔다.
+        volume 을 주지 않으면 지금 곡의 볼륨을 그대로 쓴다."""
+        if not self.gapless:
+            return
+        if token == self._next_token:
+            return
+        self._next_token = token
+        p = self.standby
+        p.setVolume(self.current.volume() if volume is None else volume)
+        p.setMedia(content, stream)
+        self._streams[1 - self._active] = stream
+        p.pause()
+        self._arm(self.current.position())
+
+    def clear_preload(self):
+        if self._next_token is None:
+            return
+        self._next_token = None
+        self._switch_timer.stop()
+        self.standby.stop()
+        from PyQt5.QtMultimedia import QMediaContent
+        self.standby.setMedia(QMediaContent())
+        self._streams[1 - self._active] = None
+
+    def setGapless(self, on):
+        self.gapless = on
+        if not on:
+            self.clear_preload()
+
+    # ── 내부 ──
+    def _forward(self, i, signal, value):
+        if i == self._active:
+            signal.emit(value)
+
+    def _on_position(self, i, pos):
+        if i != self._active:
+            return
+        now = self._clock()
+        if self._await_start and pos > 0:
+            # 새 곡이 실제로 시작된 시각 = 지금 - 이미 재생된 길이
+            self._record_gap(now - pos / 1000.0)
+        self.positionChanged.emit(pos)
+        self._arm(pos)
+
+    def _arm(self, pos):
+        # 끝나기 직전(LEAD_MS 전)에 깨어나도록 타이머를 맞춘다
+        if self._next_token is None or self.current.state() != PLAYING_STATE:
+            return
+        remaining = self.current.duration() - pos
+        if remaining <= 0:
+            return
+        self._switch_timer.start(max(0, remaining - self.LEAD_MS))
+
+    def _check_switch(self):
+        if self._next_token is None or self.current.state() != PLAYING_STATE:
+            return
+        remaining = self.current.duration() - self.current.position()
+        if remaining > self.LEAD_MS:
+            self._switch_timer.start(remaining - self.LEAD_MS)
+            return
+        self._switch(self._clock() + max(remaining, 0) / 1000.0)
+
+    def _on_status(self, i, status):
+        if i != self._active:
+            return
+        if status == END_OF_MEDIA:
+            if self._next_token is not None:
+                self._switch(self._clock())
+                return
+            self._end_t = self._clock()
+            self.mediaStatusChanged.emit(status)
+            if not self._await_start:
+                # 핸들러가 바로 다음 곡을 열지 않았다면 (재생 목록 끝) 측정하지 않는다
+                self._end_t = None
+            return
+        self.mediaStatusChanged.emit(status)
+
+    def _switch(self, end_t):
+        self._switch_timer.stop()
+        old, new = self.current, self.standby
+        token, self._next_token = self._next_token, None
+        new.play()
+        self._active = 1 - self._active
+        self._end_t = end_t
+        self._await_start = True
+        old.stop()
+        self.durationChanged.emit(new.duration())
+        self.stateChanged.emit(new.state())
+        self.advanced.emit(token)
+
+    def _record_gap(self, start_t):
+        self._await_start = False
+        if self._end_t is None:
+            return
+        gap = max(0.0, (start_t - self._end_t) * 1000.0)
+        self._end_t = None
+        self.last_gap_ms = gap
+        self.gaps.append(gap)
+
+    def gap_stats(self):
+        if not self.gaps:
+            return {"count": 0, "last_ms": None, "max_ms": None, "mean_ms": None}
+        return {
+            "count": len(self.gaps),
+            "last_ms": self.last_gap_ms,
+            "max_ms": max(self.gaps),
+            "mean_ms": sum(self.gaps) / len(self.gaps),
+        }
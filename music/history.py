@@ -0,0 +1,219 @@
+# music/history.py
+# 사용자별 재생 기록, 이어 듣기 위치, 게임 점수
+# 위치 보고(positionChanged)마다 쓰면 너무 느리므로 GUI 쪽에서 모아 두었다가
+# 몇 초에 한 번 DB 스레드에서 트랜잭션 하나로 쓴다 (write-behind).
+import time
+
+from PyQt5.QtCore import QObject, QTimer
+
+from music import db
+
+FLUSH_MS = 5000             # 모아 둔 것을 쓰는 주기 (앱이 죽으면 최대 이만큼 잃는다)
+MAX_BATCH = 256             # 재생/점수 기록이 이만큼 쌓이면 주기를 기다리지 않는다
+RESUME_MIN_MS = 5000        # 이보다 앞이면 처음부터 튼다
+COMPLETE_TAIL_MS = 3000     # 끝에서 이만큼 안쪽까지 들었으면 다 들은 것으로 본다
+BOARD_SIZE = 10
+
+SQL_USER_ID = "SELECT id FROM users WHERE username = ?"
+SQL_ADD_PLAY = ("INSERT INTO plays(user_id, fn, started_at, played_ms, completed)"
+                " VALUES (?, ?, ?, ?, ?)")
+SQL_SET_POSITION = """
+    INSERT INTO positions(user_id, fn, position_ms, updated_at) VALUES (?, ?, ?, ?)
+    ON CONFLICT(user_id, fn) DO UPDATE SET
+        position_ms = excluded.position_ms, updated_at = excluded.updated_at
+"""
+SQL_ADD_SCORE = ("INSERT INTO scores(user_id, fn, chart_ver, score, max_combo,"
+                 " perfect, great, good, miss, played_at, replay) VALUES (?,?,?,?,?,?,?,?,?,?,?)")
+# 순위표는 사용자·곡·차트 버전마다 최고 기록 한 줄만 두고 (fn, chart_ver, score) 색인으로 읽는다
+SQL_SET_BEST = """
+    INSERT INTO best_scores(user_id, fn, chart_ver, score, max_combo, played_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, fn, chart_ver) DO UPDATE SET
+        score = excluded.score, max_combo = excluded.max_combo, played_at = excluded.played_at
+    WHERE excluded.score > best_scores.score
+"""
+# 점수를 다시 매긴 뒤(music.replay) 처음부터 만든다. MAX() 와 함께 고른 열은 그 행의 값이다
+SQL_REBUILD_BEST = """
+    INSERT INTO best_scores
+    SELECT user_id, fn, chart_ver, MAX(score), max_combo, played_at
+    FROM scores GROUP BY user_id, fn, chart_ver
+"""
+SQL_POSITIONS = "SELECT fn, position_ms FROM positions WHERE user_id = ?"
+SQL_BOARD = """
+    SELECT u.username, b.score, b.max_combo, b.played_at
+    FROM best_scores b JOIN users u ON u.id = b.user_id
+    WHERE b.fn = ? AND b.chart_ver = ?
+    ORDER BY b.score DESC LIMIT ?
+"""
+SQL_BEST = "SELECT score FROM best_scores WHERE user_id = ? AND fn = ? AND chart_ver = ?"
+SQL_RANK = "SELECT COUNT(*) + 1 FROM best_scores WHERE fn = ? AND chart_ver = ? AND score > ?"
+SQL_RECENT = ("SELECT fn, started_at, played_ms, completed FROM plays"
+              " WHERE user_id = ? ORDER BY started_at DESC LIMIT ?")
+
+
+# ── 쿼리 (DB 스레드에서 conn 과 함께 불린다) ──
+def user_id(conn, username):
+    row = conn.execute(SQL_USER_ID, (username,)).fetchone()
+    return row[0] if row else None
+
+
+def record_batch(conn, username, plays, positions, scores):
+    """plays: [(fn, started_at, played_ms, completed)], positions: {fn: ms},
+    scores: [(fn, chart_ver, score, max_combo, perfect, great, good, miss, played_at, replay)].
+    쓴 줄 수. 없는 사용자면 0 (기록하지 않는다)."""
+    uid = user_id(conn, username)
+    if uid is None:
+        return 0
+    now = time.time()
+    with conn:
+        conn.executemany(SQL_ADD_PLAY, ((uid,) + p for p in plays))
+        conn.executemany(SQL_SET_POSITION, ((uid, fn, ms, now) for fn, ms in positions.items()))
+        conn.executemany(SQL_ADD_SCORE, ((uid,) + s for s in scores))
+        conn.executemany(SQL_SET_BEST, ((uid,) + s[:4] + s[8:9] for s in scores))
+    return len(plays) + len(positions) + len(scores)
+
+
+def resume_positions(conn, username):
+    """{fn: 저장된 위치 ms}."""
+    uid = user_id(conn, username)
+    if uid is None:
+        return {}
+    return dict(conn.execute(SQL_POSITIONS, (uid,)))
+
+
+def leaderboard(conn, fn, chart_ver, username=None, limit=BOARD_SIZE):
+    """(상위 [(username, score, max_combo, played_at)], username 의 (최고 점수, 순위) 또는 None)."""
+    top = conn.execute(SQL_BOARD, (fn, chart_ver, limit)).fetchall()
+    mine = None
+    uid = user_id(conn, username) if username else None
+    if uid is not None:
+        row = conn.execute(SQL_BEST, (uid, fn, chart_ver)).fetchone()
+        if row:
+            rank = conn.execute(SQL_RANK, (fn, chart_ver, row[0])).fetchone()[0]
+            mine = (row[0], rank)
+    return top, mine
+
+
+def recent_plays(conn, username, limit=50):
+    uid = user_id(conn, username)
+    if uid is None:
+        return []
+    return conn.execute(SQL_RECENT, (uid, limit)).fetchall()
+
+
+class HistoryRecorder(QObject):
+    """GUI 스레드에서 쓰는 기록기. 부르는 비용은 리스트/딕셔너리에 넣는 정도이고,
+    실제 쓰기는 flush() 가 DB 스레드에 한 번에 넘긴다.
+
+    이어 듣기 위치는 로그인할 때 한 번 읽어 메모리에 두고, 그 뒤로는 여기서 고친다.
+    """
+
+    def __init__(self, username, database=None, parent=None, flush_ms=FLUSH_MS):
+        super().__init__(parent)
+        self.db = database or db.get_database()
+        self.username = username
+        self.positions = {}
+        self._plays = []
+        self._scores = []
+        self._dirty = {}            # fn → 마지막 위치 (같은 곡은 마지막 값 하나만 쓴다)
+        self._current = None        # [fn, started_at, duration_ms, 마지막 위치]
+        self.events = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self._timer = QTimer(self)
+        self._timer.setInterval(flush_ms)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+        self._load_positions()
+
+    def _load_positions(self):
+        user = self.username
+        self.db.submit(
+            resume_positions, user,
+            on_done=lambda pos: user == self.username and self._merge_positions(pos),
+        )
+
+    def _merge_positions(self, saved):
+        # 읽는 동안 이미 새로 생긴 위치가 더 최신이다
+        self.positions = dict(saved, **self.positions)
+
+    def set_user(self, username):
+        """로그아웃 → 다른 사용자로 로그인."""
+        self.track_finished()
+        self.flush()
+        self.username = username
+        self.positions = {}
+        self._load_positions()
+
+    # ── 재생 ──
+    @property
+    def current(self):
+        return self._current[0] if self._current else None
+
+    def resume_position(self, fn):
+        pos = self.positions.get(fn, 0)
+        return pos if pos >= RESUME_MIN_MS else 0
+
+    def track_started(self, fn, duration_ms=None):
+        self.track_finished()
+        self._current = [fn, time.time(), duration_ms, 0]
+
+    def track_position(self, pos):
+        cur = self._current
+        if cur is not None:
+            cur[3] = pos
+            self.positions[cur[0]] = self._dirty[cur[0]] = pos
+            self.events += 1
+
+    def track_finished(self):
+        """지금 곡의 재생 기록을 남긴다. 다 들었으면 이어 듣기 위치를 지운다."""
+        cur, self._current = self._current, None
+        if cur is None:
+            return
+        fn, started, dur, pos = cur
+        completed = bool(dur) and pos >= dur - COMPLETE_TAIL_MS
+        if completed:
+            self.positions[fn] = self._dirty[fn] = 0
+        self._plays.append((fn, started, int(pos), int(completed)))
+        self._event()
+
+    def add_score(self, fn, chart_ver, judge, replay=None):
+        """replay: music.replay.Replay.to_bytes() (없으면 다시 채점할 수 없다)."""
+        c = judge.counts
+        self._scores.append((fn, chart_ver, judge.score, judge.max_combo, c["PERFECT"],
+                             c["GREAT"], c["GOOD"], c["MISS"], time.time(), replay))
+        self._event()
+
+    def _event(self):
+        self.events += 1
+        if len(self._plays) + len(self._scores) >= MAX_BATCH:
+            self.flush()
+
+    # ── 쓰기 ──
+    def flush(self, wait=False):
+        """모아 둔 기록을 DB 스레드로 넘긴다. wait=True 면 다 쓸 때까지 기다린다 (종료할 때)."""
+        if not (self._plays or self._scores or self._dirty):
+            return
+        args = (self.username, self._plays, self._dirty, self._scores)
+        self._plays, self._dirty, self._scores = [], {}, []
+        self.flushes += 1
+        if wait:
+            self.rows_written += self.db.call(record_batch, *args)
+        else:
+            self.db.submit(record_batch, *args, on_done=self._written)
+
+    def _written(self, n):
+        self.rows_written += n
+
+    def close(self):
+        self._timer.stop()
+        self.track_finished()
+        self.flush(wait=True)
+
+    # ── 순위표 ──
+    def leaderboard(self, fn, chart_ver, on_done):
+        """on_done((top, mine)) 은 GUI 스레드에서 불린다."""
+        self.db.submit(leaderboard, fn, chart_ver, self.username, on_done=on_done)
+
+    def stats(self):
+        return {"events": self.events, "flushes": self.flushes, "rows_written": self.rows_written}
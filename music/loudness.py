@@ -0,0 +1,284 @@
+# music/loudness.py
+# ITU-R BS.1770 통합 라우드니스(LUFS)와 샘플 피크를 WAV 블록 단위로 계산한다.
+# K-가중 필터는 규격대로 신호 전체에 이어서 거는 IIR 이다. 파이썬으로 샘플마다 돌리면
+# 느리므로 K_BLOCK 샘플씩 FFT 컨볼루션(1/A 임펄스 응답)으로 풀고, 앞 블록의 입출력을
+# 상태로 넘겨 블록 경계에서도 한 번에 건 것과 같은 값이 나온다.
+#   python -m music.loudness              # assets/music 의 WAV 분석 → 카탈로그에 저장
+#   python -m music.loudness a.wav b.wav  # 결과만 출력
+import argparse
+import logging
+import math
+import os
+import sys
+import threading
+import time
+import wave
+from collections import namedtuple
+from functools import lru_cache, partial
+
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from music.bundle import open_wav, source_name
+from music.chart import _pcm_to_float
+from music.tasks import make_pool
+
+log = logging.getLogger(__name__)
+
+LOUDNESS_VERSION = 2         # 2: K-가중을 블록마다 따로가 아니라 이어서 건다
+TARGET_LUFS = -16.0        # 이보다 큰 곡만 줄인다 (QMediaPlayer 볼륨은 100 이 최대)
+SUB_BLOCK_S = 0.1          # 400 ms 게이팅 블록을 75% 겹치게 만드는 100 ms 단위
+READ_SUB_BLOCKS = 50       # 한 번에 읽는 양 = 5초
+K_BLOCK = 1 << 15          # K-가중 필터를 FFT 로 한 번에 푸는 길이 (상태는 블록 사이로 넘긴다)
+ABS_GATE = -70.0
+REL_GATE = -10.0
+# 채널 가중치 (L, R, C, LFE, Ls, Rs)
+CHANNEL_WEIGHTS = (1.0, 1.0, 1.0, 0.0, 1.41, 1.41)
+
+Loudness = namedtuple("Loudness", ["lufs", "peak_db"])   # 무음이면 lufs/peak_db 가 None
+
+
+@lru_cache(maxsize=16)
+def k_weighting(rate):
+    """K-가중 두 biquad (고역 셸빙, RLB 고역 통과) 를 곱한 4차 (b, a). a[0] == 1."""
+    # 1단: 머리 효과를 흉내 낸 고역 셸빙 (+4 dB)
+    k = math.tan(math.pi * 1681.974450955533 / rate)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf_b = ((vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0)
+    shelf_a = (1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0)
+    # 2단: RLB 고역 통과 (38 Hz)
+    k = math.tan(math.pi * 38.13547087602444 / rate)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k * k
+    hp_b = (1.0, -2.0, 1.0)
+    hp_a = (1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0)
+    return np.convolve(shelf_b, hp_b), np.convolve(shelf_a, hp_a)
+
+
+@lru_cache(maxsize=16)
+def _pole_response_fft(rate, n):
+    """1/A(z) 임펄스 응답 앞 n 개의 rfft (길이 2n, 선형 컨볼루션용)."""
+    a = [float(v) for v in k_weighting(rate)[1]]
+    p = len(a) - 1
+    g = [0.0] * n
+    for i in range(n):
+        acc = 1.0 if i == 0 else 0.0
+        for j in range(1, min(i, p) + 1):
+            acc -= a[j] * g[i - j]
+        g[i] = acc
+    return np.fft.rfft(g, 2 * n)
+
+
+class KFilter:
+    """채널마다 K-가중을 이어서 건다: 여러 번 나눠 불러도 한 번에 부른 것과 같다."""
+
+    def __init__(self, rate, channels, block=K_BLOCK):
+        self.rate = rate
+        self.block = block
+        self.b, self.a = k_weighting(rate)
+        p = len(self.a) - 1
+        self._x = np.zeros((p, channels))     # 앞 블록의 마지막 입력 p 개 (오래된 것부터)
+        self._y = np.zeros((p, channels))     # 앞 블록의 마지막 출력 p 개
+
+    def __call__(self, x):
+        """x: (샘플 수, 채널) → 같은 모양의 K-가중 신호 (float64)."""
+        out = np.empty(x.shape)
+        for s in range(0, len(x), self.block):
+            out[s:s + self.block] = self._filter(x[s:s + self.block])
+        return out
+
+    def _filter(self, x):
+        m, p = len(x), len(self.a) - 1
+        xp = np.concatenate((self._x, x))
+        v = sum(self.b[i] * xp[p - i:p - i + m] for i in range(p + 1))
+        # 앞 블록 출력이 이어지는 몫은 입력 앞쪽에 더한 것과 같다 (y = g * (v + u))
+        yh = self._y
+        for j in range(min(p, m)):
+            v[j] -= sum(self.a[i] * yh[p + j - i] for i in range(j + 1, p + 1))
+        n = 2 * self.block
+        y = np.fft.irfft(np.fft.rfft(v, n, axis=0) * _pole_response_fft(self.rate, self.block)[:, None],
+                         n, axis=0)[:m]
+        self._x = xp[-p:]
+        self._y = np.concatenate((yh, y))[-p:]
+        return y
+
+
+def _sub_block_energy(y):
+    """y: K-가중된 (블록 수, n, 채널) → 블록마다 채널 가중 합한 평균 제곱."""
+    ms = np.einsum('bfc,bfc->bc', y, y) / y.shape[1]
+    ch = y.shape[2]
+    weights = np.array(CHANNEL_WEIGHTS[:ch] if ch <= len(CHANNEL_WEIGHTS) else
+                       CHANNEL_WEIGHTS + (1.0,) * (ch - len(CHANNEL_WEIGHTS)))
+    return ms @ weights
+
+
+def integrated(energies):
+    """100 ms 블록 에너지 → 게이팅된 통합 라우드니스 (LUFS). 블록이 모자라거나 무음이면 None."""
+    e = np.asarray(energies, dtype=np.float64)
+    if len(e) < 4:
+        return None
+    c = np.concatenate(([0.0], np.cumsum(e)))
+    z = (c[4:] - c[:-4]) / 4.0                  # 400 ms 블록 (75% 겹침)
+    with np.errstate(divide='ignore'):
+        lk = -0.691 + 10 * np.log10(z)
+    z = z[lk > ABS_GATE]
+    if not len(z):
+        return None
+    gate = -0.691 + 10 * math.log10(z.mean()) + REL_GATE
+    with np.errstate(divide='ignore'):
+        z = z[-0.691 + 10 * np.log10(z) > gate]
+    return -0.691 + 10 * math.log10(z.mean())
+
+
+def analyze_wav(path):
+    with open_wav(path) as w:
+        rate, ch, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+        n = int(round(rate * SUB_BLOCK_S))
+        kw = KFilter(rate, ch)
+        energies = []
+        peak = 0.0
+        while True:
+            raw = w.readframes(n * READ_SUB_BLOCKS)
+            if not raw:
+                break
+            x = _pcm_to_float(raw, width)
+            frames = len(x) // ch
+            if not frames:
+                continue
+            x = x[:frames * ch].reshape(frames, ch)
+            peak = max(peak, float(np.abs(x).max()))
+            y = kw(x)
+            blocks = frames // n       # 마지막 100 ms 미만 조각은 규격대로 버린다
+            if blocks:
+                energies.append(_sub_block_energy(y[:blocks * n].reshape(blocks, n, ch)))
+    lufs = integrated(np.concatenate(energies)) if energies else None
+    peak_db = 20 * math.log10(peak) if peak > 0 else None
+    return Loudness(lufs, peak_db)
+
+
+def analyze_file(path):
+    """WAV 가 아니면 None (MP3 디코더가 없다). path 는 파일 경로 또는 BundleEntry."""
+    if not source_name(path).lower().endswith('.wav'):
+        return None
+    return analyze_wav(path)
+
+
+def _analyze_item(item):
+    fn, path = item
+    try:
+        return fn, analyze_file(path)
+    except (wave.Error, EOFError, OSError, ValueError):
+        return fn, None
+
+
+def analyze_many(items, workers=None):
+    """items: [(fn, path), ...] → (fn, Loudness|None) 를 끝나는 대로 낸다."""
+    items = list(items)
+    with make_pool(workers) as pool:
+        yield from pool.map(_analyze_item, items, chunksize=1)
+
+
+def gain_db(lufs, target=TARGET_LUFS):
+    """곡을 target 에 맞추는 이득 (dB). 볼륨을 100 넘게 올릴 수 없으므로 줄이기만 한다."""
+    if lufs is None:
+        return 0.0
+    return min(0.0, target - lufs)
+
+
+def volume_for(lufs, base=100, target=TARGET_LUFS):
+    # QMediaPlayer 볼륨은 선형 배율이다
+    return max(0, min(100, round(base * 10 ** (gain_db(lufs, target) / 20))))
+
+
+class LoudnessScanner(QObject):
+    """프로세스 풀(코어 수만큼)에서 분석하고, 끝난 곡부터 GUI 스레드로 보낸다."""
+    resultsReady = pyqtSignal(list)   # [(fn, Loudness|None), ...]
+    failed = pyqtSignal(str, str)     # 파일 이름, 오류 (작업 프로세스가 죽는 등)
+    finished = pyqtSignal()
+
+    def __init__(self, workers=None, parent=None):
+        super().__init__(parent)
+        self.workers = workers
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._cancelled = False
+
+    def start(self, items):
+        items = list(items)
+        if self._cancelled:
+            return
+        if not items:
+            self.finished.emit()
+            return
+        pool = self._pool = make_pool(self.workers)
+        with self._lock:
+            self._pending = len(items)
+        for item in items:
+            pool.submit(_analyze_item, item).add_done_callback(partial(self._done, item[0]))
+
+    def _done(self, fn, fut):
+        # 풀의 관리 스레드에서 불린다. 시그널은 큐를 거쳐 GUI 스레드로 간다
+        if fut.cancelled() or self._cancelled:
+            return
+        try:
+            self.resultsReady.emit([fut.result()])
+        except Exception as e:
+            # 실패한 곡은 저장하지 않는다 (다음 실행 때 다시 분석). 남은 개수는 그대로 센다
+            log.warning("loudness failed for %s: %s", fn, e)
+            self.failed.emit(fn, str(e) or type(e).__name__)
+        with self._lock:
+            self._pending -= 1
+            done = self._pending == 0
+            pool = self._pool if done else None
+            if done:
+                self._pool = None
+        if done:
+            if pool is not None:
+                pool.shutdown(wait=False)   # 일이 끝났으니 작업 프로세스를 놓아준다
+            self.finished.emit()
+
+    def cancel(self):
+        self._cancelled = True
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def main(argv=None):
+    from music.catalog import TrackCatalog
+    ap = argparse.ArgumentParser(description="Measure integrated loudness (LUFS) of WAV files")
+    ap.add_argument('files', nargs='*')
+    ap.add_argument('-j', '--jobs', type=int, default=None)
+    args = ap.parse_args(argv)
+
+    catalog = None
+    if args.files:
+        items = [(os.path.basename(p), p) for p in args.files]
+    else:
+        catalog = TrackCatalog()
+        catalog.sync()
+        items = [(fn, catalog.path_of(fn)) for fn in catalog.unanalyzed(LOUDNESS_VERSION)]
+    t0 = time.perf_counter()
+    results = []
+    for fn, r in analyze_many(items, args.jobs):
+        results.append((fn, r))
+        if r is None:
+            print(f"{fn}: skipped", file=sys.stderr)
+        else:
+            lufs = "-inf" if r.lufs is None else f"{r.lufs:.1f}"
+            peak = "-inf" if r.peak_db is None else f"{r.peak_db:.1f}"
+            print(f"{fn}: {lufs} LUFS, peak {peak} dBFS, gain {gain_db(r.lufs):+.1f} dB")
+    if catalog is not None:
+        catalog.store_loudness(results, LOUDNESS_VERSION)
+        catalog.close()
+    sec = time.perf_counter() - t0
+    print(f"{len(results)} tracks in {sec:.1f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# music/lyrics.py
+# 가사 파싱(.txt 섹션 태그, .lrc 타임스탬프)과 재생 위치에 맞춘 하이라이트
+import html
+import re
+from array import array
+from bisect import bisect_right
+
+from PyQt5.QtGui import QColor, QTextCharFormat, QTextCursor, QTextFormat
+from PyQt5.QtWidgets import QTextBrowser, QTextEdit
+
+from music.bundle import read_text
+
+_TIME_TAG = re.compile(r'\[(\d+):(\d{1,2})(?:[.:](\d{1,3}))?\]')
+_SECTION_TAG = re.compile(r'^\[([A-Za-z]+)(\d*)\]$')
+_META_TAG = re.compile(r'^\[(ti|ar|al|by|re|ve|length|offset):(.*)\]$', re.I)
+
+
+class Lyrics:
+    """화면에 그릴 줄 목록 + (있으면) 시간순 타임라인.
+
+    lines: [(kind, text)]  kind 는 'line' 또는 'section'
+    times/rows: 같은 길이의 정렬된 배열. times[k] 에 rows[k] 번째 줄이 시작된다.
+    """
+
+    def __init__(self, lines, times=(), rows=()):
+        self.lines = lines
+        self.times = array('q', times)
+        self.rows = array('l', rows)
+        self._cur = -1
+
+    @property
+    def timed(self):
+        return len(self.times) > 0
+
+    def index_at(self, pos):
+        """pos(ms) 에 해당하는 타임라인 인덱스. 시작 전이면 -1."""
+        t, k = self.times, self._cur
+        # 대부분의 틱은 같은 줄이거나 바로 다음 줄이다
+        if 0 <= k < len(t) and t[k] <= pos and (k + 1 == len(t) or pos < t[k + 1]):
+            return k
+        if 0 <= k + 1 < len(t) and t[k + 1] <= pos and (k + 2 == len(t) or pos < t[k + 2]):
+            self._cur = k + 1
+            return k + 1
+        self._cur = bisect_right(t, pos) - 1
+        return self._cur
+
+    def row_at(self, pos):
+        k = self.index_at(pos)
+        return self.rows[k] if k >= 0 else -1
+
+
+def _section_label(m):
+    name, num = m.group(1), m.group(2)
+    return f"{name.capitalize()} {int(num)}" if num else name.capitalize()
+
+
+def parse_text(text):
+    lines = []
+    for raw in text.splitlines():
+        s = raw.strip()
+        m = _SECTION_TAG.match(s)
+        lines.append(('section', _section_label(m)) if m else ('line', s))
+    return Lyrics(lines)
+
+
+def parse_lrc(text):
+    lines, stamps = [], []
+    offset = 0
+    for raw in text.splitlines():
+        s = raw.strip()
+        meta = _META_TAG.match(s)
+        if meta:
+            if meta.group(1).lower() == 'offset':
+                try:
+                    offset = int(meta.group(2).strip())
+                except ValueError:
+                    pass
+            continue
+        m = _SECTION_TAG.match(s)
+        if m:
+            lines.append(('section', _section_label(m)))
+            continue
+        pos, found = 0, []
+        while True:
+            tm = _TIME_TAG.match(s, pos)
+            if not tm:
+                break
+            frac = tm.group(3) or '0'
+            ms = int(frac.ljust(3, '0')[:3])
+            found.append((int(tm.group(1)) * 60 + int(tm.group(2))) * 1000 + ms)
+            pos = tm.end()
+        row = len(lines)
+        lines.append(('line', s[pos:].strip()))
+        for t in found:
+            stamps.append((t - offset, row))
+    stamps.sort()
+    return Lyrics(lines, (t for t, _ in stamps), (r for _, r in stamps))
+
+
+def load_lyrics(lyrics_dir, title):
+    """{title}.lrc 가 있으면 시간 정보와 함께, 없으면 {title}.txt 를 읽는다.
+    lyrics_dir 는 가사 폴더 경로 또는 번들의 가사 섹션."""
+    text = read_text(lyrics_dir, f"{title}.lrc")
+    if text is not None:
+        return parse_lrc(text)
+    text = read_text(lyrics_dir, f"{title}.txt")
+    if text is not None:
+        return parse_text(text)
+    return None
+
+
+class LyricsView(QTextBrowser):
+    """문서는 곡을 바꿀 때 한 번만 만들고, 재생 중에는 현재 줄 강조만 옮긴다."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lyrics = None
+        self._row = -1
+        self._active_fmt = QTextCharFormat()
+        self._active_fmt.setBackground(QColor("#eaf2fb"))
+        self._active_fmt.setForeground(QColor("#2563eb"))
+        self._active_fmt.setProperty(QTextFormat.FullWidthSelection, True)
+
+    @property
+    def timed(self):
+        return self._lyrics is not None and self._lyrics.timed
+
+    def set_lyrics(self, lyrics):
+        self._lyrics = lyrics
+        self._row = -1
+        self.setExtraSelections([])
+        if lyrics is None:
+            self.setText("(No lyrics)")
+            return
+        # 한 줄 = 한 블록이 되도록 <p> 로 감싼다 (블록 번호 == 줄 번호)
+        parts = []
+        for kind, text in lyrics.lines:
+            if kind == 'section':
+                parts.append(f'<p style="color:#9aa3ad; font-size:13px;">{html.escape(text)}</p>')
+            else:
+                parts.append(f'<p>{html.escape(text) or "&nbsp;"}</p>')
+        self.setHtml("".join(parts))
+        self.verticalScrollBar().setValue(0)
+
+    def row_at(self, pos):
+        """pos 에서 강조할 줄 (시간 가사가 아니면 -1)."""
+        return self._lyrics.row_at(pos) if self.timed else -1
+
+    def set_position(self, pos):
+        if not self.timed:
+            return
+        row = self._lyrics.row_at(pos)
+        if row == self._row:
+            return
+        self._row = row
+        if row < 0:
+            self.setExtraSelections([])
+            return
+        block = self.document().findBlockByNumber(row)
+        sel = QTextEdit.ExtraSelection()
+        sel.cursor = QTextCursor(block)
+        sel.format = self._active_fmt
+        self.setExtraSelections([sel])
+        # 현재 줄을 가운데로
+        rect = self.document().documentLayout().blockBoundingRect(block)
+        bar = self.verticalScrollBar()
+        bar.setValue(int(rect.center().y() - self.viewport().height() / 2))
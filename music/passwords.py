@@ -0,0 +1,152 @@
+# music/passwords.py
+# 비밀번호 해시: 소금(salt)을 친 scrypt. 비용(N)은 이 컴퓨터에서 한 번 재서 목표 지연에 맞춘다.
+# 저장 형식: "scrypt$<log2 N>$<r>$<p>$<salt b64>$<hash b64>" (users.password_hash 열에 그대로)
+# 예전 행(소금 없는 sha256 hex 64자)도 확인하고, 로그인에 성공하면 새 형식으로 바꿔 쓴다.
+import base64
+import hashlib
+import hmac
+import math
+import os
+import re
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QThreadPool
+
+from music import trace
+from music.tasks import run_async
+
+SCHEME = "scrypt"
+TARGET_MS = float(os.environ.get("MUSIC_KDF_MS", "250"))
+LN_MIN, LN_MAX = 14, 18     # N = 2^14 (16 MiB) .. 2^18 (256 MiB), r=8 기준
+R, P = 8, 1
+SALT_BYTES = 16
+DK_LEN = 32
+
+_LEGACY = re.compile(r"[0-9a-f]{64}")
+
+
+def _scrypt(password, salt, ln, r, p):
+    # 메모리 = 128 * r * N 바이트. 기본 maxmem(32 MiB)으로는 N=2^15 부터 막히므로 넉넉히 준다
+    return hashlib.scrypt(password.encode(), salt=salt, n=1 << ln, r=r, p=p,
+                          maxmem=(256 * r << ln) + (1 << 20), dklen=DK_LEN)
+
+
+def _b64(raw):
+    return base64.b64encode(raw).decode().rstrip("=")
+
+
+def _unb64(s):
+    return base64.b64decode(s + "=" * (-len(s) % 4))
+
+
+def calibrate(target_ms=TARGET_MS):
+    """LN_MIN 에서 한 번 재고 (N 을 두 배로 하면 시간도 두 배) 목표를 넘지 않는 가장 큰 log2 N."""
+    salt = os.urandom(SALT_BYTES)
+    t0 = time.perf_counter()
+    _scrypt("calibrate", salt, LN_MIN, R, P)
+    ms = (time.perf_counter() - t0) * 1000
+    ln = LN_MIN + int(math.floor(math.log2(max(target_ms / ms, 1.0))))
+    return min(ln, LN_MAX)
+
+
+def hash_password(password, ln):
+    salt = os.urandom(SALT_BYTES)
+    digest = _scrypt(password, salt, ln, R, P)
+    return f"{SCHEME}${ln}${R}${P}${_b64(salt)}${_b64(digest)}"
+
+
+def parse(stored):
+    """(ln, r, p) — 예전 sha256 행이면 None. 알 수 없는 형식이면 ValueError."""
+    if _LEGACY.fullmatch(stored):
+        return None
+    scheme, ln, r, p, _salt, _digest = stored.split("$")
+    if scheme != SCHEME:
+        raise ValueError(f"unknown password scheme: {scheme}")
+    return int(ln), int(r), int(p)
+
+
+def verify_password(password, stored):
+    """stored 와 맞으면 True. 비교는 hmac.compare_digest 로 (시간으로 새지 않게)."""
+    if not stored:
+        return False
+    try:
+        params = parse(stored)
+        if params is None:
+            legacy = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(legacy, stored)
+        ln, r, p = params
+        _scheme, _ln, _r, _p, salt, digest = stored.split("$")
+        return hmac.compare_digest(_scrypt(password, _unb64(salt), ln, r, p), _unb64(digest))
+    except (ValueError, TypeError):
+        return False
+
+
+def needs_rehash(stored, ln):
+    """예전 sha256 이거나 지금 비용보다 싸게 만든 해시면 True (더 비싼 것은 낮추지 않는다)."""
+    params = parse(stored)
+    return params is None or params[0] < ln or params[1:] != (R, P)
+
+
+class PasswordHasher(QObject):
+    """해시/확인은 전용 스레드 하나에서 (GUI 는 결과 콜백만 받는다).
+
+    만들 때 calibrate() 를 먼저 넣어 두므로, 스레드가 하나뿐인 풀에서 뒤에 오는 작업은
+    항상 잰 값을 본다. 이미 저장된 해시의 확인은 행에 적힌 비용을 쓰므로 보정과 상관없다.
+    """
+
+    def __init__(self, target_ms=TARGET_MS, parent=None):
+        super().__init__(parent)
+        self.target_ms = target_ms
+        self.ln = None
+        self._calibrated = threading.Event()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)    # 한 번에 하나: 메모리(수십 MiB)와 CPU 를 겹쳐 쓰지 않게
+        self._pool.setExpiryTimeout(-1)
+        run_async(self._calibrate, pool=self._pool)
+
+    def _calibrate(self):
+        try:
+            with trace.span("kdf calibrate", 'task'):
+                self.ln = calibrate(self.target_ms)
+        finally:
+            # 재다가 실패해도 cost() 를 기다리는 쪽이 멈추지 않도록 가장 낮은 비용으로 둔다
+            if self.ln is None:
+                self.ln = LN_MIN
+            self._calibrated.set()
+        return self.ln
+
+    def cost(self):
+        """보정된 log2 N (끝날 때까지 기다린다 — 작업 스레드나 스크립트에서만)."""
+        self._calibrated.wait()
+        return self.ln
+
+    def _check(self, password, stored):
+        ok = verify_password(password, stored)
+        return ok, ok and needs_rehash(stored, self.cost())
+
+    def hash(self, password, on_done, on_error=None):
+        """on_done(저장할 문자열)."""
+        run_async(lambda: hash_password(password, self.cost()),
+                  on_done=on_done, on_error=on_error, pool=self._pool)
+
+    def verify(self, password, stored, on_done, on_error=None):
+        """on_done((맞는지, 새 형식으로 바꿔 써야 하는지))."""
+        run_async(self._check, password, stored,
+                  on_done=on_done, on_error=on_error, pool=self._pool)
+
+    def wait(self):
+        self._pool.waitForDone()
+
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_hasher():
+    """프로세스 전체에서 하나. 처음 부를 때 보정을 시작한다 (GUI 스레드에서 부를 것)."""
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = PasswordHasher()
+        return _instance
@@ -0,0 +1,120 @@
+# music/playlist_model.py
+# 재생 목록 모델: 화면에 보이는 줄만 data() 로 그려지고, 순서 변경은 옮긴 구간만 갱신한다
+import os
+from bisect import bisect_left
+
+from PyQt5.QtCore import QModelIndex, QStringListModel, Qt
+
+# 표시 문자열은 QStringListModel(C++) 에 둔다. QListView 는 다시 배치할 때마다 행마다
+# rowCount()/index() 를 부르는데, 이게 파이썬 메서드면 5만 줄에서 한 번에 100 ms 가 넘는다.
+
+
+def ms_to_mmss(ms):
+    s = ms // 1000
+    return f"{s//60:02d}:{s%60:02d}"
+
+
+class PlaylistModel(QStringListModel):
+    FnRole = Qt.UserRole
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.fns = []          # 재생 순서 (MainWindow.playlist 와 같은 객체)
+        self._row = {}         # fn → 행 번호
+        self.durations = {}    # fn → ms
+
+    def label(self, fn):
+        title = os.path.splitext(fn)[0]
+        dur = self.durations.get(fn)
+        return title if dur is None else f"{title}  ·  {ms_to_mmss(dur)}"
+
+    # ── 채우기 ──
+    def reset(self, fns, durations=None):
+        self.fns[:] = fns
+        self._row = {fn: i for i, fn in enumerate(self.fns)}
+        self.durations.clear()
+        self.durations.update(durations or {})
+        self.setStringList([self.label(fn) for fn in self.fns])
+
+    def row_of(self, fn):
+        return self._row.get(fn, -1)
+
+    def set_duration(self, fn, dur):
+        if dur is None:
+            self.durations.pop(fn, None)
+        else:
+            self.durations[fn] = dur
+        row = self._row.get(fn)
+        if row is not None:
+            self.setData(self.index(row), self.label(fn))
+
+    def total_ms(self):
+        return sum(self.durations.values())
+
+    # ── QStringListModel ──
+    def data(self, index, role=Qt.DisplayRole):
+        if role == self.FnRole:
+            return self.fns[index.row()] if index.isValid() else None
+        return super().data(index, role)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled
+
+    def supportedDropActions(self):
+        return Qt.MoveAction
+
+    def moveRows(self, src_parent, src, count, dst_parent, dst):
+        """[src, src+count) 를 dst 앞으로. 사이에 낀 행의 번호만 다시 매긴다."""
+        n = len(self.fns)
+        if count <= 0 or src < 0 or src + count > n or not 0 <= dst <= n \
+                or src <= dst <= src + count:
+            return False
+        moved = self.fns[src:src + count]
+        del self.fns[src:src + count]
+        at = dst if dst < src else dst - count
+        self.fns[at:at] = moved
+        lo, hi = min(src, at), max(src + count, at + count)
+        for i in range(lo, hi):
+            self._row[self.fns[i]] = i
+        # 표시 문자열 이동과 rowsMoved 알림은 C++ 쪽이 한다
+        return super().moveRows(QModelIndex(), src, count, QModelIndex(), dst)
+
+
+class FilteredModel(QStringListModel):
+    """검색 결과만 보여 주는 얇은 모델. 원본 행 번호 목록만 갖는다."""
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.rows = []
+        source.dataChanged.connect(self._on_source_changed)
+
+    def set_rows(self, rows):
+        self.rows = rows
+        fns, label = self.source.fns, self.source.label
+        self.setStringList([label(fns[r]) for r in rows])
+
+    def source_row(self, row):
+        return self.rows[row]
+
+    def row_from_source(self, src_row):
+        # rows 는 원본 순서대로 정렬되어 있다
+        i = bisect_left(self.rows, src_row)
+        return i if i < len(self.rows) and self.rows[i] == src_row else -1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == PlaylistModel.FnRole:
+            return self.source.fns[self.rows[index.row()]] if index.isValid() else None
+        return super().data(index, role)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def _on_source_changed(self, top, bottom, roles=()):
+        row = self.row_from_source(top.row())
+        if row >= 0:
+            self.setData(self.index(row), self.source.data(top))
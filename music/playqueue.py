@@ -0,0 +1,170 @@
+# music/playqueue.py
+# 재생 순서 엔진: 셔플 순열, 지나온 곡(이전), 다음에 들을 곡 대기열.
+# 곡은 행 번호가 아니라 파일 이름(fn)으로 기억한다. 행을 끌어 옮겨도 PlaylistModel 이
+# 옮긴 구간의 fn → 행만 고쳐 두므로 여기서는 할 일이 없다 (목록 전체를 다시 만들지 않는다).
+import random
+from collections import deque
+
+HISTORY_MAX = 1000
+
+
+class PlayQueue:
+    """fns 는 재생 목록 (PlaylistModel.fns 와 같은 리스트), row_of(fn) 은 행 번호 (없으면 -1).
+
+    다음 곡을 고르는 순서: 대기열 → 이전으로 돌아오기 전에 듣던 곡 → 셔플 순열 / 목록 순서.
+    셔플은 한 바퀴 동안 모든 곡을 한 번씩만 튼다. 순열은 미리 섞지 않고 다음 곡을
+    꺼낼 때마다 남은 곡 중 하나를 앞으로 바꿔 넣는다 (Fisher–Yates 를 한 칸씩).
+    peek/played/back/enqueue 는 모두 O(1) (셔플을 켜거나 목록을 다시 채울 때만 O(n)).
+    """
+
+    def __init__(self, fns, row_of, rng=None):
+        self.fns = fns
+        self.row_of = row_of
+        self.rng = rng or random.Random()
+        self.current = None
+        self.history = deque(maxlen=HISTORY_MAX)   # 지나온 곡 (마지막이 바로 전 곡)
+        self.forward = []       # back() 으로 되돌아오기 전에 듣던 곡들 (마지막이 먼저)
+        self.upnext = deque()   # 사용자가 넣은 다음 곡들
+        self.shuffle = False
+        self._perm = []         # [0, _dealt) 은 이번 바퀴에 튼 곡, 나머지는 아직 안 튼 곡
+        self._pos = {}          # fn → _perm 안의 자리
+        self._dealt = 0
+        self._drawn = False     # _perm[_dealt] 를 이미 뽑아 두었는지 (peek 가 같은 곡을 돌려주도록)
+
+    # ── 상태 바꾸기 ──
+    def set_shuffle(self, on):
+        self.shuffle = on
+        self._perm, self._pos = [], {}
+        if on:
+            self._reshuffle()
+
+    def reset(self):
+        """목록이 통째로 바뀌었을 때 (다시 읽기). 사라진 곡은 대기열/기록에서 꺼낼 때 건너뛴다."""
+        if self.current is not None and self.row_of(self.current) < 0:
+            self.current = None
+        if self.shuffle:
+            self._reshuffle()
+
+    def _reshuffle(self):
+        self._perm = list(self.fns)
+        self._pos = {fn: i for i, fn in enumerate(self._perm)}
+        self._dealt = 0
+        self._drawn = False
+        if self.current is not None:
+            self._deal(self.current)
+
+    def _swap(self, i, j):
+        a, b = self._perm[i], self._perm[j]
+        self._perm[i], self._perm[j] = b, a
+        self._pos[a], self._pos[b] = j, i
+
+    def _deal(self, fn):
+        """fn 을 이번 바퀴에 튼 곡으로 (아직 안 튼 곡이면 튼 칸 바로 뒤로 옮긴다)."""
+        i = self._pos.get(fn)
+        if i is None or i < self._dealt:
+            return
+        self._swap(self._dealt, i)
+        self._dealt += 1
+        self._drawn = False
+
+    def _draw(self, wrap):
+        n = len(self._perm)
+        if self._dealt >= n:
+            if not wrap or n == 0:
+                return None
+            # 새 바퀴: 방금 곡이 첫 곡으로 다시 나오지 않게 맨 뒤로 빼 두고 뽑는다
+            self._dealt = 0
+            self._drawn = False
+            if n > 1 and self.current in self._pos:
+                self._swap(self._pos[self.current], n - 1)
+                self._swap(0, self.rng.randrange(n - 1))
+                self._drawn = True
+        if not self._drawn:
+            self._swap(self._dealt, self.rng.randrange(self._dealt, n))
+            self._drawn = True
+        return self._perm[self._dealt]
+
+    def _linear(self, wrap):
+        n = len(self.fns)
+        row = self.row_of(self.current) if self.current is not None else -1
+        if row + 1 < n:
+            return self.fns[row + 1]
+        return self.fns[0] if wrap and n else None
+
+    def _top(self, stack, left=False):
+        # 목록에서 사라진 곡은 꺼내 버린다 (한 번씩만 버리므로 합쳐서 O(1))
+        while stack and self.row_of(stack[0] if left else stack[-1]) < 0:
+            stack.popleft() if left else stack.pop()
+        return (stack[0] if left else stack[-1]) if stack else None
+
+    def _drop_current(self):
+        # 대기열 맨 앞이 지금 듣는 곡이면 이미 이룬 것으로 보고 버린다 (지금 곡이 바뀌기 전에)
+        while self.upnext and self.upnext[0] == self.current:
+            self.upnext.popleft()
+
+    def _next(self, wrap):
+        """(다음 곡, 그 곡을 꺼내는 함수 또는 None)."""
+        self._drop_current()
+        fn = self._top(self.upnext, left=True)
+        if fn is not None:
+            return fn, self.upnext.popleft
+        fn = self._top(self.forward)
+        if fn is not None:
+            return fn, self.forward.pop
+        if not self.fns:
+            return None, None
+        return (self._draw(wrap) if self.shuffle else self._linear(wrap)), None
+
+    # ── 조회/이동 ──
+    def peek(self, wrap=True):
+        """다음 곡 fn (played 하기 전까지 같은 값). wrap=False 면 목록/바퀴 끝에서 None."""
+        return self._next(wrap)[0]
+
+    def played(self, fn):
+        """fn 재생을 시작했다. peek 한 곡이면 그 자리에서 꺼내고, 아니면 (클릭 등) 그리로 건너뛴다."""
+        self._drop_current()
+        if fn == self.current:
+            return      # 한 곡 반복 / 처음부터 다시 / back() 이 이미 옮겨 둔 곡
+        nxt, take = self._next(False)   # 바퀴 끝에서 새 바퀴를 미리 시작하지 않게
+        if fn != nxt:
+            self.forward.clear()
+        elif take is not None:
+            take()
+        if self.shuffle:
+            self._deal(fn)
+        if self.current is not None:
+            self.history.append(self.current)
+        self.current = fn
+
+    def back(self):
+        """이전 곡 fn: 지나온 곡이 있으면 그것, 없으면 목록의 앞 행 (셔플이면 지금 곡)."""
+        self._drop_current()
+        fn = self._top(self.history)
+        if fn is not None:
+            self.history.pop()
+        elif self.current is None or self.shuffle:
+            return self.current
+        else:
+            fn = self.fns[(self.row_of(self.current) - 1) % len(self.fns)]
+        if self.current is not None:
+            self.forward.append(self.current)
+        self.current = fn
+        return fn
+
+    def enqueue(self, fn):
+        """대기열 맨 뒤에."""
+        self.upnext.append(fn)
+
+    def play_next(self, fn):
+        """지금 곡 바로 다음에."""
+        self._drop_current()
+        self.upnext.appendleft(fn)
+
+    def check(self):
+        """내부 일관성 (벤치마크/디버깅용). 어긋나면 AssertionError."""
+        if self.shuffle:
+            assert len(self._perm) == len(self._pos) == len(set(self._perm))
+            assert all(self._pos[fn] == i for i, fn in enumerate(self._perm))
+            assert 0 <= self._dealt <= len(self._perm)
+            assert set(self._perm) == set(self.fns)
+        assert self.current is None or self.row_of(self.current) >= 0
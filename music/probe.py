@@ -0,0 +1,200 @@
+# music/probe.py
+# WAV/MP3 헤더만 읽어 길이·샘플레이트·채널 수를 구한다 (디코딩 없음)
+import os
+import struct
+import threading
+from collections import namedtuple
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from music.bundle import open_binary, source_name, source_size
+
+ProbeResult = namedtuple("ProbeResult", ["duration_ms", "sample_rate", "channels"])
+UNKNOWN = ProbeResult(None, None, None)
+
+# MPEG 비트레이트(kbps) 표: [버전 1/2][레이어 1..3]
+_MP3_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+_MP3_SCAN_BYTES = 64 * 1024
+
+
+def probe_wav(f, file_size):
+    riff = f.read(12)
+    if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+        return UNKNOWN
+    rate = channels = byte_rate = None
+    while True:
+        hdr = f.read(8)
+        if len(hdr) < 8:
+            return UNKNOWN
+        cid, size = hdr[:4], struct.unpack('<I', hdr[4:])[0]
+        if cid == b'fmt ':
+            fmt = f.read(size)
+            if len(fmt) < 16:
+                return UNKNOWN
+            _, channels, rate, byte_rate = struct.unpack('<HHII', fmt[:12])
+            if size & 1:
+                f.seek(1, os.SEEK_CUR)
+        elif cid == b'data':
+            if not byte_rate:
+                return UNKNOWN
+            # 스트리밍으로 쓰다 만 파일은 data 크기가 0/0xFFFFFFFF 일 수 있다
+            avail = file_size - f.tell()
+            if size == 0 or size > avail:
+                size = avail
+            return ProbeResult(size * 1000 // byte_rate, rate, channels)
+        else:
+            f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def _id3v2_size(head):
+    if head[:3] != b'ID3' or len(head) < 10:
+        return 0
+    b = head[6:10]
+    size = (b[0] << 21) | (b[1] << 14) | (b[2] << 7) | b[3]
+    return 10 + size + (10 if head[5] & 0x10 else 0)
+
+
+def probe_mp3(f, file_size):
+    start = _id3v2_size(f.read(10))
+    f.seek(start)
+    buf = f.read(_MP3_SCAN_BYTES)
+    i = buf.find(b'\xff')
+    while 0 <= i < len(buf) - 4:
+        h = struct.unpack('>I', buf[i:i + 4])[0]
+        ver_bits = (h >> 19) & 3
+        layer_bits = (h >> 17) & 3
+        br_idx = (h >> 12) & 15
+        sr_idx = (h >> 10) & 3
+        if (h >> 21) == 0x7FF and ver_bits != 1 and layer_bits != 0 \
+                and br_idx not in (0, 15) and sr_idx != 3:
+            break
+        i = buf.find(b'\xff', i + 1)
+    else:
+        return UNKNOWN
+
+    version = 1 if ver_bits == 3 else 2
+    layer = 4 - layer_bits
+    rate = _MP3_RATES[ver_bits][sr_idx]
+    channels = 1 if ((h >> 6) & 3) == 3 else 2
+    bitrate = _MP3_BITRATES[(version, layer)][br_idx] * 1000
+    if layer == 1:
+        spf = 384
+    elif layer == 3 and version == 2:
+        spf = 576
+    else:
+        spf = 1152
+
+    # VBR 헤더(Xing/Info, VBRI)에 전체 프레임 수가 있으면 그걸 쓴다
+    if layer == 3:
+        if version == 1:
+            side = 17 if channels == 1 else 32
+        else:
+            side = 9 if channels == 1 else 17
+        for off, tag in ((i + 4 + side, (b'Xing', b'Info')), (i + 4 + 32, (b'VBRI',))):
+            if buf[off:off + 4] in tag:
+                if tag[0] == b'VBRI':
+                    frames = struct.unpack('>I', buf[off + 14:off + 18])[0]
+                elif struct.unpack('>I', buf[off + 4:off + 8])[0] & 1:
+                    frames = struct.unpack('>I', buf[off + 8:off + 12])[0]
+                else:
+                    break
+                return ProbeResult(frames * spf * 1000 // rate, rate, channels)
+
+    # CBR: 남은 바이트 수 / 비트레이트
+    audio = file_size - (start + i)
+    if file_size >= 128:
+        f.seek(file_size - 128)
+        if f.read(3) == b'TAG':
+            audio -= 128
+    return ProbeResult(audio * 8000 // bitrate, rate, channels)
+
+
+def probe_file(path):
+    """path 는 파일 경로 또는 BundleEntry."""
+    name = source_name(path).lower()
+    try:
+        size = source_size(path)
+        with open_binary(path) as f:
+            if name.endswith('.wav'):
+                return probe_wav(f, size)
+            if name.endswith('.mp3'):
+                return probe_mp3(f, size)
+    except (OSError, struct.error):
+        pass
+    return UNKNOWN
+
+
+class _ProbeBatch(QRunnable):
+    def __init__(self, prober, items):
+        super().__init__()
+        self.prober = prober
+        self.items = items
+
+    def run(self):
+        out = []
+        for fn, path in self.items:
+            if self.prober._cancel.is_set():
+                break
+            out.append((fn, probe_file(path)))
+        self.prober._batch_done(out)
+
+
+class MetadataProber(QObject):
+    """스레드 풀에서 헤더를 읽고, 결과를 묶음 단위 시그널로 GUI 스레드에 보낸다."""
+    resultsReady = pyqtSignal(list)   # [(fn, ProbeResult), ...]
+    finished = pyqtSignal()
+
+    def __init__(self, max_workers=None, batch_size=32, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        if max_workers:
+            self.pool.setMaxThreadCount(max_workers)
+        self.batch_size = batch_size
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def start(self, items):
+        """items: [(fn, path), ...]"""
+        items = list(items)
+        self._cancel.clear()
+        if not items:
+            self.finished.emit()
+            return
+        batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        with self._lock:
+            self._pending += len(batches)
+        for b in batches:
+            self.pool.start(_ProbeBatch(self, b))
+
+    def cancel(self):
+        self._cancel.set()
+        self.pool.clear()
+        with self._lock:
+            # clear() 로 빠진 묶음은 run() 이 불리지 않으므로 여기서 정리한다
+            self._pending = min(self._pending, self.pool.activeThreadCount())
+            done = self._pending == 0
+        if done:
+            self.finished.emit()
+
+    def wait(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
+
+    def _batch_done(self, results):
+        if results and not self._cancel.is_set():
+            self.resultsReady.emit(results)
+        with self._lock:
+            if self._pending == 0:
+                return
+            self._pending -= 1
+            done = self._pending == 0
+        if done:
+            self.finished.emit()
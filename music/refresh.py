@@ -0,0 +1,106 @@
+# music/refresh.py
+# 재생 위치/길이/상태로 그리는 위젯들의 갱신을 한 화면 프레임에 한 번으로 모은다.
+# 시그널은 값만 기록하고, 프레임마다 구독자별로 "화면에 보이는 값"(키)을 계산해
+# 지난번과 같으면 건너뛴다 (예: 초 단위 시간 라벨은 1초에 한 번만 바뀐다).
+import time
+from collections import namedtuple
+
+from PyQt5.QtCore import QObject, Qt, QTimer
+from PyQt5.QtGui import QGuiApplication
+
+from music import trace
+
+DEFAULT_FPS = 60
+
+PlaybackState = namedtuple("PlaybackState", ["position", "duration", "state"])
+
+
+class _Subscriber:
+    __slots__ = ("name", "key", "apply", "last", "issued", "skipped")
+
+    def __init__(self, name, key, apply):
+        self.name = name
+        self.key = key
+        self.apply = apply
+        self.last = _Subscriber     # 어떤 키와도 다른 값 → 처음엔 반드시 그린다
+        self.issued = 0
+        self.skipped = 0
+
+
+class RefreshScheduler(QObject):
+    """set_position/set_duration/set_state 는 값만 바꾸고 다음 프레임 갱신을 예약한다.
+
+    subscribe(name, key, apply): key(state) 는 화면에 보이는 값 (싸게 계산할 것),
+    apply(state) 는 실제로 위젯을 고치는 함수. 키가 그대로면 apply 를 부르지 않는다.
+    """
+
+    def __init__(self, parent=None, fps=None):
+        super().__init__(parent)
+        if fps is None:
+            screen = QGuiApplication.primaryScreen()
+            fps = screen.refreshRate() if screen is not None else 0
+        self.period_ms = 1000.0 / (fps if fps and fps > 0 else DEFAULT_FPS)
+        self.state = PlaybackState(0, 0, 0)
+        self._subs = []
+        self._last_flush = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self.flush)
+        self.signals = 0
+        self.frames = 0
+
+    def subscribe(self, name, key, apply):
+        self._subs.append(_Subscriber(name, key, apply))
+        self._schedule()
+
+    # ── 입력 (시그널에 바로 연결한다) ──
+    def set_position(self, pos):
+        self.state = self.state._replace(position=pos)
+        self._schedule()
+
+    def set_duration(self, dur):
+        self.state = self.state._replace(duration=dur)
+        self._schedule()
+
+    def set_state(self, state):
+        self.state = self.state._replace(state=state)
+        self._schedule()
+
+    def invalidate(self):
+        """곡이 바뀌는 등 위젯 내용이 통째로 바뀌었을 때: 다음 프레임에 모두 다시 그린다."""
+        for sub in self._subs:
+            sub.last = _Subscriber
+        self._schedule()
+
+    def _schedule(self):
+        self.signals += 1
+        if self._timer.isActive():
+            return
+        # 지난 갱신에서 한 프레임이 지났으면 바로 (다음 이벤트 루프), 아니면 남은 만큼 기다린다
+        wait = self.period_ms - (time.perf_counter() - self._last_flush) * 1000.0
+        self._timer.start(max(0, int(wait)))
+
+    @trace.traced()
+    def flush(self):
+        self._timer.stop()
+        self._last_flush = time.perf_counter()
+        self.frames += 1
+        s = self.state
+        for sub in self._subs:
+            key = sub.key(s)
+            if key == sub.last:
+                sub.skipped += 1
+                continue
+            sub.last = key
+            sub.issued += 1
+            sub.apply(s)
+
+    def stats(self):
+        issued = sum(sub.issued for sub in self._subs)
+        skipped = sum(sub.skipped for sub in self._subs)
+        return {
+            "signals": self.signals, "frames": self.frames,
+            "issued": issued, "skipped": skipped,
+            "widgets": {sub.name: (sub.issued, sub.skipped) for sub in self._subs},
+        }
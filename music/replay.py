@@ -0,0 +1,238 @@
+# music/replay.py
+# 리듬게임 리플레이: 입력 기록(GamePage.inputs)을 곡 해시·차트 버전과 함께 작게 저장하고,
+# 저장된 세션을 차트에 다시 돌려 점수를 검증/재계산한다.
+#   python -m music.replay rescore            # users.db 의 모든 리플레이를 현재 차트·판정으로 다시 채점
+#   python -m music.replay rescore --apply    # 바뀐 점수를 scores/best_scores 에 반영
+#
+# 이벤트 하나 = varint 하나: (zigzag(이전 이벤트와의 시각 차 ms) << CODE_BITS) | 코드.
+# 보통 간격(수백 ms)이면 2바이트다.
+import argparse
+import struct
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from music.game import EXPIRE, SEEK, Judge
+
+FORMAT_VERSION = 1
+CODE_BITS = 3                   # 레인 0..3, EXPIRE, SEEK
+CHUNK_SESSIONS = 256            # 작업 프로세스에 한 번에 넘기는 세션 수
+
+_MAGIC = b'MQRP'
+# magic, version, chart analyzer, 곡 내용 해시(blake2b-16), 기록 시각, 이벤트 수, 기록 점수, 본문 crc32
+_HEADER = struct.Struct('<4sHH16sdIII')
+
+
+def _zigzag(d):
+    return ((d << 1) ^ (d >> 63)).astype(np.uint64)
+
+
+def _unzigzag(z):
+    return (z >> np.uint64(1)).astype(np.int64) ^ -(z & np.uint64(1)).astype(np.int64)
+
+
+def encode_varints(values):
+    """uint64 배열 → LEB128 바이트 (배열 연산으로 한 번에)."""
+    v = np.asarray(values, dtype=np.uint64)
+    if not len(v):
+        return b''
+    nbytes = np.ones(len(v), dtype=np.int64)
+    for k in range(1, 10):
+        nbytes += (v >> np.uint64(7 * k)) > 0
+    k = np.arange(int(nbytes.max()))
+    groups = ((v[:, None] >> (7 * k).astype(np.uint64)) & np.uint64(0x7f)).astype(np.uint8)
+    groups |= np.where(k < (nbytes - 1)[:, None], 0x80, 0).astype(np.uint8)
+    return groups[k < nbytes[:, None]].tobytes()
+
+
+def decode_varints(data):
+    b = np.frombuffer(data, dtype=np.uint8)
+    if not len(b):
+        return np.zeros(0, dtype=np.uint64)
+    ends = (b & 0x80) == 0
+    if not ends[-1]:
+        raise ValueError("truncated varint")
+    starts = np.concatenate(([0], np.flatnonzero(ends)[:-1] + 1))
+    vid = np.concatenate(([0], np.cumsum(ends[:-1])))
+    shift = ((np.arange(len(b)) - starts[vid]) * 7).astype(np.uint64)
+    return np.bitwise_or.reduceat((b & 0x7f).astype(np.uint64) << shift, starts)
+
+
+class Replay:
+    """한 곡 한 판의 입력 기록. 곡 내용 해시와 차트 분석기 버전에 묶여 있다."""
+
+    def __init__(self, track_digest, chart_ver, times_ms, codes, score=0, recorded_at=None):
+        self.track_digest = track_digest          # DerivedCache.content_hash 와 같은 hex 문자열
+        self.chart_ver = int(chart_ver)
+        self.times_ms = np.asarray(times_ms, dtype=np.int64)
+        self.codes = np.asarray(codes, dtype=np.int64)
+        self.score = int(score)
+        self.recorded_at = time.time() if recorded_at is None else recorded_at
+
+    @classmethod
+    def from_inputs(cls, track_digest, chart_ver, events, score=0):
+        """events: GamePage.replay_events() 의 [(t_ms, code)]."""
+        arr = np.asarray(events, dtype=np.int64).reshape(-1, 2)
+        return cls(track_digest, chart_ver, arr[:, 0], arr[:, 1], score)
+
+    def __len__(self):
+        return len(self.times_ms)
+
+    def to_bytes(self):
+        d = np.diff(self.times_ms, prepend=0)
+        body = encode_varints((_zigzag(d) << np.uint64(CODE_BITS)) | self.codes.astype(np.uint64))
+        head = _HEADER.pack(_MAGIC, FORMAT_VERSION, self.chart_ver, bytes.fromhex(self.track_digest),
+                            self.recorded_at, len(self), self.score, zlib.crc32(body))
+        return head + body
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, ver, chart_ver, digest, at, n, score, crc = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or ver != FORMAT_VERSION:
+            raise ValueError("not a replay")
+        body = memoryview(data)[_HEADER.size:]
+        if zlib.crc32(body) != crc:
+            raise ValueError("replay checksum mismatch")
+        v = decode_varints(body)
+        if len(v) != n:
+            raise ValueError("replay event count mismatch")
+        codes = (v & np.uint64((1 << CODE_BITS) - 1)).astype(np.int64)
+        times = np.cumsum(_unzigzag(v >> np.uint64(CODE_BITS)))
+        return cls(digest.hex(), chart_ver, times, codes, score, at)
+
+
+def rescore(replay, chart):
+    """(점수, 최대 콤보, {판정: 개수}). 게임 화면과 같은 순서로 Judge 를 움직인다."""
+    judge = Judge(chart)
+    for t, code in zip(replay.times_ms.tolist(), replay.codes.tolist()):
+        if code == SEEK:
+            judge.seek(t)
+        elif code == EXPIRE:
+            judge.expire(t)
+        else:
+            judge.hit(code, t)
+    return judge.score, judge.max_combo, dict(judge.counts)
+
+
+def _rescore_chunk(job):
+    """작업 프로세스: (차트 바이트, [(id, 리플레이 바이트)]) → [(id, 결과 또는 None)]."""
+    from music.chart import Chart
+    chart_bytes, sessions = job
+    chart = Chart.from_bytes(chart_bytes)
+    out = []
+    for sid, blob in sessions:
+        try:
+            out.append((sid, rescore(Replay.from_bytes(blob), chart)))
+        except ValueError:
+            out.append((sid, None))
+    return out
+
+
+def rescore_many(jobs, workers=None):
+    """jobs: [(chart_bytes, [(id, blob), ...])] → (id, 결과 또는 None) 를 끝나는 대로 낸다.
+    차트는 CHUNK_SESSIONS 세션마다 한 번만 작업 프로세스로 보낸다."""
+    from music.tasks import make_pool
+    chunks = [(chart, sessions[i:i + CHUNK_SESSIONS])
+              for chart, sessions in jobs for i in range(0, len(sessions), CHUNK_SESSIONS)]
+    if workers == 1:
+        for part in map(_rescore_chunk, chunks):
+            yield from part
+        return
+    with make_pool(workers) as pool:
+        for part in pool.map(_rescore_chunk, chunks):
+            yield from part
+
+
+# ── DB 쪽 (users.db 의 scores.replay) ──
+SQL_REPLAYS = "SELECT id, fn, score, replay FROM scores WHERE replay IS NOT NULL ORDER BY fn"
+SQL_UPDATE_SCORE = ("UPDATE scores SET chart_ver = ?, score = ?, max_combo = ?,"
+                    " perfect = ?, great = ?, good = ?, miss = ? WHERE id = ?")
+
+
+def _track_charts(catalog, cache, fns):
+    """{fn: (곡 내용 해시, Chart)}. 지금 목록에 없는 곡은 빠진다."""
+    from music.chart import load_chart
+    have = {t.fn for t in catalog.tracks()}
+    out = {}
+    for fn in fns:
+        if fn in have and fn.lower().endswith('.wav'):
+            path = catalog.path_of(fn)
+            out[fn] = (cache.content_hash(path), load_chart(path, cache))
+    return out
+
+
+def rescore_db(conn, catalog, cache, workers=None, apply=False):
+    """모든 리플레이를 현재 차트·판정 창으로 다시 채점한다. 통계 dict."""
+    from music import history
+    rows = conn.execute(SQL_REPLAYS).fetchall()
+    charts = _track_charts(catalog, cache, {row[1] for row in rows})
+    jobs, old = {}, {}
+    stale = bad = 0
+    for sid, fn, score, blob in rows:
+        entry = charts.get(fn)
+        if len(blob) < _HEADER.size:
+            bad += 1
+            continue
+        # 곡 내용이 바뀌었으면 그 입력은 다른 음악에 대한 것이다
+        if entry is None or _HEADER.unpack_from(blob, 0)[3].hex() != entry[0]:
+            stale += 1
+            continue
+        jobs.setdefault(fn, []).append((sid, blob))
+        old[sid] = score
+    t0 = time.perf_counter()
+    updates, changed = [], 0
+    work = [(charts[fn][1].to_bytes(), sessions) for fn, sessions in jobs.items()]
+    ver_of = {sid: charts[fn][1].analyzer for fn, sessions in jobs.items() for sid, _ in sessions}
+    for sid, result in rescore_many(work, workers):
+        if result is None:
+            bad += 1
+            continue
+        score, max_combo, c = result
+        changed += score != old[sid]
+        updates.append((ver_of[sid], score, max_combo, c["PERFECT"], c["GREAT"], c["GOOD"],
+                        c["MISS"], sid))
+    sec = time.perf_counter() - t0
+    if apply and updates:
+        with conn:
+            conn.executemany(SQL_UPDATE_SCORE, updates)
+            conn.execute("DELETE FROM best_scores")
+            conn.execute(history.SQL_REBUILD_BEST)
+    return {"sessions": len(rows), "rescored": len(updates), "changed": changed,
+            "stale": stale, "corrupt": bad, "seconds": sec}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Re-score stored rhythm-game replays")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p = sub.add_parser('rescore', help="replay every stored session against the current charts")
+    p.add_argument('--db', default=None, help="users.db path")
+    p.add_argument('-j', '--jobs', type=int, default=None)
+    p.add_argument('--apply', action='store_true', help="write new scores and rebuild leaderboards")
+    args = ap.parse_args(argv)
+
+    from music import db
+    from music.cache import DerivedCache
+    from music.catalog import TrackCatalog
+    conn = db.connect(args.db or db.DB_PATH)
+    db.migrate(conn)
+    catalog = TrackCatalog()
+    catalog.sync()
+    cache = DerivedCache()
+    try:
+        st = rescore_db(conn, catalog, cache, args.jobs, args.apply)
+    finally:
+        cache.close()
+        catalog.close()
+        conn.close()
+    rate = st['rescored'] / st['seconds'] if st['seconds'] else 0.0
+    print(f"{st['rescored']}/{st['sessions']} sessions re-scored in {st['seconds']:.2f} s "
+          f"({rate:.0f}/s): {st['changed']} changed, {st['stale']} stale (track changed), "
+          f"{st['corrupt']} corrupt" + ("" if args.apply else "  (dry run, use --apply)"),
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
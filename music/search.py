@@ -0,0 +1,111 @@
+# music/search.py
+# 제목 + 가사 n-gram 역색인. 한글은 띄어쓰기 없이도 부분 일치가 되도록 2-gram 을 쓴다.
+import os
+import re
+import unicodedata
+
+from music.bundle import read_text
+
+_SPACE = re.compile(r'\s+')
+
+
+def normalize(text):
+    return _SPACE.sub(' ', unicodedata.normalize('NFC', text).lower()).strip()
+
+
+def grams(term):
+    """검색어 한 단어의 n-gram. 한 글자면 1-gram."""
+    if len(term) < 2:
+        return {term} if term else set()
+    return {term[i:i + 2] for i in range(len(term) - 1)}
+
+
+class SearchIndex:
+    def __init__(self):
+        self.docs = {}       # key → 정규화된 본문
+        self.postings = {}   # gram → {key}
+
+    def add(self, key, *texts):
+        body = normalize(' '.join(t for t in texts if t))
+        self.docs[key] = body
+        for g in _body_grams(body):
+            self.postings.setdefault(g, set()).add(key)
+
+    def remove(self, key):
+        body = self.docs.pop(key, None)
+        if body is None:
+            return
+        for g in _body_grams(body):
+            s = self.postings.get(g)
+            if s is not None:
+                s.discard(key)
+
+    def search(self, query, within=None):
+        """모든 단어를 포함하는 key 집합. within 이 있으면 그 안에서만 찾는다."""
+        terms = [t for t in normalize(query).split(' ') if t]
+        if not terms:
+            return set(self.docs) if within is None else set(within)
+        sets = []
+        for t in terms:
+            for g in grams(t):
+                s = self.postings.get(g)
+                if not s:
+                    return set()
+                sets.append(s)
+        sets.sort(key=len)
+        if within is not None and len(within) <= len(sets[0]):
+            result = within     # 좁혀 가는 검색은 이전 결과를 바로 확인하는 편이 싸다
+        else:
+            result = set(sets[0])
+            for s in sets[1:]:
+                if len(result) <= len(s) // 8:
+                    break       # 후보가 충분히 적으면 나머지는 부분 문자열 확인으로
+                result &= s
+                if not result:
+                    return result
+            if within is not None:
+                result &= within
+        # n-gram 교집합은 후보일 뿐이라 실제 부분 문자열인지 확인한다
+        docs = self.docs
+        return {k for k in result if all(t in docs[k] for t in terms)}
+
+
+def _body_grams(body):
+    # 공백이 낀 2-gram 도 들어가지만 검색어 단어에는 공백이 없어 쓰이지 않을 뿐이다
+    return set(body) | {body[i:i + 2] for i in range(len(body) - 1)}
+
+
+class IncrementalSearch:
+    """입력할 때마다 부르는 쪽. 앞 검색어를 늘린 경우에는 이전 결과 안에서만 찾는다."""
+
+    def __init__(self, index):
+        self.index = index
+        self._last = ("", None)
+
+    def __call__(self, query):
+        q = normalize(query)
+        prev_q, prev = self._last
+        within = prev if prev is not None and prev_q and q.startswith(prev_q) else None
+        result = self.index.search(q, within)
+        self._last = (q, result)
+        return result
+
+    def reset(self):
+        self._last = ("", None)
+
+
+def build_library_index(fns, lyrics_dir):
+    """곡 제목과 가사 파일(.txt/.lrc/_game.txt)로 색인을 만든다."""
+    index = SearchIndex()
+    for fn in fns:
+        title = os.path.splitext(fn)[0]
+        texts = [title]
+        for name in (f"{title}.txt", f"{title}.lrc", f"{title}_game.txt"):
+            try:
+                text = read_text(lyrics_dir, name)
+            except UnicodeDecodeError:
+                continue
+            if text is not None:
+                texts.append(text)
+        index.add(fn, *texts)
+    return index
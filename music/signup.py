@@ -1,22 +1,9 @@
 # games/signup.py
-import os, sqlite3, hashlib
 from PyQt5.QtWidgets import (
     QDialog, QLabel, QLineEdit, QPushButton,
     QVBoxLayout, QMessageBox
 )
-
-DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'users.db')
-
-def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE,
-            password_hash TEXT
-        )
-    """)
-    return conn
+from music import db, passwords
 
 class SignUpDialog(QDialog):
     def __init__(self):
@@ -56,19 +43,26 @@ class SignUpDialog(QDialog):
             QMessageBox.warning(self, "Error", "비밀번호가 일치하지 않습니다.")
             return
 
-        hashed = hashlib.sha256(pwd.encode()).hexdigest()
-        try:
-            conn = get_db_connection()
-            cur = conn.cursor()
-            cur.execute(
-                "INSERT INTO users(username, password_hash) VALUES (?, ?)",
-                (username, hashed)
-            )
-            conn.commit()
-            conn.close()
-        except sqlite3.IntegrityError:
+        self.btn_signup.setEnabled(False)
+        passwords.get_hasher().hash(
+            pwd,
+            on_done=lambda hashed: db.get_database().submit(
+                db.create_user, username, hashed,
+                on_done=self._on_signup_result,
+                on_error=self._on_db_error,
+            ),
+            on_error=self._on_db_error,
+        )
+
+    def _on_signup_result(self, created):
+        self.btn_signup.setEnabled(True)
+        if not created:
             QMessageBox.critical(self, "Error", "이미 존재하는 아이디입니다.")
             return
 
         QMessageBox.information(self, "Success", "회원가입이 완료되었습니다!")
         self.accept()
+
+    def _on_db_error(self, e):
+        self.btn_signup.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Database error: {e}")
@@ -0,0 +1,91 @@
+# music/startup.py
+# 단계별 시작: 로그인 창이 떠 있는 동안 곡 색인, 무거운 모듈 import, 플레이어 준비를 미리 해 둔다
+import importlib
+import sys
+import time
+
+from PyQt5.QtCore import QEventLoop, QObject, pyqtSignal
+
+from music import trace
+from music.catalog import TrackCatalog
+from music.tasks import run_async
+
+
+class StartupTimes:
+    """t0 (프로세스에서 가장 먼저 찍은 시각) 기준 단계별 경과 시간."""
+
+    def __init__(self, t0):
+        self.t0 = t0
+        self.marks = []
+
+    def mark(self, stage):
+        self.marks.append((stage, (time.perf_counter() - self.t0) * 1000))
+        trace.instant(stage, 'startup')
+
+    def as_dict(self):
+        return dict(self.marks)
+
+    def report(self):
+        return "startup: " + " · ".join(f"{stage} {ms:.0f} ms" for stage, ms in self.marks)
+
+
+def prepare_library():
+    """작업 스레드에서 색인을 디스크와 맞춘다. 연결은 이 스레드에서 열고 닫는다."""
+    catalog = TrackCatalog()
+    try:
+        with trace.span("catalog.sync"):
+            return catalog.sync(), catalog.tracks()
+    finally:
+        catalog.close()
+
+
+class Preloader(QObject):
+    """만들자마자 백그라운드 준비를 시작한다. window() 는 남은 준비를 기다린 뒤 메인 창을 만든다."""
+    ready = pyqtSignal()
+
+    WINDOW_MODULE = 'music.window'
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.library = None
+        self.player = None
+        self._module = None
+        self._pending = 2
+        run_async(prepare_library, on_done=self._on_library, on_error=self._on_failed)
+        run_async(importlib.import_module, self.WINDOW_MODULE,
+                  on_done=self._on_imported, on_error=self._on_failed)
+
+    def _on_library(self, library):
+        self.library = library
+        self._step()
+
+    def _on_imported(self, module):
+        self._module = module
+        # QMediaPlayer 는 GUI 스레드에서 만들어야 한다. 첫 생성 때 미디어 백엔드 플러그인을 읽는다
+        self.player = module.GaplessPlayer()
+        self._step()
+
+    def _on_failed(self, e):
+        # 여기서 실패한 단계는 window() 에서 평소처럼 다시 하므로, 오류도 거기서 드러난다
+        print(f"preload failed: {e}", file=sys.stderr)
+        self._step()
+
+    def _step(self):
+        self._pending -= 1
+        if self._pending == 0:
+            self.ready.emit()
+
+    @property
+    def done(self):
+        return self._pending == 0
+
+    def wait(self):
+        if not self.done:
+            loop = QEventLoop()
+            self.ready.connect(loop.quit)
+            loop.exec_()
+
+    def window(self, username):
+        self.wait()
+        module = self._module or importlib.import_module(self.WINDOW_MODULE)
+        return module.MainWindow(username, library=self.library, player=self.player)
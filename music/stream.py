@@ -0,0 +1,229 @@
+# music/stream.py
+# 재생 위치를 따라 WAV 를 조금씩 읽어 링 버퍼에 담고, 작업 스레드에서 FFT 를 돌려
+# 스펙트럼/VU 값을 GUI 로 보낸다. GUI 스레드는 그리기만 한다.
+import logging
+import threading
+import time
+
+import numpy as np
+from PyQt5.QtCore import QRectF, QThread, pyqtSignal
+from PyQt5.QtGui import QColor, QPainter
+from PyQt5.QtWidgets import QWidget
+
+from music.bundle import open_wav
+from music.chart import _pcm_to_mono
+
+FFT_SIZE = 2048
+N_BANDS = 32
+CHUNK_FRAMES = 4096
+RING_SECONDS = 1.0
+ANALYZE_HZ = 60
+
+log = logging.getLogger(__name__)
+
+
+class RingBuffer:
+    """고정 크기 모노 샘플 버퍼. 절대 샘플 위치(end)까지 채워져 있다."""
+
+    def __init__(self, capacity):
+        self.buf = np.zeros(capacity, dtype=np.float32)
+        self.capacity = capacity
+        self.end = 0        # 마지막으로 쓴 샘플 다음의 절대 위치
+        self.filled = 0
+
+    def reset(self, pos):
+        self.end = pos
+        self.filled = 0
+
+    def write(self, x):
+        total = len(x)
+        if total > self.capacity:
+            x = x[-self.capacity:]
+        n = len(x)
+        i = (self.end + total - n) % self.capacity
+        first = min(n, self.capacity - i)
+        self.buf[i:i + first] = x[:first]
+        self.buf[:n - first] = x[first:]
+        self.end += total
+        self.filled = min(self.capacity, self.filled + total)
+
+    @property
+    def start(self):
+        return self.end - self.filled
+
+    def read(self, stop, n):
+        """절대 위치 stop 에서 끝나는 n 샘플. 버퍼 밖이면 None."""
+        if n > self.filled or stop > self.end or stop - n < self.start:
+            return None
+        idx = np.arange(stop - n, stop) % self.capacity
+        return self.buf[idx]
+
+
+class AnalyzerThread(QThread):
+    """position_fn() (ms) 를 따라가며 분석한다. 결과는 최신 것 하나만 보관한다."""
+    frameReady = pyqtSignal()
+    failed = pyqtSignal(str, str)   # path, 오류 — 그 곡은 분석을 멈추고 다음 open() 을 기다린다
+
+    def __init__(self, position_fn, parent=None):
+        super().__init__(parent)
+        self.position_fn = position_fn
+        self._lock = threading.Lock()
+        self._path = None
+        self._path_changed = False
+        self._running = True
+        self._latest = None
+        self._consumed = True
+        self.produced = 0
+        self.dropped = 0
+
+    # ── GUI 스레드에서 부르는 쪽 ──
+    def open(self, path):
+        with self._lock:
+            self._path = path
+            self._path_changed = True
+
+    def take(self):
+        """가장 최근 프레임 (bands, rms, peak). 새 프레임이 없으면 None."""
+        with self._lock:
+            frame, self._latest = self._latest, None
+            self._consumed = True
+        return frame
+
+    def stop(self):
+        self._running = False
+        self.wait()
+
+    # ── 작업 스레드 ──
+    def run(self):
+        w = None
+        ring = None
+        win = np.hanning(FFT_SIZE).astype(np.float32)
+        edges = None
+        last_pos = None
+        period = 1.0 / ANALYZE_HZ
+        while self._running:
+            t0 = time.perf_counter()
+            with self._lock:
+                changed, path = self._path_changed, self._path
+                self._path_changed = False
+            if changed:
+                if w is not None:
+                    w.close()
+                w = None
+                last_pos = None
+                if path:
+                    try:
+                        w = open_wav(path)
+                        rate = w.getframerate()
+                        ring = RingBuffer(int(rate * RING_SECONDS))
+                        edges = _band_edges(rate)
+                        self._bands = np.zeros(N_BANDS, dtype=np.float32)
+                    except Exception as e:     # 손상/지원하지 않는 형식 (wave 는 RuntimeError 도 낸다)
+                        w = self._fail(w, path, e)
+            if w is not None:
+                pos = int(self.position_fn() * rate / 1000)
+                if pos != last_pos:
+                    last_pos = pos
+                    try:
+                        frame = self._analyze(w, ring, pos, win, edges)
+                    except Exception as e:
+                        w = self._fail(w, path, e)
+                        frame = None
+                    if frame is not None:
+                        self._publish(frame)
+            time.sleep(max(0.0, period - (time.perf_counter() - t0)))
+        if w is not None:
+            w.close()
+
+    def _fail(self, w, path, e):
+        e = str(e) or type(e).__name__
+        log.warning("spectrum analysis stopped for %s: %s", path, e)
+        if w is not None:
+            w.close()
+        self.failed.emit(str(path), e)
+        return None
+
+    def _analyze(self, w, ring, pos, win, edges):
+        nframes = w.getnframes()
+        pos = min(max(pos, FFT_SIZE), nframes)
+        # 버퍼가 현재 위치를 못 덮으면(탐색) 그 직전부터 다시 읽는다
+        if pos > ring.end + CHUNK_FRAMES * 4 or pos - FFT_SIZE < ring.start:
+            start = max(0, pos - FFT_SIZE)
+            w.setpos(start)
+            ring.reset(start)
+        while ring.end < pos:
+            raw = w.readframes(CHUNK_FRAMES)
+            if not raw:
+                break
+            ring.write(_pcm_to_mono(raw, w.getnchannels(), w.getsampwidth()))
+        x = ring.read(min(pos, ring.end), FFT_SIZE)
+        if x is None:
+            return None
+        spec = np.abs(np.fft.rfft(x * win)) / (FFT_SIZE / 4)
+        bands = np.maximum.reduceat(spec, edges)[:N_BANDS]
+        bands = np.clip((20 * np.log10(bands + 1e-6) + 60) / 60, 0, 1).astype(np.float32)
+        # 떨어질 때는 천천히 (시각적 잔상)
+        self._bands = bands = np.maximum(bands, self._bands * 0.85)
+        rms = float(np.sqrt(np.mean(x * x)))
+        peak = float(np.abs(x).max())
+        return bands, rms, peak
+
+    def _publish(self, frame):
+        with self._lock:
+            pending = not self._consumed
+            if pending:
+                self.dropped += 1     # GUI 가 앞 프레임을 아직 못 가져갔다
+            self._latest = frame
+            self._consumed = False
+            self.produced += 1
+        if not pending:
+            self.frameReady.emit()
+
+    def stats(self):
+        return {"produced": self.produced, "dropped": self.dropped}
+
+
+def _band_edges(rate):
+    freqs = np.fft.rfftfreq(FFT_SIZE, 1.0 / rate)
+    hz = np.geomspace(40, min(16000, rate / 2), N_BANDS + 1)
+    edges = np.searchsorted(freqs, hz[:-1])
+    return np.maximum.accumulate(np.maximum(edges, 1))
+
+
+class SpectrumWidget(QWidget):
+    """막대 스펙트럼 + 좌우 VU. 분석은 하지 않고 받은 값만 그린다."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("spectrum")
+        self.setMinimumHeight(48)
+        self.bands = np.zeros(N_BANDS, dtype=np.float32)
+        self.rms = 0.0
+        self.peak = 0.0
+
+    def set_frame(self, frame):
+        if frame is None:
+            return
+        self.bands, self.rms, self.peak = frame
+        self.update()
+
+    def clear(self):
+        self.bands = np.zeros(N_BANDS, dtype=np.float32)
+        self.rms = self.peak = 0.0
+        self.update()
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        w, h = self.width(), self.height()
+        vu_w = 14
+        bar_w = (w - vu_w - 8) / N_BANDS
+        color = QColor("#3182ce")
+        for i, v in enumerate(self.bands):
+            bh = float(v) * h
+            p.fillRect(QRectF(i * bar_w + 1, h - bh, bar_w - 2, bh), color)
+        x = w - vu_w
+        p.fillRect(QRectF(x, 0, vu_w, h), QColor("#eaf2fb"))
+        level = min(1.0, self.rms * 2.5)
+        p.fillRect(QRectF(x, h - level * h, vu_w, level * h), QColor("#38a169"))
+        p.fillRect(QRectF(x, h - min(1.0, self.peak) * h, vu_w, 2), QColor("#e53e3e"))
+        p.end()
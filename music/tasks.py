@@ -0,0 +1,55 @@
+# music/tasks.py
+# GUI 스레드를 막지 않도록 함수를 스레드 풀에서 돌리고 결과를 시그널로 돌려받는다
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from music import trace
+
+_live = set()   # 결과가 전달될 때까지 시그널 객체를 붙잡아 둔다
+
+
+class _TaskSignals(QObject):
+    done = pyqtSignal(object)
+    failed = pyqtSignal(object)
+
+
+class _Task(QRunnable):
+    def __init__(self, fn, args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = _TaskSignals()
+
+    def run(self):
+        try:
+            with trace.span(getattr(self.fn, '__qualname__', 'task'), 'task'):
+                result = self.fn(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.done.emit(result)
+
+
+def run_async(fn, *args, on_done=None, on_error=None, pool=None):
+    task = _Task(fn, args)
+    sig = task.signals
+    _live.add(sig)
+
+    def finish(cb, value):
+        _live.discard(sig)
+        if cb is not None:
+            cb(value)
+
+    sig.done.connect(lambda r: finish(on_done, r))
+    sig.failed.connect(lambda e: finish(on_error, e))
+    (pool or QThreadPool.globalInstance()).start(task)
+
+
+def make_pool(workers=None):
+    """CPU 를 오래 쓰는 일(라우드니스 분석, 리플레이 재채점)용 프로세스 풀."""
+    # 창을 띄운 프로세스(스레드 여럿)를 fork 하지 않도록 spawn 으로 만든다
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                               mp_context=multiprocessing.get_context('spawn'))
@@ -0,0 +1,163 @@
+# music/trace.py
+# 켤 때만 동작하는 계측: 슬롯/파일·DB 입출력 시간과 이벤트 루프 멈춤을 Chrome trace JSON 으로 남긴다
+#   MUSIC_TRACE=trace.json python -m music.main     (또는 python -m music.main --trace trace.json)
+#   결과는 chrome://tracing 이나 https://ui.perfetto.dev 에서 연다
+# 꺼져 있으면 traced 는 함수를 그대로 돌려주고, span 은 빈 컨텍스트 하나를 돌려줄 뿐이다.
+import atexit
+import contextlib
+import functools
+import inspect
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+
+ENV = 'MUSIC_TRACE'
+DEFAULT_PATH = 'trace.json'
+MAX_EVENTS = 1_000_000
+STALL_MS = 50           # 이보다 늦게 돈 타이머는 이벤트 루프 멈춤으로 기록한다
+STALL_PROBE_MS = 16
+
+enabled = False
+_path = None
+_events = deque(maxlen=MAX_EVENTS)     # (name, cat, ts_ns, dur_ns, tid, args)
+_thread_names = {}
+_NULL = contextlib.nullcontext()
+_now = now = time.perf_counter_ns
+
+
+def configure(argv=None):
+    """--trace [path] 또는 MUSIC_TRACE=path 면 켠다. 계측할 모듈을 import 하기 전에 불러야 한다."""
+    global enabled, _path
+    if multiprocessing.parent_process() is not None:
+        # 분석용 작업 프로세스(spawn)는 __main__ 을 다시 import 한다. 부모의 결과 파일을 덮어쓰지 않게 끈다
+        return False
+    path = os.environ.get(ENV)
+    argv = argv or []
+    if '--trace' in argv:
+        i = argv.index('--trace')
+        nxt = argv[i + 1] if i + 1 < len(argv) else ''
+        path = nxt if nxt and not nxt.startswith('-') else (path or DEFAULT_PATH)
+    if not path or path == '0':
+        return False
+    enabled = True
+    _path = DEFAULT_PATH if path == '1' else path
+    atexit.register(save)
+    return True
+
+
+def _tid():
+    t = threading.current_thread()
+    tid = t.ident
+    if tid not in _thread_names:
+        _thread_names[tid] = t.name
+    return tid
+
+
+def complete(name, cat, t0_ns, args=None):
+    """t0_ns (perf_counter_ns) 부터 지금까지를 한 구간으로 기록한다."""
+    _events.append((name, cat, t0_ns, _now() - t0_ns, _tid(), args))
+
+
+def instant(name, cat='mark', args=None):
+    if not enabled:
+        return
+    _events.append((name, cat, _now(), None, _tid(), args))
+
+
+class _Span:
+    __slots__ = ('name', 'cat', 'args', 't0')
+
+    def __init__(self, name, cat, args):
+        self.name, self.cat, self.args = name, cat, args
+
+    def __enter__(self):
+        self.t0 = _now()
+        return self
+
+    def __exit__(self, *exc):
+        complete(self.name, self.cat, self.t0, self.args)
+        return False
+
+
+def span(name, cat='io', args=None):
+    return _Span(name, cat, args) if enabled else _NULL
+
+
+def traced(name=None, cat='slot'):
+    """메서드/함수 장식자. 꺼져 있으면 원래 함수를 그대로 돌려준다."""
+    def deco(fn):
+        if not enabled:
+            return fn
+        label = name or fn.__qualname__
+        code = fn.__code__
+        # 시그널 인자가 슬롯보다 많으면 PyQt 가 뒤쪽을 버려 주는데, 감싼 함수에는
+        # 그게 안 되므로 직접 자른다
+        n_max = None if code.co_flags & inspect.CO_VARARGS else code.co_argcount
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if n_max is not None:
+                args = args[:n_max]
+            t0 = _now()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                complete(label, cat, t0)
+        return wrapper
+    return deco
+
+
+def watch_event_loop(parent=None):
+    """GUI 스레드에서 부른다. 타이머가 늦게 돈 만큼을 'event loop stall' 로 기록한다."""
+    if not enabled:
+        return None
+    from PyQt5.QtCore import QTimer, Qt
+
+    timer = QTimer(parent)
+    timer.setTimerType(Qt.PreciseTimer)
+    timer.setInterval(STALL_PROBE_MS)
+    last = [_now()]
+    expected_ns = STALL_PROBE_MS * 1_000_000
+
+    def probe():
+        now = _now()
+        late = now - last[0] - expected_ns
+        if late > STALL_MS * 1_000_000:
+            _events.append(("event loop stall", 'stall', last[0] + expected_ns, late, _tid(),
+                            {"late_ms": round(late / 1e6, 1)}))
+        last[0] = now
+
+    timer.timeout.connect(probe)
+    timer.start()
+    return timer
+
+
+def events():
+    return list(_events)
+
+
+def save(path=None):
+    """Chrome trace-event 형식으로 쓴다. 시간 단위는 마이크로초."""
+    path = path or _path
+    if not path:
+        return None
+    pid = os.getpid()
+    out = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": tname}}
+           for tid, tname in list(_thread_names.items())]
+    for name, cat, ts, dur, tid, args in list(_events):
+        ev = {"name": name, "cat": cat, "pid": pid, "tid": tid, "ts": ts / 1000}
+        if dur is None:
+            ev.update(ph="i", s="t")
+        else:
+            ev.update(ph="X", dur=dur / 1000)
+        if args:
+            ev["args"] = args
+        out.append(ev)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump({"traceEvents": out, "displayTimeUnit": "ms"}, f)
+    os.replace(tmp, path)
+    return path
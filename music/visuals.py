@@ -0,0 +1,357 @@
+# music/visuals.py
+# 음악 페이지 배경 비주얼: 앨범 아트(없으면 기본 배경)에 박자에 맞춘 OpenCV 효과
+# (블러 펄스, 색상 회전, 윤곽 발광)를 작업 스레드에서 입힌다.
+# 프레임마다 시간 예산을 두고, 넘기면 해상도를 낮추고 여유가 생기면 다시 올린다.
+# 박자 세기·색상은 단계로 나눠서 같은 패턴이 반복되면 만들어 둔 프레임을 다시 쓴다.
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtGui import QColor, QImage, QPainter
+from PyQt5.QtWidgets import QWidget
+
+from music import trace
+from music.bundle import read_bytes
+
+try:
+    import cv2
+except ImportError:     # opencv-python-headless 가 없으면 비주얼 없이 돈다
+    cv2 = None
+
+AVAILABLE = cv2 is not None
+
+TARGET_FPS = 30
+BUDGET_MS = 12.0                 # 한 프레임 렌더링에 쓸 수 있는 시간
+QUALITY_SCALES = (1.0, 0.75, 0.5, 0.35, 0.25)   # 출력 크기 대비 렌더 해상도
+DOWNGRADE_AFTER = 2              # 연속으로 이만큼 넘기면 한 단계 내린다
+UPGRADE_AFTER = 60               # 연속으로 예산 절반 안에 끝나면 한 단계 올린다
+PULSE_STEPS = 8
+HUE_STEP_DEG = 15
+CACHE_FRAMES = 48
+BEAT_DECAY_MS = 180.0
+MAX_BLUR = 9.0                   # 펄스 최고점의 블러 sigma (전체 해상도 기준 px)
+GLOW_TINT = (235, 160, 60)       # BGR
+ART_NAMES = ("{title}.jpg", "{title}.jpeg", "{title}.png", "cover.jpg", "cover.jpeg", "cover.png")
+
+
+def find_art(folder, title):
+    """곡 아트 → 앨범 커버 순으로 찾은 이미지 바이트. 없으면 None."""
+    for pattern in ART_NAMES:
+        data = read_bytes(folder, pattern.format(title=title))
+        if data is not None:
+            return data
+    return None
+
+
+def decode_image(data):
+    """BGR 배열. 읽을 수 없으면 None."""
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def default_background(w=640, h=360):
+    """아트가 없을 때 쓰는 그라데이션 + 동심원 (윤곽 발광이 보이도록)."""
+    y, x = np.mgrid[0:h, 0:w].astype(np.float32)
+    t = (x / w + y / h) / 2
+    img = np.empty((h, w, 3), np.uint8)
+    img[..., 0] = 200 - 80 * t
+    img[..., 1] = 120 + 60 * t
+    img[..., 2] = 60 + 150 * t
+    for k in range(1, 6):
+        cv2.circle(img, (w // 2, h // 2), k * min(w, h) // 11, (250, 240, 230), 2, cv2.LINE_AA)
+    return img
+
+
+def beat_pulse(times_ms, strengths, pos):
+    """pos 직전 온셋의 세기를 지수적으로 줄인 값 (0..1)."""
+    i = int(np.searchsorted(times_ms, pos, side='right')) - 1
+    if i < 0:
+        return 0.0
+    return float(strengths[i]) / 255.0 * math.exp(-(pos - float(times_ms[i])) / BEAT_DECAY_MS)
+
+
+def hue_matrix(deg):
+    """BGR 색상 회전 (밝기 보존 근사). cv2.transform 한 번으로 끝난다."""
+    c, s = math.cos(math.radians(deg)), math.sin(math.radians(deg))
+    rgb = np.array([
+        [0.299 + 0.701 * c + 0.168 * s, 0.587 - 0.587 * c + 0.330 * s, 0.114 - 0.114 * c - 0.497 * s],
+        [0.299 - 0.299 * c - 0.328 * s, 0.587 + 0.413 * c + 0.035 * s, 0.114 - 0.114 * c + 0.292 * s],
+        [0.299 - 0.300 * c + 1.250 * s, 0.587 - 0.588 * c - 1.050 * s, 0.114 + 0.886 * c - 0.203 * s],
+    ], dtype=np.float32)
+    return rgb[::-1, ::-1].copy()
+
+
+class VisualRenderer:
+    """GUI 없이 쓸 수 있는 렌더러 (벤치마크에서도 쓴다). 한 스레드에서만 부른다."""
+
+    def __init__(self, budget_ms=BUDGET_MS, cache_frames=CACHE_FRAMES):
+        self.budget_ms = budget_ms
+        self.level = 0
+        self._image = None
+        self._gen = 0
+        self._prep = None           # (gen, level, w, h) → 준비물
+        self._prep_key = None
+        self._cache = OrderedDict()
+        self._cache_frames = cache_frames
+        self._over = self._under = 0
+        self.rendered = self.hits = self.budget_misses = 0
+        self.downgrades = self.upgrades = 0
+        self.render_ms = deque(maxlen=1000)
+
+    def set_image(self, img):
+        self._image = img
+        self._gen += 1
+        self._prep = self._prep_key = None
+        self._cache.clear()
+
+    @property
+    def has_image(self):
+        return self._image is not None
+
+    @staticmethod
+    def params(pulse, hue_deg):
+        """연속값 → 캐시 키가 되는 단계 값."""
+        p = min(PULSE_STEPS, max(0, int(round(pulse * PULSE_STEPS))))
+        h = int(round(hue_deg / HUE_STEP_DEG)) % (360 // HUE_STEP_DEG)
+        return p, h
+
+    def frame(self, w, h, pulse_q, hue_q):
+        """(BGR 프레임, 캐시 적중 여부). 크기는 현재 품질 단계의 렌더 해상도."""
+        key = (self._gen, self.level, w, h, pulse_q, hue_q)
+        out = self._cache.get(key)
+        if out is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return out, True
+        t0 = time.perf_counter()
+        with trace.span("visuals.render", 'render'):
+            out = self._render(self._prepare(w, h), pulse_q, hue_q)
+        ms = (time.perf_counter() - t0) * 1000
+        self.rendered += 1
+        self.render_ms.append(ms)
+        self._cache[key] = out
+        if len(self._cache) > self._cache_frames:
+            self._cache.popitem(last=False)
+        self._adapt(ms)
+        return out, False
+
+    def _adapt(self, ms):
+        if ms > self.budget_ms:
+            self.budget_misses += 1
+            self._over += 1
+            self._under = 0
+            if self._over >= DOWNGRADE_AFTER and self.level + 1 < len(QUALITY_SCALES):
+                self.level += 1
+                self.downgrades += 1
+                self._over = 0
+        else:
+            self._over = 0
+            self._under = self._under + 1 if ms < self.budget_ms / 2 else 0
+            if self._under >= UPGRADE_AFTER and self.level > 0:
+                self.level -= 1
+                self.upgrades += 1
+                self._under = 0
+
+    def _prepare(self, w, h):
+        key = (self._gen, self.level, w, h)
+        if self._prep_key == key:
+            return self._prep
+        scale = QUALITY_SCALES[self.level]
+        sw, sh = max(16, int(w * scale)), max(16, int(h * scale))
+        img = self._image
+        # 화면을 꽉 채우도록 늘린 뒤 가운데를 자른다
+        f = max(sw / img.shape[1], sh / img.shape[0])
+        rw, rh = max(sw, math.ceil(img.shape[1] * f)), max(sh, math.ceil(img.shape[0] * f))
+        big = cv2.resize(img, (rw, rh), interpolation=cv2.INTER_AREA if f < 1 else cv2.INTER_LINEAR)
+        y0, x0 = (rh - sh) // 2, (rw - sw) // 2
+        base = np.ascontiguousarray(big[y0:y0 + sh, x0:x0 + sw])
+        # 윤곽은 그림이 바뀔 때만 구한다. 프레임마다는 섞기만 한다
+        edges = cv2.Canny(cv2.cvtColor(base, cv2.COLOR_BGR2GRAY), 60, 160)
+        edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+        glow = cv2.GaussianBlur(edges, (0, 0), max(1.0, 4 * scale))
+        tint = np.array(GLOW_TINT, np.float32) / 255.0
+        glow = (glow[..., None].astype(np.float32) * tint).astype(np.uint8)
+        self._prep = {"base": base, "glow": glow, "scale": scale}
+        self._prep_key = key
+        return self._prep
+
+    def _render(self, prep, pulse_q, hue_q):
+        p = pulse_q / PULSE_STEPS
+        out = cv2.transform(prep["base"], hue_matrix(hue_q * HUE_STEP_DEG))
+        sigma = p * MAX_BLUR * prep["scale"]
+        if sigma >= 0.5:
+            out = cv2.GaussianBlur(out, (0, 0), sigma)
+        if pulse_q:
+            out = cv2.addWeighted(out, 1.0 + 0.15 * p, prep["glow"], 1.5 * p, 0.0)
+        return out
+
+    def stats(self):
+        ms = sorted(self.render_ms)
+        pick = lambda q: ms[min(len(ms) - 1, int(q * len(ms)))] if ms else None
+        return {
+            "rendered": self.rendered, "cache_hits": self.hits,
+            "budget_misses": self.budget_misses, "level": self.level,
+            "scale": QUALITY_SCALES[self.level],
+            "downgrades": self.downgrades, "upgrades": self.upgrades,
+            "render_p50_ms": pick(0.5), "render_p99_ms": pick(0.99),
+        }
+
+
+class VisualsThread(QThread):
+    """position_fn() (ms) 와 levels_fn() (스펙트럼 막대값) 을 따라 프레임을 만든다.
+    AnalyzerThread 처럼 최신 프레임 하나만 보관하고, GUI 가 가져가면 다음 것을 알린다."""
+    frameReady = pyqtSignal()
+
+    def __init__(self, position_fn, levels_fn, parent=None):
+        super().__init__(parent)
+        self.position_fn = position_fn
+        self.levels_fn = levels_fn
+        self.renderer = VisualRenderer()
+        self._lock = threading.Lock()
+        self._source = None           # (폴더 또는 BundleDir, 곡 제목)
+        self._source_changed = False
+        self._beats = None            # (times_ms, strengths)
+        self._size = (0, 0)
+        self._active = False
+        self._running = True
+        self._latest = None
+        self._consumed = True
+        self._hue = 0.0
+        self.produced = 0
+        self.dropped = 0
+
+    # ── GUI 스레드에서 부르는 쪽 ──
+    def open(self, folder, title):
+        with self._lock:
+            self._source = (folder, title)
+            self._source_changed = True
+            self._beats = None
+
+    def set_beats(self, times_ms, strengths):
+        with self._lock:
+            self._beats = (times_ms, strengths) if len(times_ms) else None
+
+    def set_size(self, w, h):
+        with self._lock:
+            self._size = (w, h)
+
+    def set_active(self, active):
+        with self._lock:
+            self._active = active
+
+    def take(self):
+        with self._lock:
+            frame, self._latest = self._latest, None
+            self._consumed = True
+        return frame
+
+    def stop(self):
+        self._running = False
+        self.wait()
+
+    def stats(self):
+        return dict(self.renderer.stats(), produced=self.produced, dropped=self.dropped)
+
+    # ── 작업 스레드 ──
+    def run(self):
+        period = 1.0 / TARGET_FPS
+        last_key = None
+        while self._running:
+            t0 = time.perf_counter()
+            with self._lock:
+                changed, source = self._source_changed, self._source
+                self._source_changed = False
+                beats, (w, h), active = self._beats, self._size, self._active
+            if changed:
+                self._load(source)
+                last_key = None
+            if active and w > 0 and h > 0 and self.renderer.has_image:
+                params = self._params(beats)
+                # 멈춰 있거나 단계 값이 같으면 다시 보낼 필요가 없다
+                key = (self.renderer.level, w, h) + params
+                if key != last_key:
+                    frame, _ = self.renderer.frame(w, h, *params)
+                    last_key = key
+                    self._publish(frame)
+            time.sleep(max(0.0, period - (time.perf_counter() - t0)))
+
+    def _load(self, source):
+        img = None
+        if source is not None:
+            try:
+                data = find_art(*source)
+                img = decode_image(data) if data is not None else None
+            except (OSError, cv2.error):
+                img = None
+        self.renderer.set_image(img if img is not None else default_background())
+
+    def _params(self, beats):
+        pos = self.position_fn()
+        levels = self.levels_fn()
+        if beats is not None:
+            pulse = beat_pulse(beats[0], beats[1], pos)
+        else:
+            pulse = float(np.mean(levels[:4])) if len(levels) else 0.0   # 차트가 없으면 저음 세기
+        # 색상은 스펙트럼 무게중심을 천천히 따라가고, 박자마다 살짝 튄다
+        total = float(levels.sum()) if len(levels) else 0.0
+        centroid = float((levels * np.arange(len(levels))).sum()) / total / len(levels) if total else 0.5
+        self._hue += ((centroid - 0.5) * 180.0 - self._hue) * 0.05
+        return VisualRenderer.params(pulse, self._hue + 30.0 * pulse)
+
+    def _publish(self, frame):
+        with self._lock:
+            pending = not self._consumed
+            if pending:
+                self.dropped += 1
+            self._latest = frame
+            self._consumed = False
+            self.produced += 1
+        if not pending:
+            self.frameReady.emit()
+
+
+class VisualsWidget(QWidget):
+    """받은 BGR 프레임을 위젯 크기로 늘려 그리기만 한다."""
+    sizeChanged = pyqtSignal(int, int)
+    shownChanged = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("visuals")
+        self.setMinimumHeight(120)
+        self._frame = None
+
+    def set_frame(self, frame):
+        if frame is None:
+            return
+        self._frame = frame
+        self.update()
+
+    def clear(self):
+        self._frame = None
+        self.update()
+
+    def resizeEvent(self, event):
+        self.sizeChanged.emit(self.width(), self.height())
+        super().resizeEvent(event)
+
+    def showEvent(self, event):
+        self.shownChanged.emit(True)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.shownChanged.emit(False)
+        super().hideEvent(event)
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        frame = self._frame
+        if frame is None:
+            p.fillRect(self.rect(), QColor("#eaf2fb"))
+            return
+        h, w = frame.shape[:2]
+        img = QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888)
+        p.setRenderHint(QPainter.SmoothPixmapTransform)
+        p.drawImage(self.rect(), img)
@@ -0,0 +1,212 @@
+# music/waveform.py
+# 다단계 min/max 피크 파일(메모리 맵)과 그걸 그리는 파형 뷰
+import struct
+from contextlib import closing
+
+import numpy as np
+from PyQt5.QtCore import QPointF, QRectF, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QPainter, QPainterPath, QPixmap
+from PyQt5.QtWidgets import QWidget
+
+from music.chart import read_wav_blocks
+
+PEAKS_VERSION = 1
+BASE_SAMPLES = 256     # 0단계 한 칸 = 256 샘플
+
+_MAGIC = b'MQPK'
+_HEADER = struct.Struct('<4sHHIIQ')   # magic, version, levels, rate, base, total_samples
+_LEVEL = struct.Struct('<QQ')         # offset, bins
+
+
+def build_peaks(path):
+    """WAV 를 블록 단위로 읽어 피크 피라미드 파일 내용(bytes)을 만든다."""
+    rate, blocks = read_wav_blocks(path)
+    mins, maxs = [], []
+    carry = np.zeros(0, dtype=np.float32)
+    total = 0
+    with closing(blocks):
+        for block in blocks:
+            total += len(block)
+            buf = np.concatenate((carry, block))
+            n = len(buf) // BASE_SAMPLES
+            if n:
+                frames = buf[:n * BASE_SAMPLES].reshape(n, BASE_SAMPLES)
+                mins.append(frames.min(axis=1))
+                maxs.append(frames.max(axis=1))
+            carry = buf[n * BASE_SAMPLES:]
+    if len(carry):
+        mins.append(carry.min(keepdims=True))
+        maxs.append(carry.max(keepdims=True))
+
+    lo = np.concatenate(mins) if mins else np.zeros(1, np.float32)
+    hi = np.concatenate(maxs) if maxs else np.zeros(1, np.float32)
+    level = np.stack((lo, hi), axis=1)
+    level = np.round(np.clip(level, -1, 1) * 32767).astype('<i2')
+    levels = [level]
+    while len(level) > 1:
+        if len(level) % 2:
+            level = np.concatenate((level, level[-1:]))
+        pair = level.reshape(-1, 2, 2)
+        level = np.stack((pair[:, :, 0].min(axis=1), pair[:, :, 1].max(axis=1)), axis=1)
+        levels.append(level)
+
+    table_size = _HEADER.size + _LEVEL.size * len(levels)
+    head = [_HEADER.pack(_MAGIC, PEAKS_VERSION, len(levels), rate, BASE_SAMPLES, total)]
+    off = table_size
+    for lv in levels:
+        head.append(_LEVEL.pack(off, len(lv)))
+        off += lv.nbytes
+    return b''.join(head + [lv.tobytes() for lv in levels])
+
+
+class PeakFile:
+    """피크 파일을 메모리 맵으로 열어 두고, 화면 폭에 맞는 열(column)만 계산한다."""
+
+    def __init__(self, source):
+        # 보통은 캐시 파일 경로. 캐시에 넣지 못한 (너무 큰) 피크는 bytes 그대로
+        if isinstance(source, (bytes, bytearray)):
+            self._mm = np.frombuffer(source, dtype=np.uint8)
+        else:
+            self._mm = np.memmap(source, dtype=np.uint8, mode='r')
+        magic, ver, n_levels, self.rate, self.base, self.total = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or ver != PEAKS_VERSION:
+            raise ValueError("not a peak file")
+        self.levels = []
+        for k in range(n_levels):
+            off, bins = _LEVEL.unpack_from(self._mm, _HEADER.size + k * _LEVEL.size)
+            self.levels.append(self._mm[off:off + bins * 4].view('<i2').reshape(bins, 2))
+
+    @property
+    def duration_ms(self):
+        return self.total * 1000 // self.rate if self.rate else 0
+
+    def columns(self, start_ms, end_ms, width):
+        """[start_ms, end_ms) 구간을 width 개 열의 (min, max) 로. 값 범위 -1..1"""
+        if width <= 0 or end_ms <= start_ms:
+            return np.zeros(0), np.zeros(0)
+        s0 = start_ms * self.rate / 1000.0
+        s1 = end_ms * self.rate / 1000.0
+        per_px = (s1 - s0) / width
+        # 한 픽셀에 들어가는 칸이 1~2개가 되는 가장 거친 단계를 고른다
+        k = 0
+        while k + 1 < len(self.levels) and self.base * (2 ** (k + 1)) <= per_px:
+            k += 1
+        lv = self.levels[k]
+        span = self.base * (2 ** k)
+        b0 = int(s0 // span)
+        b1 = max(b0 + 1, int(np.ceil(s1 / span)))
+        b0, b1 = min(b0, len(lv) - 1), min(b1, len(lv))
+        chunk = np.asarray(lv[b0:b1], dtype=np.float32) / 32767.0
+        if len(chunk) == 0:
+            return np.zeros(width), np.zeros(width)
+        idx = np.linspace(0, len(chunk), width, endpoint=False).astype(np.int64)
+        return np.minimum.reduceat(chunk[:, 0], idx), np.maximum.reduceat(chunk[:, 1], idx)
+
+
+def load_peaks(path, cache):
+    fpath = cache.get_path(path, 'peaks', PEAKS_VERSION)
+    if fpath is None:
+        data = build_peaks(path)
+        fpath = cache.put(path, 'peaks', PEAKS_VERSION, data)
+        if fpath is None:
+            return PeakFile(data)
+    return PeakFile(fpath)
+
+
+class WaveformView(QWidget):
+    """곡 전체(또는 확대 구간)의 파형 + 재생 위치. 클릭하면 탐색, 휠로 확대/축소."""
+    seekRequested = pyqtSignal('qint64')
+
+    MIN_SPAN_MS = 2000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("waveform")
+        self.setMinimumHeight(56)
+        self.peaks = None
+        self.pos_ms = 0
+        self.view = (0, 0)
+        self._pixmap = None
+        self._pixmap_key = None
+
+    def set_peaks(self, peaks):
+        self.peaks = peaks
+        self.view = (0, peaks.duration_ms) if peaks else (0, 0)
+        self._pixmap_key = None
+        self.update()
+
+    def playhead_key(self, ms):
+        """ms 에서 화면에 보이는 것: 재생 위치 픽셀과 보이는 구간. 같으면 다시 그릴 필요가 없다."""
+        start, end = self.view
+        if not self.peaks or end <= start:
+            return None
+        if not start <= ms < end:
+            return ms               # 구간을 벗어나면 set_position 이 구간을 옮긴다
+        return int((ms - start) * self.width() / (end - start)), self.view
+
+    def set_position(self, ms):
+        self.pos_ms = ms
+        start, end = self.view
+        span = end - start
+        if self.peaks and span and not start <= ms < end:
+            # 확대 상태에서 재생 위치가 구간을 벗어나면 따라간다
+            start = max(0, min(ms, self.peaks.duration_ms - span))
+            self.view = (start, start + span)
+        self.update()
+
+    def _x_to_ms(self, x):
+        start, end = self.view
+        return int(start + (end - start) * min(max(x, 0), self.width()) / max(self.width(), 1))
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton and self.peaks:
+            self.seekRequested.emit(self._x_to_ms(event.x()))
+        super().mousePressEvent(event)
+
+    def wheelEvent(self, event):
+        if not self.peaks:
+            return
+        start, end = self.view
+        anchor = self._x_to_ms(event.x())
+        factor = 0.8 if event.angleDelta().y() > 0 else 1.25
+        dur = self.peaks.duration_ms
+        span = int(min(dur, max(self.MIN_SPAN_MS, (end - start) * factor)))
+        frac = (anchor - start) / max(end - start, 1)
+        start = int(min(max(0, anchor - span * frac), dur - span))
+        self.view = (start, start + span)
+        self.update()
+
+    def _render(self):
+        # 파형은 구간/크기가 바뀔 때만 다시 그린다 (재생 위치는 그 위에 선 하나)
+        key = (self.view, self.width(), self.height())
+        if key == self._pixmap_key:
+            return self._pixmap
+        pm = QPixmap(self.size())
+        pm.fill(Qt.transparent)
+        if self.peaks:
+            w, h = self.width(), self.height()
+            lo, hi = self.peaks.columns(self.view[0], self.view[1], w)
+            mid = h / 2.0
+            path = QPainterPath()
+            path.moveTo(QPointF(0, mid - hi[0] * mid))
+            for x in range(1, len(hi)):
+                path.lineTo(QPointF(x, mid - hi[x] * mid))
+            for x in range(len(lo) - 1, -1, -1):
+                path.lineTo(QPointF(x, mid - lo[x] * mid))
+            path.closeSubpath()
+            p = QPainter(pm)
+            p.setRenderHint(QPainter.Antialiasing)
+            p.fillPath(path, QColor("#9bbce0"))
+            p.end()
+        self._pixmap, self._pixmap_key = pm, key
+        return pm
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        p.fillRect(self.rect(), QColor("#f6f8fa"))
+        p.drawPixmap(0, 0, self._render())
+        start, end = self.view
+        if self.peaks and end > start:
+            x = (self.pos_ms - start) * self.width() / (end - start)
+            p.fillRect(QRectF(x - 1, 0, 2, self.height()), QColor("#3182ce"))
+        p.end()
@@ -0,0 +1,708 @@
+# music/window.py
+# 로그인 뒤에 뜨는 메인 창. QtMultimedia/numpy 를 쓰는 모듈은 여기서만 불러온다
+import logging
+import os
+from PyQt5.QtCore import QBuffer, QIODevice, Qt, QThreadPool, QUrl
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QLabel, QPushButton,
+    QVBoxLayout, QHBoxLayout, QWidget, QFrame,
+    QStackedWidget, QListView, QLineEdit, QAbstractItemView,
+    QSlider, QSplitter, QDialog, QStyle, QMessageBox, QMenu
+)
+from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+from music.auth_dialog import AuthDialog  # 경로에 따라 조정
+from music.cache import DerivedCache
+from music.catalog import TrackCatalog
+from music.game import GAME_NOTIFY_MS, AudioClock, GamePage
+from music.gapless import GaplessPlayer
+from music.history import HistoryRecorder
+from music.loudness import LOUDNESS_VERSION, LoudnessScanner, volume_for
+from music.lyrics import LyricsView, load_lyrics
+from music.playlist_model import FilteredModel, PlaylistModel, ms_to_mmss
+from music.playqueue import PlayQueue
+from music.probe import MetadataProber
+from music.refresh import RefreshScheduler
+from music.replay import Replay
+from music.search import IncrementalSearch, build_library_index
+from music.stream import AnalyzerThread, SpectrumWidget
+from music import passwords, trace
+from music.tasks import run_async
+from music import visuals
+from music.visuals import VisualsThread, VisualsWidget
+from music.waveform import WaveformView, load_peaks
+
+log = logging.getLogger(__name__)
+
+
+def _load_chart(path, cache):
+    """(차트, 곡 내용 해시). 해시는 리플레이를 곡에 묶는 데 쓴다 (작업 스레드에서)."""
+    from music.chart import load_chart
+    return load_chart(path, cache), cache.content_hash(path)
+
+class ClickableSlider(QSlider):
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            val = QStyle.sliderValueFromPosition(
+                self.minimum(), self.maximum(),
+                event.x() if self.orientation() == Qt.Horizontal else event.y(),
+                self.width() if self.orientation() == Qt.Horizontal else self.height()
+            )
+            self.setValue(val)
+            self.sliderMoved.emit(val)
+        super().mousePressEvent(event)
+
+class MainWindow(QMainWindow):
+    def __init__(self, username, library=None, player=None, catalog=None, cache=None, history=None):
+        """library/player 는 로그인 창이 떠 있는 동안 Preloader 가 미리 준비한 것 (없으면 여기서).
+        catalog/cache/history 를 넘기면 기본 경로 대신 그것을 쓴다 (벤치마크용)."""
+        super().__init__()
+        self._preloaded = library
+        self.setWindowTitle("🎵 Music Quest")
+        self.resize(1120, 720)
+
+        self.model = PlaylistModel(self)
+        self.playlist = self.model.fns       # 모델과 같은 리스트 (순서 변경이 바로 반영된다)
+        self.filtered = FilteredModel(self.model, self)
+        self.search = None                   # 색인이 만들어지면 IncrementalSearch
+        self.catalog = catalog or TrackCatalog()
+        self.cache = cache or DerivedCache()
+        self.history = history or HistoryRecorder(username, parent=self)
+        self.chart = None
+        self.chart_digest = None
+        self.clock = AudioClock()   # 위치 보고 사이를 보간하는 재생 시계 (게임/시각화 공용)
+        self.durations = self.model.durations
+        self.lufs = {}              # fn → 통합 라우드니스. 곡을 바꿀 때 볼륨을 맞춘다
+        self.current_index = -1
+        self.repeat_mode = 0  # 0=off,1=all,2=one
+        self.queue = PlayQueue(self.playlist, self.model.row_of)   # 다음/이전/셔플/대기열
+
+        # ── HEADER ──
+        header = QFrame(objectName="header")
+        hdr_l = QHBoxLayout(header)
+        hdr_l.setContentsMargins(32, 18, 32, 18)
+        self.name_label = QLabel(f"Hello, {username}", objectName="username")
+        self.name_label.setFont(QFont("Arial", 20, QFont.Bold))
+        hdr_l.addWidget(self.name_label)
+        hdr_l.addStretch()
+        logout_btn = QPushButton("⎋ LOGOUT", objectName="logout")
+        logout_btn.setFont(QFont("Arial", 14, QFont.Bold))
+        logout_btn.clicked.connect(self._on_logout)
+        hdr_l.addWidget(logout_btn)
+        exit_btn = QPushButton("EXIT")
+        exit_btn.setObjectName("exit")
+        exit_btn.setFont(QFont("Arial", 18, QFont.Bold))
+        exit_btn.setStyleSheet("""
+            QPushButton {
+                  border:2px solid #e53e3e; border-radius:8px;
+                  padding:6px 20px; background:white; color:#e53e3e;
+            }
+            QPushButton:hover { background:#fef2f2; }
+             """)
+        exit_btn.clicked.connect(QApplication.quit)
+        hdr_l.addWidget(exit_btn)
+
+        # ── SIDEBAR ──
+        sidebar = QFrame(objectName="sidebar")
+        sb_l = QVBoxLayout(sidebar)
+        sb_l.setContentsMargins(0, 30, 0, 30)
+        sb_l.setSpacing(24)
+        self.btn_my = QPushButton("MY MUSIC", objectName="menu")
+        sb_l.addWidget(self.btn_my)
+        self.btn_game = QPushButton("GAME", objectName="menu")
+        sb_l.addWidget(self.btn_game)
+        sb_l.addStretch()
+
+        # ── CONTENT STACK ──
+        self.stack = QStackedWidget()
+
+        # ▶ Page 0: My Music
+        page_music = QWidget()
+        page_music.setObjectName("musicpage")
+        splitter = QSplitter(Qt.Horizontal, page_music)
+        splitter.setChildrenCollapsible(False)
+
+        # 좌측: 트랙 리스트 (카드형)
+        track_card = QFrame(objectName="trackcard")
+        card_l = QVBoxLayout(track_card)
+        card_l.setContentsMargins(20, 24, 20, 24)
+        self.search_edit = QLineEdit(objectName="search")
+        self.search_edit.setPlaceholderText("Search titles and lyrics")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self._on_search_changed)
+        self.list_view = QListView(objectName="tracklist")
+        self.list_view.setModel(self.model)
+        self.list_view.setUniformItemSizes(True)   # 줄 높이를 한 번만 재고 보이는 줄만 그린다
+        self.list_view.setDragDropMode(QAbstractItemView.InternalMove)
+        self.list_view.setDefaultDropAction(Qt.MoveAction)
+        self.list_view.setDropIndicatorShown(True)
+        self.list_view.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.list_view.customContextMenuRequested.connect(self._on_track_menu)
+        self.model.rowsMoved.connect(self._on_rows_moved)
+        self.total_lbl = QLabel(objectName="total")
+        self._load_playlist()
+        self.list_view.clicked.connect(self.on_item_clicked)
+        self.list_view.setMinimumWidth(100)
+        card_l.addWidget(self.search_edit)
+        card_l.addWidget(self.list_view)
+        card_l.addWidget(self.total_lbl)
+        splitter.addWidget(track_card)
+
+        # 우측: 가사 + 플레이어 (카드형)
+        right_card = QFrame(objectName="rightcard")
+        rcard_l = QVBoxLayout(right_card)
+        rcard_l.setContentsMargins(28, 28, 28, 28)
+        self.visuals = VisualsWidget()
+        self.visuals.setVisible(visuals.AVAILABLE)
+        rcard_l.addWidget(self.visuals, 3)
+        self.lyrics = LyricsView(objectName="lyrics")
+        rcard_l.addWidget(self.lyrics, 5)
+        self.waveform = WaveformView()
+        self.waveform.seekRequested.connect(lambda ms: self.player.setPosition(ms))
+        rcard_l.addWidget(self.waveform)
+        self.spectrum = SpectrumWidget()
+        rcard_l.addWidget(self.spectrum)
+
+        # --- Controls: 한 줄 배치 ---
+        ctrl_row = QHBoxLayout()
+        btns = {}
+
+        # 컨트롤 버튼 딕셔너리 생성
+        for name, ico in [
+            ('shuffle', '🔀'), ('prev', '⏮️'), ('next', '⏭️'), ('repeat', '🔁'),
+            ('gapless', '♾️')
+        ]:
+            btn = QPushButton(ico)
+            btn.setObjectName(name)
+            btn.setCursor(Qt.PointingHandCursor)
+            btn.setFixedSize(54, 54)
+            btn.setFont(QFont("Arial", 26, QFont.Bold))
+            btns[name] = btn
+
+        # ▶️⏸️ 토글 버튼 생성
+        self.btn_playpause = QPushButton("▶️")
+        self.btn_playpause.setObjectName("playpause")
+        self.btn_playpause.setCursor(Qt.PointingHandCursor)
+        self.btn_playpause.setFixedSize(54, 54)
+        self.btn_playpause.setFont(QFont("Arial", 26, QFont.Bold))
+        self.btn_playpause.clicked.connect(self.toggle_play_pause)
+
+        ctrl_row.addWidget(btns['shuffle'])
+        ctrl_row.addWidget(btns['prev'])
+        ctrl_row.addWidget(self.btn_playpause)
+        ctrl_row.addWidget(btns['next'])
+        ctrl_row.addWidget(btns['repeat'])
+        ctrl_row.addWidget(btns['gapless'])
+
+        self.btn_prev = btns['prev']
+        self.btn_next = btns['next']
+        self.btn_shuffle = btns['shuffle']
+        self.btn_repeat = btns['repeat']
+        self.btn_gapless = btns['gapless']
+        self.btn_gapless.setToolTip("Gapless playback")
+        self.btn_gapless.setStyleSheet("background: #ddebf7;")
+        self.btn_prev.clicked.connect(self.prev_track)
+        self.btn_next.clicked.connect(self.next_track)
+        self.btn_shuffle.clicked.connect(self.toggle_shuffle)
+        self.btn_repeat.clicked.connect(self.toggle_repeat)
+        self.btn_gapless.clicked.connect(self.toggle_gapless)
+
+        ctrl_row.addSpacing(20)
+
+        self.slider = ClickableSlider(Qt.Horizontal)
+        self.slider.setObjectName("slider")
+        self.slider.setMinimumWidth(180)
+        self.time_lbl = QLabel("00:00 / 00:00", objectName="time")
+        self.slider.setRange(0, 0)
+        self.slider.sliderMoved.connect(lambda p: self.player.setPosition(p))
+        ctrl_row.addWidget(self.slider, 1)
+        ctrl_row.addWidget(self.time_lbl)
+        rcard_l.addLayout(ctrl_row, 1)
+
+        splitter.addWidget(right_card)
+        splitter.setStretchFactor(0, 3)
+        splitter.setStretchFactor(1, 3)
+
+        mus_lay = QHBoxLayout(page_music)
+        mus_lay.setContentsMargins(18, 18, 18, 18)
+        mus_lay.setSpacing(24)
+        mus_lay.addWidget(splitter)
+        page_music.setLayout(mus_lay)
+        self.stack.addWidget(page_music)
+
+        # ▶ Page 1: Game
+        self.game = GamePage(self.clock)
+        self.stack.addWidget(self.game)
+
+        # ── 버튼 연결 ──
+        self.btn_my.clicked.connect(lambda: self.stack.setCurrentIndex(0))
+        self.btn_game.clicked.connect(lambda: self.stack.setCurrentIndex(1))
+        self.stack.currentChanged.connect(self._on_page_changed)
+
+        # ── ROOT LAYOUT ──
+        central = QWidget()
+        root_l = QHBoxLayout(central)
+        root_l.setContentsMargins(0, 0, 0, 0)
+        root_l.addWidget(sidebar)
+        root_l.addWidget(self.stack, 1)
+
+        outer = QWidget()
+        outer_l = QVBoxLayout(outer)
+        outer_l.setContentsMargins(0, 0, 0, 0)
+        outer_l.addWidget(header)
+        outer_l.addWidget(central)
+        self.setCentralWidget(outer)
+
+        # ── 메타데이터 백그라운드 조회 ──
+        self.prober = MetadataProber(parent=self)
+        self.prober.resultsReady.connect(self._on_probed)
+        # 라우드니스 분석은 파일을 통째로 읽으므로 헤더 조회가 끝난 뒤 프로세스 풀에서 돌린다
+        self.loudness = LoudnessScanner(parent=self)
+        self.loudness.resultsReady.connect(self._on_loudness)
+        self.loudness.failed.connect(
+            lambda fn, err: self.statusBar().showMessage(f"Loudness failed for {fn}: {err}", 5000))
+        self.prober.finished.connect(self._start_loudness)
+        self._start_probe()
+
+        # ── PLAYER SETUP ──
+        self.player = player or GaplessPlayer()
+        self.player.setParent(self)
+        self.player.advanced.connect(self._on_gapless_advanced)
+        self.player.positionChanged.connect(self._on_position_changed)
+        self.player.mediaStatusChanged.connect(self._on_media_status)
+        self.player.stateChanged.connect(self._on_player_state_changed)
+        self.player.positionChanged.connect(self.clock.update)
+
+        # ── 위치로 그리는 위젯: 프레임당 한 번, 보이는 값이 바뀐 것만 ──
+        self.refresh = RefreshScheduler(self)
+        self.player.durationChanged.connect(self.refresh.set_duration)
+        self.refresh.subscribe("slider", self._slider_key, self._apply_slider)
+        self.refresh.subscribe("time", lambda s: (s.position // 1000, s.duration // 1000),
+                               self._apply_time)
+        self.refresh.subscribe("lyrics", lambda s: self.lyrics.row_at(s.position),
+                               lambda s: self.lyrics.set_position(s.position))
+        self.refresh.subscribe("waveform", lambda s: self.waveform.playhead_key(s.position),
+                               lambda s: self.waveform.set_position(s.position))
+        self.refresh.subscribe("play button", lambda s: s.state == QMediaPlayer.PlayingState,
+                               self._apply_play_button)
+
+        # ── 시각화: PCM 읽기/FFT 는 작업 스레드에서 ──
+        self.analyzer = AnalyzerThread(self.clock.position, self)
+        self.analyzer.frameReady.connect(lambda: self.spectrum.set_frame(self.analyzer.take()))
+        self.analyzer.failed.connect(self._on_analyzer_failed)
+        self.analyzer.start()
+        # 앨범 아트 효과도 작업 스레드에서 (OpenCV 가 없으면 끈다)
+        self.visualizer = None
+        if visuals.AVAILABLE:
+            self.visualizer = VisualsThread(self.clock.position, lambda: self.spectrum.bands, self)
+            self.visualizer.frameReady.connect(
+                lambda: self.visuals.set_frame(self.visualizer.take()))
+            self.visuals.sizeChanged.connect(self.visualizer.set_size)
+            self.visuals.shownChanged.connect(self.visualizer.set_active)
+            self.visualizer.set_size(self.visuals.width(), self.visuals.height())
+            self.visualizer.set_active(self.visuals.isVisible())
+            self.visualizer.start()
+        QApplication.instance().aboutToQuit.connect(self._shutdown)
+
+    def _load_playlist(self):
+        # 바뀐 파일만 다시 읽고, 목록은 색인에서 채운다
+        if self._preloaded is not None:
+            self._unprobed, tracks = self._preloaded
+            self._preloaded = None
+        else:
+            with trace.span("catalog.sync"):
+                self._unprobed = self.catalog.sync()
+                tracks = self.catalog.tracks()
+        self.model.reset([t.fn for t in tracks],
+                         {t.fn: t.duration_ms for t in tracks if t.duration_ms is not None})
+        self.lufs = {t.fn: t.lufs for t in tracks if t.lufs is not None}
+        self.queue.reset()
+        self._update_total_label()
+        # 검색 색인은 가사 파일까지 읽으므로 백그라운드에서 만든다
+        run_async(build_library_index, list(self.playlist), self.catalog.lyrics,
+                  on_done=self._on_index_built)
+
+    @trace.traced()
+    def _on_index_built(self, index):
+        self.search = IncrementalSearch(index)
+        if self.search_edit.text():
+            self._on_search_changed(self.search_edit.text())
+
+    @trace.traced()
+    def _on_search_changed(self, text):
+        if not text.strip():
+            if self.list_view.model() is not self.model:
+                self.list_view.setModel(self.model)
+                self.list_view.setDragEnabled(True)
+                self._select_row(self.current_index)
+            if self.search is not None:
+                self.search.reset()
+            return
+        if self.search is None:
+            return      # 색인이 준비되면 다시 불린다
+        # 검색 결과는 원본 순서대로 보여 주고, 그동안에는 끌어서 옮기기를 막는다
+        rows = sorted(self.model.row_of(fn) for fn in self.search(text))
+        self.filtered.set_rows(rows)
+        if self.list_view.model() is not self.filtered:
+            self.list_view.setModel(self.filtered)
+            self.list_view.setDragEnabled(False)
+        self._select_row(self.current_index)
+
+    def _select_row(self, idx):
+        """재생 목록 행 idx 를 지금 보이는 모델에서 선택한다."""
+        if idx is None or idx < 0:
+            return
+        if self.list_view.model() is self.filtered:
+            idx = self.filtered.row_from_source(idx)
+            if idx < 0:
+                self.list_view.clearSelection()
+                return
+        self.list_view.setCurrentIndex(self.list_view.model().index(idx))
+
+    def _start_probe(self):
+        self.prober.start((fn, self.catalog.path_of(fn)) for fn in self._unprobed)
+
+    @trace.traced()
+    def _on_probed(self, results):
+        with trace.span("catalog.store_probes", 'db'):
+            self.catalog.store_probes(results)
+        for fn, r in results:
+            self._set_duration(fn, r.duration_ms)
+        self._update_total_label()
+
+    def _start_loudness(self):
+        self.loudness.start((fn, self.catalog.path_of(fn))
+                            for fn in self.catalog.unanalyzed(LOUDNESS_VERSION))
+
+    @trace.traced()
+    def _on_loudness(self, results):
+        with trace.span("catalog.store_loudness", 'db'):
+            self.catalog.store_loudness(results, LOUDNESS_VERSION)
+        for fn, r in results:
+            if r is not None and r.lufs is not None:
+                self.lufs[fn] = r.lufs
+
+    def _volume(self, idx):
+        return volume_for(self.lufs.get(self.playlist[idx]))
+
+    def _set_duration(self, fn, dur):
+        self.model.set_duration(fn, dur)
+
+    def _update_total_label(self):
+        total = self.model.total_ms()
+        s = total // 1000
+        self.total_lbl.setText(
+            f"{len(self.playlist)} tracks · {s//3600}:{s//60%60:02d}:{s%60:02d}"
+        )
+
+    @trace.traced()
+    def _on_rows_moved(self, parent, start, end, dest, row):
+        # self.playlist 는 모델이 이미 옮겨 두었다. 재생 중인 곡의 행만 다시 찾는다
+        # (queue 는 fn 으로 기억하므로 그대로, 목록 순서의 다음 곡만 달라질 수 있다)
+        if self.current_index >= 0:
+            self.current_index = self.model.row_of(self.player_fn)
+            self._preload_next()
+
+    @trace.traced()
+    def on_item_clicked(self, index):
+        idx = index.row()
+        if self.list_view.model() is self.filtered:
+            idx = self.filtered.source_row(idx)
+        self.play_track(idx)
+
+    def _media(self, idx):
+        """(QMediaContent, stream). 번들의 곡은 QBuffer 로 넘기고, URL 은 형식 힌트로만 쓴다."""
+        src = self.catalog.path_of(self.playlist[idx])
+        if isinstance(src, str):
+            return QMediaContent(QUrl.fromLocalFile(os.path.abspath(src))), None
+        src.prefetch()
+        buf = QBuffer()                 # 플레이어가 붙잡고 있다가 다음 곡을 열 때 놓는다
+        buf.setData(src.view())         # 맵에서 Qt 버퍼로 한 번만 복사된다
+        buf.open(QIODevice.ReadOnly)
+        return QMediaContent(QUrl(src.basename)), buf
+
+    @trace.traced()
+    def play_track(self, idx):
+        if idx < 0 or idx >= len(self.playlist):
+            return
+        self._finish_play()     # setMedia 의 위치 보고가 이전 곡 위치로 기록되지 않도록 먼저
+        self.player.setVolume(self._volume(idx))
+        self.player.setMedia(*self._media(idx))
+        resume = self.history.resume_position(self.playlist[idx])
+        if resume:
+            self.player.setPosition(resume)
+        self.player.play()
+        self._show_track(idx)
+
+    @trace.traced()
+    def _on_gapless_advanced(self, fn):
+        # 미리 열어 둔 곡이 이미 재생 중이므로 화면만 맞춘다
+        idx = self.model.row_of(fn)
+        self._select_row(idx)
+        self._show_track(idx)
+
+    @trace.traced()
+    def _show_track(self, idx):
+        self._finish_play()
+        self.current_index = idx
+        fn = self.player_fn = self.playlist[idx]
+        self.history.track_started(fn, self.durations.get(fn))
+        self.queue.played(fn)
+        self._preload_next()
+        title = os.path.splitext(fn)[0]
+        with trace.span("load_lyrics"):
+            lyrics = load_lyrics(self.catalog.lyrics, title)
+        self.lyrics.set_lyrics(lyrics)
+        self.refresh.invalidate()
+        self._request_chart(fn)
+        self._request_peaks(fn)
+        self.spectrum.clear()
+        self.analyzer.open(self.catalog.path_of(fn) if fn.lower().endswith('.wav') else None)
+        if self.visualizer:
+            self.visualizer.open(self.catalog.art, title)
+        self._update_notify_interval()
+
+    def _finish_play(self):
+        # 곡을 떠날 때: 재생 기록과 (한 번이라도 쳤으면) 게임 점수를 모아 둔다. 두 번 불려도 된다
+        fn = self.history.current
+        if fn is None:
+            return
+        if self.chart is not None and self.game.played:
+            judge = self.game.judge
+            replay = Replay.from_inputs(self.chart_digest, self.chart.analyzer,
+                                        self.game.replay_events(), judge.score)
+            self.history.add_score(fn, self.chart.analyzer, judge, replay.to_bytes())
+        self.history.track_finished()
+
+    def _request_chart(self, fn):
+        # 차트는 캐시에서 꺼내거나(빠름) 백그라운드에서 새로 만든다
+        self.chart = None
+        self.game.set_track(None, None)
+        self.clock.reset()
+        if not fn.lower().endswith('.wav'):
+            return
+        run_async(
+            _load_chart, self.catalog.path_of(fn), self.cache,
+            on_done=lambda r: self._on_chart_loaded(fn, *r),
+            on_error=lambda e: self._on_load_failed("Chart", fn, e),
+        )
+
+    def _request_peaks(self, fn):
+        self.waveform.set_peaks(None)
+        if not fn.lower().endswith('.wav'):
+            return
+        run_async(
+            load_peaks, self.catalog.path_of(fn), self.cache,
+            on_done=lambda peaks: fn == self.player_fn and self.waveform.set_peaks(peaks),
+            on_error=lambda e: self._on_load_failed("Waveform", fn, e),
+        )
+
+    def _on_load_failed(self, what, fn, e):
+        log.warning("%s failed for %s: %s", what.lower(), fn, e)
+        if fn == self.player_fn:
+            self.statusBar().showMessage(f"{what} unavailable: {e or type(e).__name__}", 5000)
+
+    def _on_analyzer_failed(self, path, err):
+        # 작업 스레드는 살아 있고 다음 곡에서 다시 연다. 이 곡의 스펙트럼만 비운다
+        self.spectrum.clear()
+        self.statusBar().showMessage(f"Spectrum unavailable: {err}", 5000)
+
+    @trace.traced()
+    def _on_chart_loaded(self, fn, chart, digest):
+        if fn == self.player_fn:
+            self.chart = chart
+            self.chart_digest = digest
+            title = os.path.splitext(fn)[0]
+            self.game.set_track(chart, load_lyrics(self.catalog.lyrics, f"{title}_game"))
+            if self.visualizer:
+                self.visualizer.set_beats(chart.times_ms, chart.strengths)
+            self.history.leaderboard(
+                fn, chart.analyzer,
+                on_done=lambda board: fn == self.player_fn and self.game.set_board(*board))
+        st = self.cache.stats()
+        self.total_lbl.setToolTip(
+            f"cache: {st['hits']} hits / {st['misses']} misses, "
+            f"{st['entries']} entries, {st['bytes'] // 1024} KiB"
+        )
+
+    def _update_notify_interval(self):
+        # 게임 판정과 시간 가사는 위치 갱신을 촘촘히 받아야 한다
+        if self.stack.currentWidget() is self.game:
+            self.player.setNotifyInterval(GAME_NOTIFY_MS)
+        else:
+            self.player.setNotifyInterval(100 if self.lyrics.timed else 1000)
+
+    @trace.traced()
+    def _on_page_changed(self, idx):
+        if self.stack.widget(idx) is self.game:
+            self.game.start()
+            self.game.setFocus()
+        else:
+            self.game.stop()
+        self._update_notify_interval()
+
+    def keyPressEvent(self, event):
+        if self.stack.currentWidget() is self.game and self.game.handle_key(event):
+            return
+        if event.key() == Qt.Key_Left:
+            pos = self.player.position() - 10000
+            self.player.setPosition(max(pos, 0))
+        elif event.key() == Qt.Key_Right:
+            dur = self.player.duration()
+            pos = self.player.position() + 10000
+            self.player.setPosition(min(pos, dur))
+        elif event.key() == Qt.Key_Space:
+            self.toggle_play_pause()
+        elif event.key() == Qt.Key_Escape:
+            QApplication.quit()
+        else:
+            super().keyPressEvent(event)
+
+    def toggle_play_pause(self):
+        if self.player.state() == QMediaPlayer.PlayingState:
+            self.player.pause()
+        else:
+            self.player.play()
+
+    @trace.traced()
+    def _on_player_state_changed(self, state):
+        self.clock.set_playing(state == QMediaPlayer.PlayingState)
+        self.refresh.set_state(state)
+
+    def _apply_play_button(self, s):
+        self.btn_playpause.setText("⏸️" if s.state == QMediaPlayer.PlayingState else "▶️")
+
+    def _auto_next_index(self):
+        """곡이 끝났을 때 넘어갈 곳. 재생을 멈춰야 하면 None."""
+        if not self.playlist or self.current_index < 0:
+            return None
+        if self.repeat_mode == 2:
+            return self.current_index
+        return self._next_index(wrap=self.repeat_mode == 1)
+
+    def _next_index(self, wrap=True):
+        fn = self.queue.peek(wrap)
+        return None if fn is None else self.model.row_of(fn)
+
+    def _preload_next(self):
+        nxt = self._auto_next_index() if self.player.gapless else None
+        if nxt is None:
+            self.player.clear_preload()
+        elif self.playlist[nxt] != self.player.preloaded_token:
+            content, stream = self._media(nxt)
+            self.player.preload(content, self.playlist[nxt], self._volume(nxt), stream)
+
+    @trace.traced()
+    def next_track(self):
+        nxt = self._next_index()
+        if nxt is None:
+            return
+        self._select_row(nxt)
+        self.play_track(nxt)
+
+    @trace.traced()
+    def prev_track(self):
+        fn = self.queue.back()
+        if fn is None:
+            return
+        prv = self.model.row_of(fn)
+        self._select_row(prv)
+        self.play_track(prv)
+
+    def toggle_shuffle(self):
+        self.queue.set_shuffle(not self.queue.shuffle)
+        if self.queue.shuffle:
+            self.btn_shuffle.setStyleSheet("background: #ddebf7;")
+        else:
+            self.btn_shuffle.setStyleSheet("")
+        self._preload_next()
+
+    def _on_track_menu(self, pos):
+        fn = self.list_view.indexAt(pos).data(PlaylistModel.FnRole)
+        if fn is None:
+            return
+        menu = QMenu(self)
+        play_next = menu.addAction("Play next")
+        add = menu.addAction("Add to queue")
+        chosen = menu.exec_(self.list_view.viewport().mapToGlobal(pos))
+        if chosen is play_next:
+            self.queue.play_next(fn)
+        elif chosen is add:
+            self.queue.enqueue(fn)
+        else:
+            return
+        self._preload_next()
+
+    def toggle_repeat(self):
+        self.repeat_mode = (self.repeat_mode + 1) % 3
+        icons = {0: "🔁", 1: "🔁", 2: "🔂"}
+        self.btn_repeat.setText(icons[self.repeat_mode])
+        self._preload_next()
+
+    def toggle_gapless(self):
+        self.player.setGapless(not self.player.gapless)
+        self.btn_gapless.setStyleSheet("background: #ddebf7;" if self.player.gapless else "")
+        self._preload_next()
+
+    @trace.traced()
+    def _on_position_changed(self, pos):
+        self.refresh.set_position(pos)
+        self.history.track_position(pos)
+
+    def _slider_key(self, s):
+        # 손잡이가 실제로 한 픽셀 이상 움직일 때만
+        return s.duration, (s.position * self.slider.width() // s.duration if s.duration > 0 else 0)
+
+    def _apply_slider(self, s):
+        if self.slider.maximum() != s.duration:
+            self.slider.setRange(0, s.duration)
+        self.slider.setValue(s.position)
+
+    def _apply_time(self, s):
+        self.time_lbl.setText(f"{ms_to_mmss(s.position)} / {ms_to_mmss(s.duration)}")
+
+    @trace.traced()
+    def _on_media_status(self, status):
+        # 갭리스 모드에서 미리 열어 둔 곡이 있으면 GaplessPlayer 가 직접 넘기므로
+        # 여기에는 다음 곡이 없을 때(또는 갭리스가 꺼졌을 때)만 온다
+        if status == QMediaPlayer.EndOfMedia:
+            nxt = self._auto_next_index()
+            if nxt is not None:
+                self._select_row(nxt)
+                self.play_track(nxt)
+
+    def closeEvent(self, event):
+        self._shutdown()
+        super().closeEvent(event)
+
+    def _shutdown(self):
+        # 창을 닫을 때와 EXIT(QApplication.quit) 모두 여기로 온다. 두 번 불려도 된다
+        self.loudness.cancel()      # prober.cancel() 의 finished 로 새로 시작하지 않도록 먼저
+        self._finish_play()
+        self.history.close()        # 모아 둔 기록은 기다렸다가 다 쓴다
+        self.prober.cancel()
+        self.prober.wait()
+        self.analyzer.stop()
+        if self.visualizer:
+            self.visualizer.stop()
+        QThreadPool.globalInstance().waitForDone()
+        # 비밀번호 해시를 바꿔 쓰는 중이면 끝내고, 그 결과로 넣은 DB 쓰기까지 기다린다
+        passwords.get_hasher().wait()
+        QApplication.sendPostedEvents()
+        self.history.db.wait()
+
+    def _on_logout(self):
+        # 멈추면 positionChanged(0) 이 오므로, 그 전에 지금 위치로 기록을 끝내고 넘긴다
+        self._finish_play()
+        self.history.flush()
+        self.player.stop()
+        self.hide()
+        auth = AuthDialog()
+        if auth.exec_() == QDialog.Accepted:
+            new_user = auth.login_user.text().strip()
+            self.history.set_user(new_user)
+            self.name_label.setText(f"Hello, {new_user}")
+            self.stack.setCurrentIndex(0)
+            self.show()
+        else:
+            QApplication.quit()
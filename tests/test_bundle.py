@@ -0,0 +1,19 @@
+# tests/test_bundle.py
+from music.bundle import AlbumBundle, pack, unpack
+
+
+def test_unpack_rejects_names_outside_the_folder(tmp_path):
+    out = tmp_path / "album.mqa"
+    evil = ["lyrics/../escaped.txt", "lyrics//tmp/abs.txt", "lyrics/sub/nested.txt", "lyrics/.."]
+    pack({}, str(out), extra=[(name, b"x") for name in evil] + [("lyrics/ok.txt", b"ok")])
+
+    dest = tmp_path / "dest"
+    bundle = AlbumBundle(str(out))
+    try:
+        bad = unpack(bundle, {'lyrics': str(dest / "lyrics")})
+    finally:
+        bundle.close()
+    assert sorted(bad) == sorted(evil)
+    assert (dest / "lyrics" / "ok.txt").read_bytes() == b"ok"
+    assert not (dest / "escaped.txt").exists()
+    assert sorted(p.name for p in tmp_path.rglob("*") if p.is_file()) == ["album.mqa", "ok.txt"]
@@ -0,0 +1,74 @@
+# tests/test_cache.py
+import os
+
+from music.cache import DerivedCache
+
+
+def _source(tmp_path, name, data=b"pcm"):
+    p = tmp_path / name
+    p.write_bytes(data)
+    return str(p)
+
+
+def test_put_keeps_new_entry_when_over_budget(tmp_path):
+    cache = DerivedCache(str(tmp_path / "cache"), budget_bytes=100)
+    old = _source(tmp_path, "old.wav", b"a")
+    new = _source(tmp_path, "new.wav", b"b")
+    assert cache.put(old, 'peaks', 1, b"x" * 60)
+    fpath = cache.put(new, 'peaks', 1, b"y" * 60)     # 합쳐 120 > 100: 오래된 쪽을 버린다
+    assert fpath is not None and os.path.exists(fpath)
+    assert cache.get_path(new, 'peaks', 1) == fpath
+    assert cache.get_path(old, 'peaks', 1) is None
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+
+
+def test_entry_larger_than_budget_is_not_stored(tmp_path):
+    cache = DerivedCache(str(tmp_path / "cache"), budget_bytes=100)
+    src = _source(tmp_path, "big.wav")
+    kept = _source(tmp_path, "kept.wav", b"k")
+    cache.put(kept, 'peaks', 1, b"k" * 10)
+    assert cache.put(src, 'peaks', 1, b"z" * 101) is None
+    assert cache.get_or_build(src, 'peaks', 1, lambda: b"z" * 101) == b"z" * 101
+    assert cache.get_path(kept, 'peaks', 1) is not None
+    assert cache.stats()["entries"] == 1
+    cache.close()
+
+
+def test_eviction_skips_files_that_cannot_be_removed(tmp_path, monkeypatch):
+    cache = DerivedCache(str(tmp_path / "cache"), budget_bytes=100)
+    mapped = _source(tmp_path, "mapped.wav", b"a")
+    other = _source(tmp_path, "other.wav", b"b")
+    new = _source(tmp_path, "new.wav", b"c")
+    locked = cache.put(mapped, 'peaks', 1, b"x" * 40)
+    cache.put(other, 'peaks', 1, b"y" * 40)
+    real_remove = os.remove
+
+    def remove(p):
+        if p == locked:     # Windows: 메모리 맵으로 열린 파일
+            raise PermissionError(13, "in use", p)
+        real_remove(p)
+    monkeypatch.setattr(os, "remove", remove)
+    assert cache.put(new, 'peaks', 1, b"z" * 40) is not None
+    assert os.path.exists(locked)
+    assert cache.get_path(other, 'peaks', 1) is None    # 지울 수 있는 다음 항목을 대신 버린다
+    assert cache.stats()["entries"] == 2                # 못 지운 항목은 색인에 남는다
+
+    monkeypatch.setattr(os, "remove", real_remove)
+    cache.put(other, 'peaks', 1, b"y" * 40)     # 다음 정리 때 다시 지운다
+    assert not os.path.exists(locked)
+    cache.close()
+
+
+def test_changed_file_keeps_entries_shared_with_identical_file(tmp_path):
+    cache = DerivedCache(str(tmp_path / "cache"))
+    a = _source(tmp_path, "a.wav", b"same")
+    b = _source(tmp_path, "b.wav", b"same")
+    cache.put(a, 'peaks', 1, b"p")
+    assert cache.get(b, 'peaks', 1) == b"p"
+    with open(a, 'wb') as f:
+        f.write(b"changed")
+    os.utime(a, ns=(1, 1))
+    assert cache.get(a, 'peaks', 1) is None
+    assert cache.get(b, 'peaks', 1) == b"p"
+    cache.close()
@@ -0,0 +1,34 @@
+# tests/test_chart.py
+import wave
+from contextlib import closing
+
+import numpy as np
+
+from music import chart
+
+
+def _wav(path, rate, seconds=2.0):
+    t = np.arange(int(rate * seconds)) / rate
+    x = np.sin(2 * np.pi * 440 * t) * (np.sin(2 * np.pi * 2 * t) > 0)    # 2 Hz 로 끊기는 톤
+    with wave.open(str(path), 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes((x * 16000).astype('<i2').tobytes())
+    return str(path)
+
+
+def test_low_sample_rate_builds_with_fewer_bands(tmp_path):
+    for rate in (4000, 8000):
+        c = chart.build_chart(_wav(tmp_path / f"low{rate}.wav", rate), str(tmp_path))
+        assert c.sample_rate == rate and len(c) > 0
+
+
+def test_abandoned_blocks_close_the_file(tmp_path, monkeypatch):
+    opened = []
+    real_open = chart.open_wav
+    monkeypatch.setattr(chart, "open_wav", lambda p: opened.append(real_open(p)) or opened[-1])
+    rate, blocks = chart.read_wav_blocks(_wav(tmp_path / "a.wav", 8000), block_frames=1000)
+    with closing(blocks):
+        next(blocks)                    # 곡을 바꿔서 중간에 그만둔 빌드
+    assert opened[0].getfp() is None    # wave 는 닫히면 파일 객체를 놓는다
@@ -0,0 +1,48 @@
+# tests/test_db.py
+import sqlite3
+
+import pytest
+
+from music import db
+
+
+def _version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def test_failed_migration_rolls_back_with_its_version(tmp_path, monkeypatch):
+    conn = db.connect(str(tmp_path / "users.db"))
+    monkeypatch.setattr(db, "MIGRATIONS", [
+        "CREATE TABLE a (x INTEGER);",
+        "ALTER TABLE a ADD COLUMN y INTEGER;\nINSERT INTO missing VALUES (1);",
+    ])
+    with pytest.raises(sqlite3.OperationalError):
+        db.migrate(conn)
+    assert _version(conn) == 1
+    assert [r[1] for r in conn.execute("PRAGMA table_info(a)")] == ["x"]
+
+    # 고친 뒤 다시 돌리면 ALTER 가 두 번 실행되지 않는다 ("duplicate column name" 없이)
+    db.MIGRATIONS[1] = "ALTER TABLE a ADD COLUMN y INTEGER;"
+    assert db.migrate(conn) == 2
+    assert _version(conn) == 2
+    assert [r[1] for r in conn.execute("PRAGMA table_info(a)")] == ["x", "y"]
+    conn.close()
+
+
+def test_migrate_builds_current_schema(tmp_path):
+    conn = db.connect(str(tmp_path / "users.db"))
+    assert db.migrate(conn) == len(db.MIGRATIONS)
+    assert "replay" in [r[1] for r in conn.execute("PRAGMA table_info(scores)")]
+    assert db.migrate(conn) == len(db.MIGRATIONS)     # 두 번 불러도 된다
+    conn.close()
+
+
+def test_closed_database_refuses_new_jobs(qapp, tmp_path):
+    database = db.Database(str(tmp_path / "users.db"))
+    assert database.call(db.create_user, "alice", "x")
+    database.close()
+    database.wait()                                   # 닫힌 뒤에는 바로 돌아온다
+    with pytest.raises(RuntimeError, match="closed"):
+        database.call(db.password_hash, "alice")
+    with pytest.raises(RuntimeError, match="closed"):
+        database.submit(db.password_hash, "alice")
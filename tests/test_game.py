@@ -0,0 +1,22 @@
+# tests/test_game.py
+import pytest
+
+from music.game import EventClock
+
+
+def test_event_clock_recovers_event_loop_delay():
+    keys = EventClock()
+    base = 1_000_000            # 플랫폼 시계의 기준점은 perf_counter 와 다르다
+    assert keys.time_of(base + 0, 10.000) == pytest.approx(10.000)
+    assert keys.time_of(base + 500, 10.501) == pytest.approx(10.500)   # 1 ms 늦게 받은 것
+    # 이벤트 루프가 120 ms 멈춘 뒤에 받은 키: 눌린 시각으로 돌려준다
+    assert keys.time_of(base + 1000, 11.120) == pytest.approx(11.000)
+
+
+def test_event_clock_falls_back_to_receive_time():
+    keys = EventClock()
+    assert keys.time_of(0, 5.0) == 5.0                  # 스탬프가 없는 플랫폼
+    keys.time_of(2000, 5.0)
+    # 플랫폼 시계가 튀면 (MAX_LAG_MS 넘게) 받은 시각을 쓰고 기준을 다시 잡는다
+    assert keys.time_of(2100, 7.0) == pytest.approx(7.0)
+    assert keys.time_of(2200, 7.105) == pytest.approx(7.1)
@@ -0,0 +1,144 @@
+# tests/test_gapless.py
+# 갭리스 전환과 곡 사이 무음(gap ms) 측정: 가짜 플레이어 두 개와 가짜 시계로 돌린다
+import pytest
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from music.gapless import END_OF_MEDIA, PLAYING_STATE, GaplessPlayer
+
+# QtMultimedia 없이 돈다 (GaplessPlayer 는 플레이어 인터페이스만 쓴다). QMediaPlayer 의 값과 같다
+STOPPED, PLAYING, PAUSED = 0, PLAYING_STATE, 2
+GAP_BUDGET_MS = 5.0
+
+
+class FakeClock:
+    def __init__(self, t=100.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+    def advance(self, ms):
+        self.t += ms / 1000.0
+
+
+class FakePlayer(QObject):
+    positionChanged = pyqtSignal('qint64')
+    durationChanged = pyqtSignal('qint64')
+    mediaStatusChanged = pyqtSignal(int)
+    stateChanged = pyqtSignal(int)
+
+    def __init__(self, duration=1000):
+        super().__init__()
+        self._state = STOPPED
+        self._pos = 0
+        self._dur = duration
+        self._vol = 100
+
+    def setMedia(self, content, stream=None):
+        self._pos = 0
+
+    def play(self):
+        self._state = PLAYING
+
+    def pause(self):
+        self._state = PAUSED
+
+    def stop(self):
+        self._state = STOPPED
+        self._pos = 0
+
+    def state(self):
+        return self._state
+
+    def position(self):
+        return self._pos
+
+    def duration(self):
+        return self._dur
+
+    def setPosition(self, pos):
+        self._pos = pos
+
+    def setVolume(self, vol):
+        self._vol = vol
+
+    def volume(self):
+        return self._vol
+
+    def setNotifyInterval(self, ms):
+        pass
+
+    def notifyInterval(self):
+        return 100
+
+    def report(self, pos):
+        """백엔드가 위치를 알려 온 것처럼."""
+        self._pos = pos
+        self.positionChanged.emit(pos)
+
+
+@pytest.fixture
+def rig(qapp):
+    clock = FakeClock()
+    a, b = FakePlayer(), FakePlayer()
+    player = GaplessPlayer(players=[a, b], clock=clock)
+    player.setMedia(None)
+    player.play()
+    return player, clock, a, b
+
+
+def test_timer_switch_has_no_gap(rig):
+    player, clock, a, b = rig
+    advanced = []
+    player.advanced.connect(advanced.append)
+    player.preload(None, "next")
+    assert b.state() == PAUSED        # 대기 플레이어는 미리 열고 멈춰 둔다
+    a.report(990)
+    player._check_switch()                              # LEAD_MS 전에 깨어난 타이머
+    assert advanced == ["next"] and player.current is b
+    assert b.state() == PLAYING and a.state() == STOPPED
+    clock.advance(13)                                   # 이전 곡이 끝나고 3 ms 뒤에 3 ms 재생됨
+    b.report(3)
+    assert player.last_gap_ms is not None and player.last_gap_ms < GAP_BUDGET_MS
+
+
+def test_end_of_media_with_preload_switches_at_once(rig):
+    player, clock, a, b = rig
+    player.preload(None, "next")
+    a.report(1000)
+    a.mediaStatusChanged.emit(END_OF_MEDIA)  # 타이머보다 끝 알림이 먼저 왔을 때
+    assert player.current is b
+    clock.advance(4)
+    b.report(4)
+    assert player.last_gap_ms < GAP_BUDGET_MS
+
+
+def test_gap_stats_over_many_transitions(rig):
+    player, clock, a, b = rig
+    for k in range(10):
+        cur = player.current
+        player.preload(None, k)
+        cur.report(995)
+        player._check_switch()
+        clock.advance(5 + k % 3)
+        player.current.report(5 + k % 3)
+    stats = player.gap_stats()
+    assert stats["count"] == 10
+    assert stats["max_ms"] < GAP_BUDGET_MS
+
+
+def test_gap_is_measured_without_preload(rig):
+    # 미리 열지 않고 끝 알림에서 다음 곡을 여는 예전 방식: 측정값이 실제 무음을 잡아야 한다
+    player, clock, a, b = rig
+    player.setGapless(False)
+
+    def open_next(status):
+        if status == END_OF_MEDIA:
+            player.setMedia(None)
+            player.play()
+    player.mediaStatusChanged.connect(open_next)
+    a.report(1000)
+    a.mediaStatusChanged.emit(END_OF_MEDIA)
+    clock.advance(60)                                   # 디코더가 늦게 시작: 50 ms 무음 + 10 ms 재생
+    a.report(10)
+    assert player.last_gap_ms == pytest.approx(50.0)
@@ -0,0 +1,43 @@
+# tests/test_history.py
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from music import db
+from music.history import HistoryRecorder, recent_plays, resume_positions
+
+
+class FakePlayer(QObject):
+    """QMediaPlayer 처럼 stop() 하면 위치 0 을 알린다."""
+    positionChanged = pyqtSignal(int)
+
+    def play_to(self, pos):
+        self.positionChanged.emit(pos)
+
+    def stop(self):
+        self.positionChanged.emit(0)
+
+
+def test_logout_mid_play_keeps_resume_point_and_played_ms(qapp, tmp_path):
+    database = db.Database(str(tmp_path / "users.db"))
+    try:
+        database.call(db.create_user, "alice", "x")
+        database.call(db.create_user, "bob", "x")
+        history = HistoryRecorder("alice", database)
+        player = FakePlayer()
+        player.positionChanged.connect(history.track_position)   # MainWindow 과 같은 연결
+
+        history.track_started("song.wav", 180_000)
+        player.play_to(42_000)
+        # MainWindow._on_logout 의 순서: 기록을 끝내고 넘긴 뒤에 멈춘다
+        history.track_finished()
+        history.flush()
+        player.stop()
+        history.flush()                 # 로그인 창이 떠 있는 동안 도는 주기 flush
+        history.set_user("bob")
+        history.close()
+
+        assert database.call(resume_positions, "alice") == {"song.wav": 42_000}
+        [(fn, _, played_ms, completed)] = database.call(recent_plays, "alice")
+        assert (fn, played_ms, completed) == ("song.wav", 42_000, 0)
+        assert database.call(recent_plays, "bob") == []
+    finally:
+        database.close()
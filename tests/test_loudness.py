@@ -0,0 +1,75 @@
+# tests/test_loudness.py
+import wave
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from music.loudness import KFilter, LoudnessScanner, analyze_wav, k_weighting
+
+
+class FakePool:
+    def __init__(self):
+        self.shutdowns = []
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shutdowns.append(wait)
+
+
+def _future(result=None, error=None):
+    fut = Future()
+    if error is not None:
+        fut.set_exception(error)
+    else:
+        fut.set_result(result)
+    return fut
+
+
+def test_failed_item_still_finishes_and_releases_pool(qapp):
+    scanner = LoudnessScanner()
+    results, failed, finished = [], [], []
+    scanner.resultsReady.connect(results.extend)
+    scanner.failed.connect(lambda fn, err: failed.append((fn, err)))
+    scanner.finished.connect(lambda: finished.append(True))
+    pool = scanner._pool = FakePool()
+    scanner._pending = 2
+
+    scanner._done("a.wav", _future(error=RuntimeError("worker died")))
+    assert failed == [("a.wav", "worker died")]
+    assert not finished and pool.shutdowns == []
+
+    scanner._done("b.wav", _future(("b.wav", None)))
+    assert results == [("b.wav", None)]
+    assert finished == [True]
+    assert pool.shutdowns == [False] and scanner._pool is None
+
+
+def _write_wav(path, x, rate):
+    with wave.open(str(path), 'wb') as w:
+        w.setnchannels(x.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes((np.clip(x, -1, 1) * 32767).round().astype('<i2').tobytes())
+    return str(path)
+
+
+@pytest.mark.parametrize("rate", [44100, 48000])
+def test_reference_tone_reads_minus_23_lufs(tmp_path, rate):
+    # BS.1770: 997 Hz 사인 -20 dBFS 를 한 채널에 → -23.0 LUFS
+    t = np.arange(10 * rate) / rate
+    x = 10 ** (-20 / 20) * np.sin(2 * np.pi * 997 * t)
+    lufs = analyze_wav(_write_wav(tmp_path / "tone.wav", x[:, None], rate)).lufs
+    assert lufs == pytest.approx(-23.0, abs=0.1)
+
+
+def test_k_filter_carries_state_across_calls():
+    rate = 48000
+    b, a = k_weighting(rate)
+    x = np.random.default_rng(0).standard_normal((2000, 2))
+    ref = np.zeros_like(x)       # 규격의 IIR 을 그대로 (샘플마다)
+    for n in range(len(x)):
+        ref[n] = (sum(b[i] * x[n - i] for i in range(len(b)) if n >= i)
+                  - sum(a[i] * ref[n - i] for i in range(1, len(a)) if n >= i))
+    f = KFilter(rate, 2, block=256)
+    out = np.concatenate([f(x[:500]), f(x[500:503]), f(x[503:])])
+    assert np.abs(out - ref).max() <= 1e-6 * np.abs(ref).max()
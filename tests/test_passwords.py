@@ -0,0 +1,19 @@
+# tests/test_passwords.py
+from music import passwords
+
+
+def test_failed_calibration_falls_back_to_min_cost(qapp, monkeypatch):
+    def broken(target_ms):
+        raise MemoryError("scrypt")
+    monkeypatch.setattr(passwords, "calibrate", broken)
+    hasher = passwords.PasswordHasher()
+    hasher.wait()
+    assert hasher.cost() == passwords.LN_MIN
+
+
+def test_hash_uses_calibrated_cost(qapp, monkeypatch):
+    monkeypatch.setattr(passwords, "calibrate", lambda target_ms: passwords.LN_MIN)
+    hasher = passwords.PasswordHasher()
+    stored = passwords.hash_password("pw", hasher.cost())
+    assert passwords.verify_password("pw", stored)
+    assert not passwords.needs_rehash(stored, hasher.cost())
@@ -0,0 +1,85 @@
+# tests/test_playqueue.py
+import random
+
+import pytest
+from PyQt5.QtCore import QModelIndex
+
+from music.playlist_model import PlaylistModel
+from music.playqueue import PlayQueue
+
+
+def make(n, seed=0):
+    model = PlaylistModel()
+    model.reset([f"track {i:03d}.wav" for i in range(n)])
+    q = PlayQueue(model.fns, model.row_of, random.Random(seed))
+    q.played(model.fns[0])
+    return model, q
+
+
+def advance(q, wrap=True):
+    fn = q.peek(wrap)
+    q.played(fn)
+    return fn
+
+
+@pytest.mark.parametrize("n,seed", [(1, 0), (2, 1), (7, 2), (50, 3)])
+def test_each_shuffle_cycle_is_a_permutation(qapp, n, seed):
+    model, q = make(n, seed)
+    q.set_shuffle(True)
+    played = [q.current] + [advance(q) for _ in range(3 * n - 1)]
+    for k in range(3):
+        cycle = played[k * n:(k + 1) * n]
+        assert sorted(cycle) == sorted(model.fns)
+
+
+def test_no_repeat_within_a_cycle(qapp):
+    model, q = make(30, seed=4)
+    q.set_shuffle(True)
+    seen = {q.current}
+    while (fn := q.peek(wrap=False)) is not None:
+        assert fn not in seen
+        seen.add(fn)
+        q.played(fn)
+    assert seen == set(model.fns)
+    nxt = q.peek(wrap=True)
+    assert nxt is not None and nxt != q.current    # 새 바퀴는 방금 곡으로 시작하지 않는다
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_back_then_next_round_trips_through_history(qapp, shuffle):
+    model, q = make(20, seed=5)
+    q.set_shuffle(shuffle)
+    played = [q.current] + [advance(q) for _ in range(8)]
+    back = []
+    for _ in range(8):
+        fn = q.back()
+        q.played(fn)
+        back.append(fn)
+    assert back == played[-2::-1]
+    assert [advance(q) for _ in range(8)] == played[1:]
+    assert q.history[-1] == played[-2]
+
+
+def test_up_next_survives_reorders(qapp):
+    model, q = make(40, seed=6)
+    rng = random.Random(6)
+    queued = ["track 030.wav", "track 005.wav", "track 017.wav"]
+    for fn in queued:
+        q.enqueue(fn)
+    q.play_next("track 022.wav")
+    for _ in range(50):
+        src = rng.randrange(36)
+        dst = rng.randrange(41)
+        if not src <= dst <= src + 3:
+            model.moveRows(QModelIndex(), src, 3, QModelIndex(), dst)
+    assert [advance(q) for _ in range(4)] == ["track 022.wav"] + queued
+    # 대기열이 비면 목록 순서로: 옮긴 뒤의 바로 아래 행
+    row = model.row_of(q.current)
+    assert q.peek() == model.fns[(row + 1) % len(model.fns)]
+    q.check()
+
+
+@pytest.mark.parametrize("n,seed", [(1, 1), (7, 2), (60, 3)])
+def test_random_operations_keep_invariants(qapp, n, seed):
+    from benchmarks.bench_queue import fuzz
+    assert fuzz(n, 3000, seed) == 3000